@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import time
+import orjson
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis jest opcjonalny – domyślnie cache działa w pamięci procesu
+    redis = redis_asyncio = None
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory | redis | off
+CACHE_TTL = int(os.getenv("CACHE_TTL", "60"))  # sekundy
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    last_modified: float
+    headers: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_content(cls, content, headers: dict | None = None):
+        # Treść serializujemy raz (orjson) – trafienie w cache nie wymaga ponownego kodowania JSON
+        body = orjson.dumps(content, default=jsonable_encoder)
+        headers = headers or {}
+        # Nagłówki (np. X-Next-Cursor) są częścią reprezentacji, więc wchodzą do ETag
+        digest = hashlib.blake2b(body, digest_size=16)
+        digest.update(json.dumps(headers, sort_keys=True).encode("utf-8"))
+        return cls(body=body, etag=f'"{digest.hexdigest()}"', last_modified=time.time(), headers=headers)
+
+
+class MemoryBackend:
+    # LRU + TTL w pamięci procesu; wywoływany tylko z pętli zdarzeń, więc bez blokad
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: int = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+
+    async def get(self, key: str) -> CacheEntry | None:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry):
+        self._entries[key] = (time.monotonic() + self.ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    async def bump_generation(self, name: str):
+        self._generations[name] = self._generations.get(name, 0) + 1
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+    async def clear(self):
+        self._entries.clear()
+        self._generations.clear()
+
+
+class RedisBackend:
+    # Wspólny cache dla wielu workerów uvicorn; eksmisję LRU realizuje Redis (maxmemory-policy)
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, ttl: int = CACHE_TTL, prefix: str = "api-cache:"):
+        if redis_asyncio is None:
+            raise RuntimeError("CACHE_BACKEND=redis wymaga pakietu redis (pip install redis)")
+        self.client = redis_asyncio.from_url(url)
+        # Klient redis.asyncio jest związany z pętlą zdarzeń, w której nawiązał połączenie –
+        # kod synchroniczny (serwer SOAP we Flasku) używa osobnego klienta
+        self.sync_client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> CacheEntry | None:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CacheEntry(data["body"].encode("utf-8"), data["etag"], data["last_modified"], data["headers"])
+
+    async def set(self, key: str, entry: CacheEntry):
+        data = {"body": entry.body.decode("utf-8"), "etag": entry.etag, "last_modified": entry.last_modified, "headers": entry.headers}
+        await self.client.set(self.prefix + key, json.dumps(data), ex=self.ttl)
+
+    async def generation(self, name: str) -> int:
+        return int(await self.client.get(self.prefix + "gen:" + name) or 0)
+
+    async def bump_generation(self, name: str):
+        await self.client.incr(self.prefix + "gen:" + name)
+
+    def bump_generation_sync(self, name: str):
+        self.sync_client.incr(self.prefix + "gen:" + name)
+
+    async def size(self) -> int:
+        # Tylko wpisy tego cache – baza Redis może być współdzielona; liczniki generacji nie są wpisami
+        generations = (self.prefix + "gen:").encode("utf-8")
+        return len([key async for key in self.client.scan_iter(self.prefix + "*") if not key.startswith(generations)])
+
+    async def clear(self):
+        async for key in self.client.scan_iter(self.prefix + "*"):
+            await self.client.delete(key)
+
+
+class ProductCache:
+    # Read-through cache dla produktu po id i listy produktów, unieważniany przez endpointy zapisu.
+    # Generacja jest częścią klucza: zapis zwiększa ją i wszystkie wcześniejsze wpisy przestają być
+    # osiągalne, także te zapisane przez żądanie, które czytało bazę równolegle z zapisem.
+    GENERATION = "products"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def _lookup(self, key: str, loader) -> CacheEntry | None:
+        generation = await self.backend.generation(self.GENERATION)
+        key = f"{self.GENERATION}:{generation}:{key}"
+        entry = await self.backend.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = await loader()
+        if entry is not None:
+            await self.backend.set(key, entry)
+        return entry
+
+    async def get_product(self, product_id: int, loader) -> CacheEntry | None:
+        return await self._lookup(f"item:{product_id}", loader)
+
+    async def get_product_list(self, params: dict, loader) -> CacheEntry | None:
+        query = "&".join(f"{name}={value}" for name, value in sorted(params.items()) if value is not None)
+        return await self._lookup(f"list:{query}", loader)
+
+    async def invalidate_products(self):
+        # Stare wpisy wypadną z cache przez LRU/TTL
+        await self.backend.bump_generation(self.GENERATION)
+        self.invalidations += 1
+
+    def invalidate_products_sync(self):
+        # Dla kodu poza pętlą zdarzeń; tylko backend redis (cache w pamięci należy do procesu API)
+        self.backend.bump_generation_sync(self.GENERATION)
+        self.invalidations += 1
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": await self.backend.size(),
+        }
+
+    async def clear(self):
+        await self.backend.clear()
+        self.hits = self.misses = self.invalidations = 0
+
+
+class NullBackend(MemoryBackend):
+    # CACHE_BACKEND=off – nic nie jest przechowywane, ale ETag/304 nadal działają
+    name = "off"
+
+    async def set(self, key: str, entry: CacheEntry):
+        pass
+
+
+def create_backend(name: str = CACHE_BACKEND):
+    if name == "redis":
+        return RedisBackend()
+    if name == "off":
+        return NullBackend()
+    return MemoryBackend()
+
+
+product_cache = ProductCache(create_backend())
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def cached_json_response(request: Request, entry: CacheEntry) -> Response:
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Last-Modified": formatdate(entry.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",  # klient może przechowywać odpowiedź, ale musi ją rewalidować
+    }
+    # 304 tylko na podstawie ETag. If-Modified-Since pomijamy: Last-Modified ma rozdzielczość sekundy,
+    # więc zapis i ponowne wypełnienie cache w tej samej sekundzie dałyby nieaktualne 304
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,134 @@
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+# Tryby obsługi częściowych błędów w operacjach masowych:
+# atomic – wszystko albo nic (jedna transakcja), best_effort – każda porcja zatwierdzana osobno
+BULK_MODES = ("atomic", "best_effort")
+DEFAULT_BULK_CHUNK_SIZE = 500
+MAX_BULK_CHUNK_SIZE = 5000  # × 5 kolumn produktu – w limicie 32766 parametrów jednego INSERT w SQLite
+
+FAILED_STATUSES = {"not_found", "error"}
+
+
+def dialect_insert(model, dialect_name: str):
+    # INSERT z obsługą ON CONFLICT (upsert) – dostępny w dialektach SQLite i PostgreSQL
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def insert_returning_ids(db, model, rows: list[dict]) -> list[int]:
+    # Id nowych wierszy w kolejności rows, jednym INSERT na porcję.
+    # PostgreSQL: executemany z RETURNING w kolejności parametrów (insertmanyvalues łączy wiersze w jeden INSERT).
+    # SQLite: tam SQLAlchemy przy sort_by_parameter_order wykonuje INSERT na wiersz, więc budujemy jeden INSERT
+    # z wieloma VALUES. Kolejność wierszy RETURNING nie jest gwarantowana, ale klucz INTEGER PRIMARY KEY (rowid)
+    # jest nadawany rosnąco w kolejności VALUES – posortowane id odpowiadają kolejności rows.
+    if not rows:
+        return []
+    if db.get_bind().dialect.name == "sqlite":
+        return sorted(db.execute(insert(model).values(rows).returning(model.id)).scalars())
+    return db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows).scalars().all()
+
+
+def _chunks(entries, size: int):
+    for start in range(0, len(entries), size):
+        yield entries[start:start + size]
+
+
+def _error_detail(error: SQLAlchemyError) -> str:
+    return str(getattr(error, "orig", None) or error)
+
+
+def _run_chunks(db, entries, chunk_size: int, mode: str, apply_chunk):
+    # entries: lista krotek (index, payload); apply_chunk zwraca statusy dla jednej porcji
+    statuses = []
+    chunks = list(_chunks(entries, chunk_size))
+    for position, chunk in enumerate(chunks):
+        try:
+            chunk_statuses = apply_chunk(db, chunk)
+            if mode == "best_effort":
+                db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            if mode == "atomic":
+                # Cała transakcja wycofana – porcja z błędem oznaczona jako error, reszta jako wycofana/pominięta
+                detail = _error_detail(e)
+                statuses = [{**status, "status": "rolled_back"} for status in statuses]
+                statuses += [{"index": index, "status": "error", "detail": detail} for index, _ in chunk]
+                for rest in chunks[position + 1:]:
+                    statuses += [{"index": index, "status": "skipped"} for index, _ in rest]
+                return statuses
+            # best_effort: powtarzamy porcję element po elemencie, aby wyizolować błędne wiersze
+            chunk_statuses = []
+            for entry in chunk:
+                try:
+                    chunk_statuses += apply_chunk(db, [entry])
+                    db.commit()
+                except SQLAlchemyError as item_error:
+                    db.rollback()
+                    chunk_statuses.append({"index": entry[0], "status": "error", "detail": _error_detail(item_error)})
+        statuses.extend(chunk_statuses)
+
+    if mode == "atomic":
+        if any(status["status"] in FAILED_STATUSES for status in statuses):
+            db.rollback()
+            statuses = [
+                status if status["status"] in FAILED_STATUSES else {**status, "status": "rolled_back"}
+                for status in statuses
+            ]
+        else:
+            db.commit()
+    return statuses
+
+
+def _existing_ids(db, model, ids) -> set:
+    return set(db.scalars(select(model.id).where(model.id.in_(ids))))
+
+
+def bulk_insert(db, model, rows: list[dict], chunk_size: int, mode: str):
+    def apply_chunk(db, chunk):
+        # Jeden INSERT na porcję, id z RETURNING – bez db.refresh dla każdego wiersza
+        ids = insert_returning_ids(db, model, [row for _, row in chunk])
+        return [{"index": index, "id": new_id, "status": "created"} for (index, _), new_id in zip(chunk, ids)]
+
+    return _run_chunks(db, list(enumerate(rows)), chunk_size, mode, apply_chunk)
+
+
+def bulk_update(db, model, rows: list[dict], chunk_size: int, mode: str):
+    def apply_chunk(db, chunk):
+        existing = _existing_ids(db, model, {row["id"] for _, row in chunk})
+        statuses = []
+        changes = []
+        for index, row in chunk:
+            if row["id"] not in existing:
+                statuses.append({"index": index, "id": row["id"], "status": "not_found"})
+                continue
+            if len(row) > 1:
+                changes.append(row)
+            statuses.append({"index": index, "id": row["id"], "status": "updated"})
+        if changes:
+            # ORM bulk UPDATE po kluczu głównym – wiersze z tym samym zestawem kolumn idą jednym executemany
+            db.execute(update(model), changes)
+        return statuses
+
+    return _run_chunks(db, list(enumerate(rows)), chunk_size, mode, apply_chunk)
+
+
+def bulk_delete(db, model, ids: list[int], chunk_size: int, mode: str):
+    def apply_chunk(db, chunk):
+        existing = _existing_ids(db, model, {item_id for _, item_id in chunk})
+        if existing:
+            db.execute(delete(model).where(model.id.in_(existing)))
+        return [
+            {"index": index, "id": item_id, "status": "deleted" if item_id in existing else "not_found"}
+            for index, item_id in chunk
+        ]
+
+    return _run_chunks(db, list(enumerate(ids)), chunk_size, mode, apply_chunk)
+
+
+def bulk_summary(mode: str, statuses: list[dict]) -> dict:
+    failed = sum(1 for status in statuses if status["status"] in FAILED_STATUSES)
+    succeeded = sum(1 for status in statuses if status["status"] in ("created", "updated", "deleted"))
+    return {"mode": mode, "succeeded": succeeded, "failed": failed, "items": statuses}
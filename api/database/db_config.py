@@ -2,12 +2,104 @@ import os
 
 # Dynamiczne określenie ścieżki do głównego katalogu projektu
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'store.db')}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'store.db')}")
 
-from sqlalchemy import create_engine
+def to_async_url(url: str) -> str:
+    # Ten sam adres bazy, ale ze sterownikiem asynchronicznym (aiosqlite / asyncpg)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql://", "postgres://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+def to_read_only_url(url: str) -> str:
+    # Plik SQLite otwierany w trybie tylko do odczytu (URI mode=ro); inne bazy – bez zmian (lub DATABASE_READ_URL)
+    prefix, _, path = url.partition(":///")
+    if not prefix.startswith("sqlite") or not path or path.startswith("file:") or path == ":memory:":
+        return url
+    return f"{prefix}:///file:{path}?mode=ro&uri=true"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+ASYNC_DATABASE_READ_URL = os.getenv("ASYNC_DATABASE_READ_URL", to_async_url(os.getenv("DATABASE_READ_URL", to_read_only_url(DATABASE_URL))))
+
+# Profil silnika sterowany zmiennymi środowiskowymi
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # sekundy, -1 = bez odświeżania połączeń
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+
+# PRAGMA ustawiane przy każdym nowym połączeniu SQLite; pusta wartość wyłącza daną opcję
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),  # czytelnicy nie blokują piszącego
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # w trybie WAL fsync tylko przy checkpoint
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),  # wartość ujemna = KiB, tu 64 MiB
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),  # ms oczekiwania na blokadę zamiast "database is locked"
+}
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def engine_options(url: str, pool_size: int = DB_POOL_SIZE) -> dict:
+    options = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        # Baza w pamięci używa SingletonThreadPool/StaticPool, które nie przyjmują ustawień puli
+        if url.endswith(":memory:") or url.split("?")[0] in ("sqlite://", "sqlite+aiosqlite://"):
+            return options
+    options.update(
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return options
+
+def configure_sqlite(sync_engine, read_only: bool = False):
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            # Tryb dziennika zmienia plik bazy, więc ustawia go tylko połączenie z prawem zapisu
+            if value and not (read_only and name == "journal_mode"):
+                cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+def create_db_engine(url: str):
+    db_engine = create_engine(url, **engine_options(url))
+    configure_sqlite(db_engine)
+    return db_engine
+
+def create_async_db_engine(url: str, read_only: bool = False):
+    pool_size = DB_READ_POOL_SIZE if read_only else DB_POOL_SIZE
+    db_engine = create_async_engine(url, **engine_options(url, pool_size))
+    configure_sqlite(db_engine.sync_engine, read_only)
+    return db_engine
+
+# Silnik synchroniczny – skrypty, runner testów i inicjalizacja tabel
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Silnik asynchroniczny – endpointy FastAPI, aby zapytania nie blokowały pętli zdarzeń
+async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+# expire_on_commit=False: po commit obiekty nadal mają wartości, bez leniwego doczytywania poza greenletem
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Osobny silnik tylko do odczytu dla endpointów GET – w trybie WAL czytelnicy nie blokują zapisów
+if ASYNC_DATABASE_READ_URL != ASYNC_DATABASE_URL:
+    async_read_engine = create_async_db_engine(ASYNC_DATABASE_READ_URL, read_only=True)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_read_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+
 Base = declarative_base()
\ No newline at end of file
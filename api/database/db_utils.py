@@ -1,10 +1,23 @@
 from .db_config import Base, engine
+from .search import create_product_search
 # Importujemy wszystkie modele, aby SQLAlchemy je rozpoznał
 from api.models.product import Product
 from api.models.customer import Customer
 from api.models.order import Order
 from api.models.test_case import TestCase
 from api.models.test_result import TestResult  # Upewniamy się, że jest zaimportowany
+from api.models.sales_summary import SalesDailyProductSummary, SalesDailyCustomerSummary, ReportWatermark
+from api.models.test_case_stats import TestCaseStats
+from api.models.defect_key import DefectKey, JiraSyncState
+from api.models.load_test_run import LoadTestRun
+from api.models.flaky_test_stats import FlakyTestStats
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # create_all nie dodaje nowych indeksów do istniejących tabel, więc tworzymy brakujące osobno
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # Istniejące bazy dostają indeks wyszukiwania przy pierwszym starcie (z indeksacją obecnych produktów)
+    with engine.begin() as connection:
+        create_product_search(connection)
\ No newline at end of file
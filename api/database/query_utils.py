@@ -0,0 +1,73 @@
+from fastapi import HTTPException
+from sqlalchemy import inspect, select
+
+# Domyślny i maksymalny rozmiar strony dla paginacji kursorowej
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+# Nagłówek, w którym zwracamy kursor do następnej strony
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def model_columns(model):
+    # Wszystkie kolumny modelu – zapytanie zwraca krotki zamiast pełnych obiektów ORM
+    return [getattr(model, attribute.key) for attribute in inspect(model).column_attrs]
+
+
+def parse_fields(model, fields: str | None):
+    # Zamienia parametr fields=name,price na listę kolumn modelu (zawsze z id, bo po nim stronicujemy)
+    if not fields:
+        return None
+    columns = inspect(model).columns
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return [getattr(model, field) for field in dict.fromkeys(requested)]
+
+
+def parse_expand(expand: str | None, allowed: tuple[str, ...]) -> list[str]:
+    # expand=customer,product – relacje dołączane do odpowiedzi w tym samym zapytaniu
+    if not expand:
+        return []
+    requested = [name.strip() for name in expand.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expand: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+def entity_to_dict(entity, expand=()) -> dict:
+    # Tylko kolumny i jawnie załadowane relacje – serializacja nie wyzwala leniwego ładowania
+    data = {column.key: getattr(entity, column.key) for column in inspect(entity).mapper.column_attrs}
+    for name in expand:
+        related = getattr(entity, name)
+        data[name] = entity_to_dict(related) if related is not None else None
+    return data
+
+
+async def fetch_page(db, model, filters=(), columns=None, cursor: int | None = None, limit: int = DEFAULT_PAGE_LIMIT, options=()):
+    # Keyset pagination po kluczu głównym: WHERE id > cursor ORDER BY id LIMIT n
+    # Koszt zapytania zależy od rozmiaru strony, a nie od liczby wierszy w tabeli
+    # Bez options (expand) pobieramy krotki kolumn i zwracamy słowniki – bez tworzenia obiektów ORM
+    if not columns and not options:
+        columns = model_columns(model)
+    statement = select(*columns) if columns else select(model).options(*options)
+    for condition in filters:
+        statement = statement.where(condition)
+    if cursor is not None:
+        statement = statement.where(model.id > cursor)
+    # Pobieramy jeden wiersz więcej, aby wiedzieć, czy istnieje następna strona
+    result = await db.execute(statement.order_by(model.id).limit(limit + 1))
+    rows = result.all() if columns else result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+
+    if columns:
+        rows = [dict(row._mapping) for row in rows]
+    return rows, next_cursor
@@ -0,0 +1,163 @@
+import datetime
+import sqlite3
+from sqlalchemy import String, cast, delete, func, select, update
+from sqlalchemy.exc import OperationalError
+from api.database.bulk import dialect_insert
+from api.models.order import Order
+from api.models.sales_summary import ReportWatermark, SalesDailyCustomerSummary, SalesDailyProductSummary
+
+SALES_GROUPINGS = ("product", "customer", "day", "month")
+# Nowa nazwa znacznika przy zmianie tabel podsumowań – istniejące bazy wypełniają je od pierwszego zamówienia
+SALES_SUMMARY_WATERMARK = "sales_daily_rollups"
+# Każdy agregat dzienny zawiera wszystkie zamówienia, więc dzień i miesiąc liczymy z agregatu produktowego
+SALES_SUMMARIES = ((SalesDailyProductSummary, "product_id"), (SalesDailyCustomerSummary, "customer_id"))
+
+# date() zwraca tekst w SQLite i typ date w PostgreSQL – rzutowanie daje "YYYY-MM-DD" w obu bazach
+ORDER_DAY = cast(func.date(Order.order_date), String)
+
+
+def _order_group_key(group_by: str):
+    return {
+        "product": Order.product_id,
+        "customer": Order.customer_id,
+        "day": ORDER_DAY,
+        "month": func.substr(ORDER_DAY, 1, 7),
+    }[group_by]
+
+
+def _summary_model(group_by: str):
+    return SalesDailyCustomerSummary if group_by == "customer" else SalesDailyProductSummary
+
+
+def _summary_group_key(group_by: str):
+    if group_by == "customer":
+        return SalesDailyCustomerSummary.customer_id
+    return {
+        "product": SalesDailyProductSummary.product_id,
+        "day": SalesDailyProductSummary.day,
+        "month": func.substr(SalesDailyProductSummary.day, 1, 7),
+    }[group_by]
+
+
+def sales_from_orders(group_by: str, date_from: datetime.date | None = None, date_to: datetime.date | None = None):
+    # Agregacja po stronie bazy: GROUP BY na tabeli orders
+    key = _order_group_key(group_by).label("key")
+    statement = select(
+        key,
+        func.count(Order.id).label("order_count"),
+        func.coalesce(func.sum(Order.quantity), 0).label("quantity_sum"),
+        func.coalesce(func.sum(Order.total_price), 0.0).label("total_price_sum"),
+    ).group_by(key).order_by(key)
+    if date_from is not None:
+        statement = statement.where(Order.order_date >= datetime.datetime.combine(date_from, datetime.time.min))
+    if date_to is not None:
+        statement = statement.where(Order.order_date < datetime.datetime.combine(date_to, datetime.time.min))
+    return statement
+
+
+def sales_from_summary(group_by: str, date_from: datetime.date | None = None, date_to: datetime.date | None = None):
+    # Ta sama agregacja na dziennym agregacie wymiaru – koszt zależy od liczby grup, a nie zamówień
+    model = _summary_model(group_by)
+    key = _summary_group_key(group_by).label("key")
+    statement = select(
+        key,
+        func.sum(model.order_count).label("order_count"),
+        func.sum(model.quantity_sum).label("quantity_sum"),
+        func.sum(model.total_price_sum).label("total_price_sum"),
+    ).group_by(key).order_by(key)
+    if date_from is not None:
+        statement = statement.where(model.day >= date_from.isoformat())
+    if date_to is not None:
+        statement = statement.where(model.day < date_to.isoformat())
+    return statement
+
+
+def sales_rows(result) -> list[dict]:
+    # Średnie liczone z sum i liczności, aby obie ścieżki (orders/summary) dawały identyczne wyniki
+    return [
+        {
+            "key": row.key,
+            "order_count": row.order_count,
+            "quantity_sum": row.quantity_sum,
+            "quantity_avg": row.quantity_sum / row.order_count if row.order_count else None,
+            "total_price_sum": round(row.total_price_sum, 2),
+            "total_price_avg": round(row.total_price_sum / row.order_count, 2) if row.order_count else None,
+        }
+        for row in result
+    ]
+
+
+def _is_sqlite_busy(error: OperationalError) -> bool:
+    # SQLITE_BUSY i kody rozszerzone (SQLITE_BUSY_SNAPSHOT = 517) – młodszy bajt to kod podstawowy
+    code = getattr(error.orig, "sqlite_errorcode", None)
+    return code is not None and code & 0xFF == sqlite3.SQLITE_BUSY
+
+
+def _add_orders_to_summary(db, model, column: str, first_order_id: int, last_order_id: int) -> None:
+    # INSERT ... SELECT z agregacją zamówień o id z przedziału (first, last]; istniejące dni sumujemy z nowymi
+    dimension = getattr(Order, column)
+    new_orders = (
+        select(
+            func.coalesce(ORDER_DAY, "1970-01-01"),
+            func.coalesce(dimension, 0),
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.quantity), 0),
+            func.coalesce(func.sum(Order.total_price), 0.0),
+        )
+        .where(Order.id > first_order_id, Order.id <= last_order_id)
+        .group_by(ORDER_DAY, dimension)
+    )
+    statement = dialect_insert(model, db.get_bind().dialect.name).from_select(
+        ["day", column, "order_count", "quantity_sum", "total_price_sum"], new_orders
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["day", column],
+        set_={
+            "order_count": model.order_count + statement.excluded.order_count,
+            "quantity_sum": model.quantity_sum + statement.excluded.quantity_sum,
+            "total_price_sum": model.total_price_sum + statement.excluded.total_price_sum,
+        },
+    )
+    db.execute(statement)
+
+
+def refresh_sales_summary(db, rebuild: bool = False) -> int:
+    # Odświeżenie przyrostowe: agregujemy tylko zamówienia o id większym niż znacznik i dodajemy do podsumowań.
+    # Znacznik śledzi wyłącznie Order.id – zmiana lub usunięcie już policzonego zamówienia nie trafia do podsumowań;
+    # rebuild=True przelicza je od zera ze wszystkich zamówień. Zwraca ostatnie Order.id uwzględnione w podsumowaniu.
+    watermark = db.get(ReportWatermark, SALES_SUMMARY_WATERMARK)
+    if watermark is None:
+        watermark = ReportWatermark(name=SALES_SUMMARY_WATERMARK, last_order_id=0)
+        db.add(watermark)
+        db.flush()
+    last_order_id = watermark.last_order_id
+    max_order_id = db.scalar(select(func.max(Order.id))) or 0
+    if max_order_id <= last_order_id and not rebuild:
+        db.commit()
+        return last_order_id
+
+    try:
+        # Przesunięcie znacznika jako pierwszy zapis transakcji: równoległe odświeżenie nie policzy tych zamówień drugi raz
+        moved = db.execute(
+            update(ReportWatermark)
+            .where(ReportWatermark.name == SALES_SUMMARY_WATERMARK, ReportWatermark.last_order_id == last_order_id)
+            .values(last_order_id=max_order_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not moved:
+            db.rollback()
+            return db.get(ReportWatermark, SALES_SUMMARY_WATERMARK).last_order_id
+
+        for model, column in SALES_SUMMARIES:
+            if rebuild:
+                db.execute(delete(model))
+            _add_orders_to_summary(db, model, column, 0 if rebuild else last_order_id, max_order_id)
+        db.commit()
+    except OperationalError as e:
+        # SQLite: inna transakcja zapisała znacznik po naszym odczycie (SQLITE_BUSY_SNAPSHOT) – pomijamy;
+        # pozostałe błędy (brak tabeli, uszkodzona baza, pełny dysk) przekazujemy dalej
+        if not _is_sqlite_busy(e):
+            raise
+        db.rollback()
+        return last_order_id
+    return max_order_id
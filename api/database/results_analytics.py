@@ -0,0 +1,185 @@
+import threading
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from sqlalchemy import func, select
+from api.models.test_result import TestResult
+
+# Analityka historii test_results liczona kolumnowo (pandas/NumPy): pass rate, percentyle duration_ms,
+# zmiana względem poprzedniego uruchomienia i regresje. Uruchomienie testu = kolejny wynik danego test_id
+# w danym środowisku (test_results nie ma identyfikatora przebiegu).
+ANALYTICS_CHUNK_SIZE = 50_000  # wierszy na zapytanie przy wczytywaniu historii
+DURATION_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+DEFAULT_REGRESSION_THRESHOLD = 0.5  # wolniej o 50% niż mediana poprzednich uruchomień
+TEST_KEYS = ["test_id", "environment"]
+MAX_CACHED_REPORTS = 32  # kombinacje environment/regression_threshold trzymane między wywołaniami
+
+COLUMNS = (TestResult.id, TestResult.test_id, TestResult.environment, TestResult.result, TestResult.duration_ms)
+
+
+def load_results(connection, after_id: int = 0, chunk_size: int = ANALYTICS_CHUNK_SIZE) -> pd.DataFrame:
+    # Porcje po kluczu głównym (id > ostatnie id porcji), każda od razu zamieniana na kolumny –
+    # w pamięci nie ma listy wszystkich wierszy ani obiektów ORM
+    chunks = []
+    while True:
+        rows = connection.execute(
+            select(*COLUMNS).where(TestResult.id > after_id).order_by(TestResult.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        chunks.append(_columnar(rows))
+        after_id = rows[-1][0]
+    return concat_results(chunks) if chunks else _columnar([])
+
+
+def _columnar(rows) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(rows, columns=["id", "test_id", "environment", "result", "duration_ms"])
+    return pd.DataFrame({
+        "id": frame["id"].astype(np.int64),
+        "test_id": frame["test_id"].astype("category"),
+        "environment": frame["environment"].fillna("local").astype("category"),
+        "passed": (frame["result"] == "passed").to_numpy(),
+        "duration_ms": frame["duration_ms"].astype(np.float64),  # NULL -> NaN, pomijane w percentylach
+    })
+
+
+def concat_results(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    # pd.concat zamienia kategorie o różnych słownikach na object – łączymy słowniki kategorii jawnie
+    combined = pd.concat(frames, ignore_index=True)
+    for column in ("test_id", "environment"):
+        combined[column] = union_categoricals([frame[column] for frame in frames])
+    return combined
+
+
+def duration_stats(grouped) -> pd.DataFrame:
+    stats = grouped.agg(runs=("passed", "size"), pass_rate=("passed", "mean"), mean_ms=("duration_ms", "mean"))
+    quantiles = grouped["duration_ms"].quantile(list(DURATION_PERCENTILES.values())).unstack()
+    quantiles.columns = [f"{name}_ms" for name in DURATION_PERCENTILES]
+    return stats.join(quantiles)
+
+
+def trend_stats(grouped, results: pd.DataFrame) -> pd.DataFrame:
+    # Dla każdej pary (test_id, environment): ostatnie i poprzednie uruchomienie oraz mediana czasu
+    # wszystkich wcześniejszych uruchomień – bez pętli po testach; wiersze są w kolejności id
+    last = grouped.nth(-1)
+    previous = grouped.nth(-2).set_index(TEST_KEYS)
+    baseline = results.drop(index=last.index).groupby(TEST_KEYS, observed=True)["duration_ms"].median()
+    last = last.set_index(TEST_KEYS)
+    trends = pd.DataFrame({
+        "last_result_id": last["id"],
+        "last_passed": last["passed"],
+        "last_duration_ms": last["duration_ms"],
+    })
+    trends["previous_passed"] = previous["passed"].reindex(trends.index)
+    trends["previous_duration_ms"] = previous["duration_ms"].reindex(trends.index)
+    trends["baseline_p50_ms"] = baseline.reindex(trends.index)
+    trends["duration_delta_ms"] = trends["last_duration_ms"] - trends["previous_duration_ms"]
+    trends["duration_delta_pct"] = trends["duration_delta_ms"] / trends["previous_duration_ms"].replace(0, np.nan)
+    return trends
+
+
+class ResultsAnalytics:
+    # Wczytana historia i policzone statystyki trzymane w pamięci procesu; kolejne wywołania dociągają
+    # tylko wyniki o id większym niż ostatnio widziane, a przy braku nowych zwracają gotowe statystyki.
+    # Odczyt z bazy (fetch) nie zmienia stanu; scalanie i obliczenia pandas mogą działać w wątkach puli
+    # (run_in_threadpool), więc stan współdzielony chroni blokada
+    def __init__(self, chunk_size: int = ANALYTICS_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.results = _columnar([])
+        self.last_id = 0
+        self._stats = None
+        self._reports = {}  # (environment, regression_threshold) -> gotowa odpowiedź
+
+    def fetch(self, connection) -> tuple[int, pd.DataFrame]:
+        # test_results tylko przyrasta (ResultWriter nie usuwa wierszy); max(id) mniejsze niż ostatnio widziane
+        # oznacza wyczyszczoną tabelę albo inną bazę – wtedy wczytujemy historię od nowa
+        max_id = connection.scalar(select(func.max(TestResult.id))) or 0
+        after_id = self.last_id if max_id >= self.last_id else 0
+        return max_id, load_results(connection, after_id, self.chunk_size)
+
+    def update(self, fetched: tuple[int, pd.DataFrame]) -> int:
+        max_id, new_results = fetched
+        with self._lock:
+            if max_id < self.last_id:
+                self._reset()
+            # Równoległe odświeżenie mogło dopisać te same wiersze, gdy czekaliśmy na bazę
+            new_results = new_results[new_results["id"] > self.last_id]
+            if len(new_results):
+                self.results = concat_results([self.results, new_results]) if len(self.results) else new_results
+                self.last_id = int(self.results["id"].iloc[-1])
+                self._stats = None
+                self._reports = {}
+            return len(new_results)
+
+    def refresh(self, connection) -> int:
+        return self.update(self.fetch(connection))
+
+    def stats(self) -> dict[str, pd.DataFrame]:
+        with self._lock:
+            return self._compute_stats()
+
+    def _compute_stats(self) -> dict[str, pd.DataFrame]:
+        if self._stats is None:
+            results = self.results
+            grouped = results.groupby(TEST_KEYS, observed=True)
+            tests = duration_stats(grouped).join(trend_stats(grouped, results))
+            environments = duration_stats(results.groupby("environment", observed=True))
+            self._stats = {"tests": tests, "environments": environments}
+        return self._stats
+
+    def report(self, connection, environment: str | None = None,
+               regression_threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> dict:
+        return self.fetched_report(self.fetch(connection), environment, regression_threshold)
+
+    def fetched_report(self, fetched: tuple[int, pd.DataFrame], environment: str | None = None,
+                       regression_threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> dict:
+        self.update(fetched)
+        key = (environment, regression_threshold)
+        with self._lock:
+            if key not in self._reports:
+                if len(self._reports) >= MAX_CACHED_REPORTS:
+                    self._reports.clear()
+                self._reports[key] = self._report(environment, regression_threshold)
+            return self._reports[key]
+
+    def _report(self, environment: str | None, regression_threshold: float) -> dict:
+        report = {"last_result_id": self.last_id, "results": len(self.results), "regression_threshold": regression_threshold}
+        if not len(self.results):
+            return {**report, "environments": [], "tests": [], "regressions": []}
+        stats = self._compute_stats()
+        tests, environments = stats["tests"], stats["environments"]
+        if environment is not None:
+            tests = tests[tests.index.get_level_values("environment") == environment]
+            environments = environments[environments.index == environment]
+        tests = tests.assign(regression=regressions(tests, regression_threshold))
+        return {
+            **report,
+            "environments": _records(environments),
+            "tests": _records(tests),
+            "regressions": _records(tests[tests["regression"].notna()]),
+        }
+
+
+def regressions(tests: pd.DataFrame, threshold: float) -> pd.Series:
+    # "status" – ostatnie uruchomienie nie przeszło, a poprzednie tak;
+    # "duration" – ostatni czas większy od mediany wcześniejszych uruchomień o więcej niż threshold
+    status = (tests["previous_passed"] == True) & ~tests["last_passed"]  # noqa: E712 – NaN (brak poprzedniego) to nie regresja
+    slower = tests["last_duration_ms"] > tests["baseline_p50_ms"] * (1 + threshold)
+    return pd.Series(np.select([status, slower], ["status", "duration"], default=None), index=tests.index, dtype=object)
+
+
+def _records(frame: pd.DataFrame) -> list[dict]:
+    # NaN (brak czasu, brak poprzedniego uruchomienia) jako null; typy NumPy zamieniane na typy Pythona
+    frame = frame.reset_index().round(4)
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+results_analytics = ResultsAnalytics()
@@ -0,0 +1,151 @@
+import re
+from sqlalchemy import column, or_, select, table, text, tuple_
+from api.database.query_utils import model_columns
+
+PRODUCT_SEARCH_TABLE = "products_fts"
+# Nazwa ważniejsza od opisu przy rankingu bm25
+PRODUCT_SEARCH_RANK = "bm25(10.0, 1.0)"
+
+# Litery bez rozkładu Unicode (ł nie jest "l z ogonkiem"), więc remove_diacritics ich nie upraszcza
+FOLDED_LETTERS = {"ł": "l", "Ł": "L"}
+
+
+def _fold_sql(expression: str) -> str:
+    for letter, replacement in FOLDED_LETTERS.items():
+        expression = f"replace({expression}, '{letter}', '{replacement}')"
+    return expression
+
+
+def _indexed_values(prefix: str) -> str:
+    return f"{prefix}id, {_fold_sql(prefix + 'name')}, {_fold_sql(prefix + 'description')}"
+
+
+# Indeks FTS5 bez własnej kopii treści (content='') – teksty są w products, indeks trzyma tylko tokeny.
+# Triggery zapisują "złożony" tekst (ł -> l), a remove_diacritics 2 usuwa pozostałe znaki diakrytyczne:
+# "sluchawki" znajduje "Słuchawki", a "głośniki" znajduje "Glosniki"
+PRODUCT_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {PRODUCT_SEARCH_TABLE} USING fts5(
+        name, description, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+        INSERT INTO {PRODUCT_SEARCH_TABLE}(rowid, name, description) VALUES ({_indexed_values("new.")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+        INSERT INTO {PRODUCT_SEARCH_TABLE}({PRODUCT_SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', {_indexed_values("old.")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO {PRODUCT_SEARCH_TABLE}({PRODUCT_SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', {_indexed_values("old.")});
+        INSERT INTO {PRODUCT_SEARCH_TABLE}(rowid, name, description) VALUES ({_indexed_values("new.")});
+    END""",
+]
+
+products_fts = table(PRODUCT_SEARCH_TABLE, column("rowid"), column("rank"))
+
+
+def drop_product_search_insert_trigger(connection):
+    # Ładowanie masowe: zamiast triggera na każdy wiersz – index_products_from po zakończeniu ładowania
+    connection.execute(text("DROP TRIGGER IF EXISTS products_fts_insert"))
+
+
+def index_products_from(connection, first_id: int):
+    # Indeksuje produkty o id >= first_id i przywraca trigger usunięty przez drop_product_search_insert_trigger
+    connection.execute(
+        text(f"INSERT INTO {PRODUCT_SEARCH_TABLE}(rowid, name, description) SELECT {_indexed_values('')} FROM products WHERE id >= :first_id"),
+        {"first_id": first_id},
+    )
+    create_product_search(connection)
+
+
+def create_product_search(connection, rebuild: bool = False) -> bool:
+    # Indeks i triggery synchronizujące tworzymy tylko w SQLite; inne bazy korzystają z LIKE
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": PRODUCT_SEARCH_TABLE}
+    ).first()
+    for statement in PRODUCT_SEARCH_DDL:
+        connection.execute(text(statement))
+    if not exists:
+        connection.execute(
+            text(f"INSERT INTO {PRODUCT_SEARCH_TABLE}({PRODUCT_SEARCH_TABLE}, rank) VALUES ('rank', :rank)"),
+            {"rank": PRODUCT_SEARCH_RANK},
+        )
+    if rebuild or not exists:
+        # Indeksuje produkty zapisane przed utworzeniem triggerów
+        connection.execute(text(f"INSERT INTO {PRODUCT_SEARCH_TABLE}({PRODUCT_SEARCH_TABLE}) VALUES ('delete-all')"))
+        connection.execute(text(
+            f"INSERT INTO {PRODUCT_SEARCH_TABLE}(rowid, name, description) SELECT {_indexed_values('')} FROM products"
+        ))
+    return True
+
+
+class InvalidSearchCursor(ValueError):
+    # Błąd danych wejściowych wyszukiwania – warstwa HTTP zamienia go na 400
+    pass
+
+
+def search_terms(q: str) -> list[str]:
+    # Tylko słowa – cudzysłowy, operatory FTS5 (AND/OR/NEAR, *, ^) i interpunkcja nie trafiają do zapytania
+    terms = re.findall(r"\w+", q)
+    for letter, replacement in FOLDED_LETTERS.items():
+        terms = [term.replace(letter, replacement) for term in terms]
+    return terms
+
+
+def match_expression(terms: list[str]) -> str:
+    # "laptop gaming" -> "laptop"* "gaming"* : wszystkie słowa (AND), każde jako prefiks
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def parse_search_cursor(cursor: str) -> tuple[float, int]:
+    # Kursor wyszukiwania to para (rank, id) ostatniego wiersza strony
+    try:
+        rank, product_id = cursor.split(":")
+        return float(rank), int(product_id)
+    except ValueError:
+        raise InvalidSearchCursor("Invalid cursor")
+
+
+def fts_search_statement(model, terms: list[str], cursor: tuple[float, int] | None, limit: int):
+    statement = (
+        select(*model_columns(model), products_fts.c.rank.label("search_rank"))
+        .join_from(products_fts, model, model.id == products_fts.c.rowid)
+        .where(text(f"{PRODUCT_SEARCH_TABLE} MATCH :query").bindparams(query=match_expression(terms)))
+    )
+    if cursor is not None:
+        statement = statement.where(tuple_(products_fts.c.rank, model.id) > tuple_(*cursor))
+    return statement.order_by(products_fts.c.rank, model.id).limit(limit + 1)
+
+
+def like_search_statement(model, terms: list[str], cursor: int | None, limit: int):
+    # Pełny skan tabeli – używany poza SQLite i jako punkt odniesienia w benchmarku
+    statement = select(*model_columns(model))
+    for term in terms:
+        pattern = f"%{term}%"
+        statement = statement.where(or_(model.name.ilike(pattern), model.description.ilike(pattern)))
+    if cursor is not None:
+        statement = statement.where(model.id > cursor)
+    return statement.order_by(model.id).limit(limit + 1)
+
+
+async def search_page(db, model, q: str, cursor: str | None, limit: int):
+    # Zwraca (produkty, następny kursor); w SQLite wyniki są posortowane według trafności (bm25)
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+
+    if db.get_bind().dialect.name == "sqlite":
+        position = parse_search_cursor(cursor) if cursor else None
+        rows = (await db.execute(fts_search_statement(model, terms, position, limit))).all()
+        next_cursor = f"{rows[limit - 1].search_rank!r}:{rows[limit - 1].id}" if len(rows) > limit else None
+        items = [{key: value for key, value in row._mapping.items() if key != "search_rank"} for row in rows]
+    else:
+        try:
+            position = int(cursor) if cursor else None
+        except ValueError:
+            raise InvalidSearchCursor("Invalid cursor")
+        items = [dict(row._mapping) for row in await db.execute(like_search_statement(model, terms, position, limit))]
+        next_cursor = str(items[limit - 1]["id"]) if len(items) > limit else None
+    return items[:limit], next_cursor
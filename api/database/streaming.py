@@ -0,0 +1,64 @@
+import csv
+import datetime
+import io
+import json
+from fastapi.responses import StreamingResponse
+from sqlalchemy import inspect, select
+
+# Liczba wierszy pobieranych z kursora bazy w jednej porcji
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Nie można zserializować wartości typu {type(value).__name__}")
+
+
+async def stream_rows(session_factory, columns, chunk_size: int = EXPORT_CHUNK_SIZE):
+    # Generator ma własną sesję – zależność get_db jest zamykana, zanim odpowiedź zacznie być wysyłana
+    async with session_factory() as db:
+        statement = select(*columns).order_by(columns[0])
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        # Kolumny zamiast obiektów ORM: w pamięci jest tylko bieżąca porcja krotek
+        async for partition in result.partitions():
+            yield partition
+
+
+async def encode_ndjson(names, partitions):
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+async def encode_csv(names, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Pusta tabela – wysyłamy przynajmniej nagłówek
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def export_response(session_factory, model, export_format: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+    columns = list(inspect(model).columns)
+    names = [column.key for column in columns]
+    partitions = stream_rows(session_factory, columns, chunk_size)
+    encoder = encode_csv if export_format == "csv" else encode_ndjson
+    return StreamingResponse(
+        encoder(names, partitions),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{model.__tablename__}.{export_format}"'},
+    )
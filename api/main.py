@@ -1,10 +1,25 @@
 from fastapi import FastAPI
-from api.routes import rest_api
+from fastapi.responses import ORJSONResponse, Response
+from api.metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, registry
+from api.profiling import SQL_PROFILE, SqlProfilingMiddleware
+from api.routes import rest_api, reports_api, soap_api
 from api.database.db_utils import init_db
 
-app = FastAPI()
+# orjson zamiast json – szybsza serializacja odpowiedzi
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Metryki per trasa (czas, czas SQL, wiersze, bajty odpowiedzi) – wyłączane przez METRICS_ENABLED=0
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Profil SQL żądania (log wolnych zapytań, Server-Timing) – SQL_PROFILE=on/header/off, domyślnie wyłączony
+if SQL_PROFILE != "off":
+    app.add_middleware(SqlProfilingMiddleware)
 
 app.include_router(rest_api.router, prefix="/api/v1")
+app.include_router(reports_api.router, prefix="/api/v1")
+# SOAP pod /soap/ (bez prefiksu /api/v1) – ta sama ścieżka co w soap_server.py
+app.include_router(soap_api.router)
 
 @app.on_event("startup")
 async def startup_event():
@@ -12,4 +27,9 @@ async def startup_event():
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the Online Store API"}
\ No newline at end of file
+    return {"message": "Welcome to the Online Store API"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Format tekstowy Prometheusa; liczniki bieżącego procesu (workera)
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
\ No newline at end of file
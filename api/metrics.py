@@ -0,0 +1,157 @@
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Metryki żądań HTTP w formacie tekstowym Prometheusa (GET /metrics): per trasa histogramy czasu całkowitego,
+# czasu w SQLAlchemy, liczby wierszy z bazy i rozmiaru odpowiedzi.
+# Liczniki są per proces (każdy worker uvicorn ma własne) i aktualizowane tylko z pętli zdarzeń – bez blokad.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "off")
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED_ROUTE = "unmatched"  # 404 bez trasy – jedna etykieta zamiast ścieżki z żądania (liczba serii)
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROWS_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+BYTES_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+HISTOGRAMS = (
+    # (nazwa, opis, granice kubełków) – kolejność jak w RouteMetrics.observe
+    ("http_request_duration_seconds", "Total request time", SECONDS_BUCKETS),
+    ("http_request_db_duration_seconds", "Time spent executing SQL statements per request", SECONDS_BUCKETS),
+    ("http_request_db_rows", "Rows returned or affected by SQL statements per request", ROWS_BUCKETS),
+    ("http_response_size_bytes", "Response body size", BYTES_BUCKETS),
+)
+
+# [czas SQL w sekundach, wiersze, liczba instrukcji] bieżącego żądania; None poza żądaniem (skrypty, start aplikacji)
+_request_db: ContextVar[list | None] = ContextVar("request_db", default=None)
+
+
+class RouteMetrics:
+    __slots__ = ("counts", "sums", "requests", "queries")
+
+    def __init__(self):
+        # Liczniki kubełków nieskumulowane (ostatni = +Inf); sumowanie dopiero przy renderowaniu /metrics
+        self.counts = [[0] * (len(buckets) + 1) for _, _, buckets in HISTOGRAMS]
+        self.sums = [0.0] * len(HISTOGRAMS)
+        self.requests = 0
+        self.queries = 0
+
+    def observe(self, duration: float, db_duration: float, db_rows: int, response_bytes: int, queries: int):
+        # Rozpisane ręcznie (bez pętli po HISTOGRAMS) – wykonywane przy każdym żądaniu
+        counts, sums = self.counts, self.sums
+        counts[0][bisect_left(SECONDS_BUCKETS, duration)] += 1
+        counts[1][bisect_left(SECONDS_BUCKETS, db_duration)] += 1
+        counts[2][bisect_left(ROWS_BUCKETS, db_rows)] += 1
+        counts[3][bisect_left(BYTES_BUCKETS, response_bytes)] += 1
+        sums[0] += duration
+        sums[1] += db_duration
+        sums[2] += db_rows
+        sums[3] += response_bytes
+        self.requests += 1
+        self.queries += queries
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str, int], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float, db: list, response_bytes: int):
+        key = (method, route, status)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.observe(duration, db[0], db[1], response_bytes, db[2])
+
+    def clear(self):
+        self.routes.clear()
+
+    def render(self) -> str:
+        lines = []
+        routes = sorted(self.routes.items())
+        for position, (name, description, buckets) in enumerate(HISTOGRAMS):
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for (method, route, status), metrics in routes:
+                labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ("+Inf",), metrics.counts[position]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {metrics.sums[position]:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {metrics.requests}")
+        lines += ["# HELP http_request_db_queries_total SQL statements executed", "# TYPE http_request_db_queries_total counter"]
+        for (method, route, status), metrics in routes:
+            lines.append(f'http_request_db_queries_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {metrics.queries}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_db.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db = _request_db.get()
+    if db is None or not conn.info.get("metrics_query_start"):
+        return
+    db[0] += time.perf_counter() - conn.info["metrics_query_start"].pop()
+    # DML: rowcount; SELECT w adapterach asynchronicznych (aiosqlite) – wiersze pobrane już przy execute.
+    # Kursor po stronie serwera (eksport strumieniowy) nie zna liczby wierszy z góry – liczymy 0.
+    db[1] += cursor.rowcount if cursor.rowcount >= 0 else len(getattr(cursor, "_rows", ()))
+    db[2] += 1
+
+
+def install_engine_listeners():
+    # Słuchacze na klasie Engine obejmują wszystkie silniki (zapis, odczyt, testowe) bez przekazywania ich tutaj
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def remove_engine_listeners():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    # Czyste middleware ASGI (bez BaseHTTPMiddleware) – nie buforuje odpowiedzi, więc strumienie zostają strumieniami
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+        install_engine_listeners()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        db = [0.0, 0, 0]
+        token = _request_db.set(db)
+        status = 500
+        response_bytes = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _request_db.reset(token)
+            # Szablon ścieżki z dopasowanej trasy FastAPI ("/api/v1/products/{product_id}"), a nie ścieżka z żądania
+            route = scope.get("route")
+            self.registry.observe(scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status,
+                                  time.perf_counter() - start, db, response_bytes)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from api.database.db_config import Base
+
+# Lokalny indeks test_id -> klucz defektu w JIRA; runner nie szuka defektów przez JQL przy każdym niepowodzeniu
+class DefectKey(Base):
+    __tablename__ = "defect_keys"
+    test_id = Column(String, primary_key=True)  # także przypadki SOAP, których nie ma w test_cases
+    defect_key = Column(String, nullable=False)  # np. "SCRUM-77"
+    updated_at = Column(DateTime)  # czas zapisu w indeksie
+
+# Znacznik ostatniej synchronizacji indeksu z JIRA (JQL updated >= last_sync)
+class JiraSyncState(Base):
+    __tablename__ = "jira_sync_state"
+    name = Column(String, primary_key=True)
+    last_sync = Column(DateTime)
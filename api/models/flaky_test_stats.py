@@ -0,0 +1,17 @@
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
+from api.database.db_config import Base
+
+# Liczniki niestabilności per test_id, aktualizowane przyrostowo z test_results (runner/flaky.py):
+# zmiany wyniku między kolejnymi uruchomieniami i niepowodzenia skupione w czasie
+class FlakyTestStats(Base):
+    __tablename__ = "flaky_test_stats"
+    test_id = Column(String, primary_key=True)
+    runs = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    flips = Column(Integer, default=0)  # passed -> not passed albo odwrotnie względem poprzedniego wyniku
+    clustered_failures = Column(Integer, default=0)  # niepowodzenia krótko po poprzednim niepowodzeniu (awaria, regresja)
+    last_failed = Column(Boolean)
+    last_streak = Column(Integer, default=0)  # liczba ostatnich wyników z rzędu równych ostatniemu
+    last_result_id = Column(Integer, index=True)  # max(last_result_id) = znacznik postępu skanowania
+    last_failure_at = Column(DateTime, nullable=True)
+    flaky_score = Column(Float, default=0.0)
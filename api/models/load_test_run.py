@@ -0,0 +1,28 @@
+import datetime
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from api.database.db_config import Base
+
+# Podsumowanie jednego przebiegu obciążeniowego (runner.load) – obok wyników funkcjonalnych w test_results
+class LoadTestRun(Base):
+    __tablename__ = "load_test_runs"
+    id = Column(Integer, primary_key=True, index=True)
+    started_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    base_url = Column(String)
+    test_ids = Column(String)  # przypadki z test_cases, np. "TC_003,TC_014"
+    mode = Column(String)  # "rps" (stałe tempo żądań) lub "concurrency" (stała liczba klientów)
+    target_rps = Column(Float, nullable=True)
+    concurrency = Column(Integer)
+    duration_s = Column(Float)
+    requests = Column(Integer)
+    errors = Column(Integer)
+    error_rate = Column(Float)
+    achieved_rps = Column(Float)
+    p50_ms = Column(Float)
+    p90_ms = Column(Float)
+    p99_ms = Column(Float)
+    p999_ms = Column(Float)
+    max_ms = Column(Float)
+    mean_ms = Column(Float)
+    histogram = Column(Text)  # JSON LatencyHistogram.to_dict() – do łączenia przebiegów
+    cases = Column(Text)  # JSON: podsumowanie i błędy per test_id
+    environment = Column(String, default="local")
@@ -13,7 +13,7 @@ class Order(Base):
     customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     product_id = Column(Integer, ForeignKey("products.id"), index=True)
     quantity = Column(Integer)
-    order_date = Column(DateTime, default=datetime.datetime.utcnow)
+    order_date = Column(DateTime, default=datetime.datetime.utcnow, index=True)
     total_price = Column(Float)
 
     # Relacje
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean
+from sqlalchemy import Column, Integer, String, Float, Boolean, event
 from api.database.db_config import Base
+from api.database.search import create_product_search
 
 class Product(Base):
     __tablename__ = "products"
@@ -7,5 +8,8 @@ class Product(Base):
     name = Column(String, index=True)
     description = Column(String)
     price = Column(Float)
-    available = Column(Boolean, default=True)  # Domyślnie produkt jest dostępny
-    stock = Column(Integer, default=0)         # Domyślnie brak na stanie
\ No newline at end of file
+    available = Column(Boolean, default=True, index=True)  # Domyślnie produkt jest dostępny
+    stock = Column(Integer, default=0)         # Domyślnie brak na stanie
+
+# Indeks pełnotekstowy (FTS5) powstaje razem z tabelą products
+event.listen(Product.__table__, "after_create", lambda target, connection, **kw: create_product_search(connection, rebuild=True))
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, Float, String
+from api.database.db_config import Base
+
+# Zmaterializowane podsumowania sprzedaży – osobne dzienne agregaty na każdy wymiar raportu,
+# aby liczba wierszy zależała od liczby (dzień, produkt) lub (dzień, klient), a nie od liczby zamówień
+class SalesDailyProductSummary(Base):
+    __tablename__ = "sales_daily_product_summary"
+    day = Column(String, primary_key=True)  # "YYYY-MM-DD"
+    product_id = Column(Integer, primary_key=True, index=True)  # 0 = zamówienie bez produktu
+    order_count = Column(Integer, default=0)
+    quantity_sum = Column(Integer, default=0)
+    total_price_sum = Column(Float, default=0.0)
+
+class SalesDailyCustomerSummary(Base):
+    __tablename__ = "sales_daily_customer_summary"
+    day = Column(String, primary_key=True)  # "YYYY-MM-DD"
+    customer_id = Column(Integer, primary_key=True, index=True)  # 0 = zamówienie bez klienta
+    order_count = Column(Integer, default=0)
+    quantity_sum = Column(Integer, default=0)
+    total_price_sum = Column(Float, default=0.0)
+
+# Znacznik postępu odświeżania przyrostowego (ostatnie przetworzone Order.id)
+class ReportWatermark(Base):
+    __tablename__ = "report_watermarks"
+    name = Column(String, primary_key=True)
+    last_order_id = Column(Integer, default=0)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from api.database.db_config import Base
+
+# Podsumowanie historii wyników dla każdego test_id – aktualizowane razem z zapisem partii test_results,
+# aby runner nie liczył COUNT(*) ani nie przeglądał całej historii przy każdym uruchomieniu
+class TestCaseStats(Base):
+    __tablename__ = "test_case_stats"
+    test_id = Column(String, primary_key=True)  # także przypadki SOAP, których nie ma w test_cases
+    run_count = Column(Integer, default=0)  # liczba zapisanych wyników
+    last_result = Column(String, index=True)  # "passed" lub "not passed"
+    last_status = Column(Integer)
+    last_duration_ms = Column(Integer, nullable=True)
+    last_defect_key = Column(String, nullable=True)  # ostatni znany klucz defektu w JIRA
+    last_run_at = Column(DateTime)
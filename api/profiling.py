@@ -0,0 +1,182 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Profilowanie SQL per żądanie: każda instrukcja z czasem i kształtem parametrów (typy, bez wartości),
+# log wolnych i powtarzanych instrukcji, opcjonalnie EXPLAIN QUERY PLAN oraz nagłówek Server-Timing (czas SQL i aplikacji).
+# SQL_PROFILE: "on" – każde żądanie, "header" – tylko żądania z nagłówkiem X-SQL-Profile, "off" (domyślnie) – middleware
+# wyłączone. Nagłówek działa dopiero po włączeniu przez operatora – klient nie może sam wymusić profilu i EXPLAIN.
+SQL_PROFILE = os.getenv("SQL_PROFILE", "off")
+SQL_PROFILE_HEADER = b"x-sql-profile"  # wartość "1" – profil, "explain" – profil z planami zapytań
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", "10"))  # ta sama instrukcja N razy – podejrzenie N+1
+SQL_PROFILE_EXPLAIN = os.getenv("SQL_PROFILE_EXPLAIN", "0") in ("1", "true", "on")
+MAX_PROFILED_STATEMENTS = 1000  # limit pamięci dla żądań wykonujących bardzo wiele instrukcji
+MAX_LOGGED_STATEMENT_LENGTH = 2000
+
+logger = logging.getLogger("api.sql")
+
+
+@dataclass
+class StatementProfile:
+    statement: str
+    parameters: str  # kształt parametrów, np. "(int, str)" albo "500 × (str, float)"
+    duration_ms: float
+    rows: int
+    plan: list[str] | None = None
+
+
+@dataclass
+class RequestProfile:
+    explain: bool = False
+    statements: list[StatementProfile] = field(default_factory=list)
+    db_ms: float = 0.0
+    count: int = 0  # wszystkie instrukcje, także ponad MAX_PROFILED_STATEMENTS
+
+    def repeated(self) -> list[tuple[str, int]]:
+        counts = Counter(statement.statement for statement in self.statements)
+        return [(statement, count) for statement, count in counts.most_common() if count >= REPEATED_QUERY_THRESHOLD]
+
+
+_request_profile: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def parameters_shape(parameters, executemany: bool = False) -> str:
+    # Same typy – wartości (dane klientów, hasła) nie trafiają do logów; powtórzenia zwijane: "(int × 20)"
+    if executemany:
+        parameters = list(parameters)
+        return f"{len(parameters)} × {parameters_shape(parameters[0])}" if parameters else "0 × ()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    groups = []
+    for value in parameters or ():
+        name = type(value).__name__
+        if groups and groups[-1][0] == name:
+            groups[-1][1] += 1
+        else:
+            groups.append([name, 1])
+    return "(" + ", ".join(name if count == 1 else f"{name} × {count}" for name, count in groups) + ")"
+
+
+def explain(conn, statement: str, parameters) -> list[str]:
+    # Surowy kursor DBAPI – bez ponownego wywołania słuchaczy zdarzeń; działa też w aiosqlite (wewnątrz greenletu)
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _request_profile.get()
+    if profile is None or not conn.info.get("profile_query_start"):
+        return
+    duration_ms = (time.perf_counter() - conn.info["profile_query_start"].pop()) * 1000
+    profile.db_ms += duration_ms
+    profile.count += 1
+    if len(profile.statements) >= MAX_PROFILED_STATEMENTS:
+        return
+    rows = cursor.rowcount if cursor.rowcount >= 0 else len(getattr(cursor, "_rows", ()))
+    record = StatementProfile(statement, parameters_shape(parameters, executemany), duration_ms, rows)
+    # Plan tylko dla wolnych SELECT-ów – EXPLAIN dla każdej instrukcji podwoiłby liczbę zapytań
+    if (profile.explain and duration_ms >= SLOW_QUERY_MS and not executemany
+            and statement.lstrip()[:6].upper() in ("SELECT", "WITH")):
+        try:
+            record.plan = explain(conn, statement, parameters)
+        except Exception as e:
+            record.plan = [f"EXPLAIN nieudany: {e}"]
+    profile.statements.append(record)
+
+
+def install_engine_listeners():
+    # Jak w api/metrics.py – słuchacze na klasie Engine obejmują wszystkie silniki
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def remove_engine_listeners():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(profile: RequestProfile, total_ms: float) -> bytes:
+    app_ms = max(total_ms - profile.db_ms, 0.0)
+    return (f'db;dur={profile.db_ms:.2f};desc="SQL ({profile.count})", '
+            f'app;dur={app_ms:.2f}, total;dur={total_ms:.2f}').encode()
+
+
+def _shorten(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > MAX_LOGGED_STATEMENT_LENGTH:
+        return statement[:MAX_LOGGED_STATEMENT_LENGTH] + "…"
+    return statement
+
+
+def log_profile(method: str, path: str, profile: RequestProfile, total_ms: float):
+    for record in profile.statements:
+        if record.duration_ms >= SLOW_QUERY_MS:
+            logger.warning("Wolne zapytanie %.1f ms (%s %s, parametry %s, wiersze %d): %s%s", record.duration_ms,
+                           method, path, record.parameters, record.rows, _shorten(record.statement),
+                           "".join(f"\n    plan: {line}" for line in record.plan or ()))
+        else:
+            logger.debug("SQL %.1f ms (%s %s, parametry %s, wiersze %d): %s", record.duration_ms,
+                         method, path, record.parameters, record.rows, _shorten(record.statement))
+    for statement, count in profile.repeated():
+        logger.warning("Zapytanie powtórzone %d razy w jednym żądaniu (%s %s): %s", count, method, path, _shorten(statement))
+    logger.info("%s %s: %d instrukcji SQL, SQL %.1f ms z %.1f ms", method, path, profile.count, profile.db_ms, total_ms)
+
+
+def explain_mode(scope) -> bool | None:
+    # None – żądanie bez profilu; True/False – profil z planami zapytań albo bez
+    if SQL_PROFILE == "on":
+        return SQL_PROFILE_EXPLAIN
+    if SQL_PROFILE != "header":
+        return None
+    for name, value in scope["headers"]:
+        if name == SQL_PROFILE_HEADER and value not in (b"", b"0"):
+            return SQL_PROFILE_EXPLAIN or value == b"explain"
+    return None
+
+
+class SqlProfilingMiddleware:
+    # Czyste middleware ASGI jak MetricsMiddleware; bez profilu koszt to przejrzenie nagłówków żądania
+    def __init__(self, app):
+        self.app = app
+        install_engine_listeners()
+
+    async def __call__(self, scope, receive, send):
+        explain_plans = explain_mode(scope) if scope["type"] == "http" else None
+        if explain_plans is None:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        profile = RequestProfile(explain=explain_plans)
+        token = _request_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                # Przy odpowiedziach strumieniowych nagłówek obejmuje tylko SQL wykonany przed wysłaniem nagłówków
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = [*message.get("headers", ()), (b"server-timing", server_timing(profile, total_ms))]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_profile.reset(token)
+            log_profile(scope["method"], scope["path"], profile, (time.perf_counter() - start) * 1000)
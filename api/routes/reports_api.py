@@ -0,0 +1,57 @@
+import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.database.reports import (
+    SALES_SUMMARY_WATERMARK, refresh_sales_summary, sales_from_orders, sales_from_summary, sales_rows,
+)
+from api.database.results_analytics import DEFAULT_REGRESSION_THRESHOLD, results_analytics
+from api.models.sales_summary import ReportWatermark
+from api.routes.rest_api import get_db, get_read_db
+
+router = APIRouter()
+
+SalesGrouping = Literal["product", "customer", "day", "month"]
+SalesSource = Literal["orders", "summary"]
+
+# Raporty sprzedaży liczone w bazie (GROUP BY), zamiast pobierania wszystkich zamówień przez klienta
+@router.get("/reports/sales")
+async def get_sales_report(
+    group_by: SalesGrouping = "day",
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    source: SalesSource = "orders",
+    db: AsyncSession = Depends(get_read_db),
+):
+    report = {"group_by": group_by, "source": source, "date_from": date_from, "date_to": date_to}
+    if source == "summary":
+        # Podsumowanie ma dokładność dnia; odświeżane przez POST /reports/sales/refresh
+        statement = sales_from_summary(group_by, date_from, date_to)
+        report["last_order_id"] = await db.scalar(
+            select(ReportWatermark.last_order_id).where(ReportWatermark.name == SALES_SUMMARY_WATERMARK)
+        ) or 0
+    else:
+        statement = sales_from_orders(group_by, date_from, date_to)
+    report["rows"] = sales_rows(await db.execute(statement))
+    return report
+
+# Przyrostowo dolicza zamówienia o id większym niż znacznik; zmienione lub usunięte zamówienia
+# pojawiają się w podsumowaniu dopiero po przeliczeniu od zera (rebuild=true)
+@router.post("/reports/sales/refresh")
+async def refresh_sales_report(rebuild: bool = False, db: AsyncSession = Depends(get_db)):
+    last_order_id = await db.run_sync(refresh_sales_summary, rebuild)
+    return {"last_order_id": last_order_id}
+
+# Statystyki historii test_results (pass rate, percentyle czasu, zmiany względem poprzedniego uruchomienia, regresje).
+# Liczone w pandas na danych w pamięci procesu; każde wywołanie wczytuje tylko wyniki dopisane od poprzedniego.
+# Z bazy czytamy przez sesję asynchroniczną, a obliczenia pandas idą do puli wątków – nie blokują pętli zdarzeń.
+@router.get("/test-results/stats")
+async def get_test_results_stats(
+    environment: str | None = None,
+    regression_threshold: float = Query(DEFAULT_REGRESSION_THRESHOLD, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    fetched = await db.run_sync(results_analytics.fetch)
+    return await run_in_threadpool(results_analytics.fetched_report, fetched, environment, regression_threshold)
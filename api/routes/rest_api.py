@@ -1,20 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from api.database.db_config import SessionLocal
+import datetime
+from typing import Literal
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from api.cache import CacheEntry, cached_json_response, product_cache
+from api.database.db_config import AsyncReadSessionLocal, AsyncSessionLocal
+from api.database.bulk import DEFAULT_BULK_CHUNK_SIZE, MAX_BULK_CHUNK_SIZE, bulk_delete, bulk_insert, bulk_summary, bulk_update
+from api.database.search import InvalidSearchCursor, search_page
+from api.database.streaming import export_response
+from api.database.query_utils import (
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, NEXT_CURSOR_HEADER, entity_to_dict, fetch_page, model_columns, parse_expand,
+    parse_fields,
+)
 from api.models.product import Product
 from api.models.test_case import TestCase
 from api.models.customer import Customer
 from api.models.order import Order
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    # Sesja na silniku tylko do odczytu – dla endpointów GET
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def get_session_factory():
+    # Eksport strumieniowy otwiera własną sesję na czas wysyłania odpowiedzi
+    return AsyncReadSessionLocal
+
+ExportFormat = Literal["ndjson", "csv"]
+ORDER_EXPANSIONS = ("customer", "product")
+BulkMode = Literal["atomic", "best_effort"]
 
 # Model Pydantic do walidacji danych wejściowych dla produktu
 class ProductCreate(BaseModel):
@@ -31,55 +53,272 @@ class ProductUpdate(BaseModel):
     available: bool | None = None
     stock: int | None = Field(None, ge=0)
 
+class ProductBulkUpdate(ProductUpdate):
+    id: int
+
+# Modele odpowiedzi – kolumny w bazie dopuszczają NULL, a przy fields= zwracamy tylko wybrane pola
+# (response_model_exclude_unset), dlatego wszystkie pola poza id są opcjonalne
+class ProductOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str | None = None
+    description: str | None = None
+    price: float | None = None
+    available: bool | None = None
+    stock: int | None = None
+
+class CustomerOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    first_name: str | None = None
+    last_name: str | None = None
+    email: str | None = None
+    phone: str | None = None
+    address: str | None = None
+
+class OrderOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    customer_id: int | None = None
+    product_id: int | None = None
+    quantity: int | None = None
+    order_date: datetime.datetime | None = None
+    total_price: float | None = None
+    customer: CustomerOut | None = None  # tylko z expand=customer
+    product: ProductOut | None = None  # tylko z expand=product
+
+class TestCaseOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    test_id: str | None = None
+    description: str | None = None
+    endpoint: str | None = None
+    method: str | None = None
+    test_type: str | None = None
+    expected_status: int | None = None
+    expected_response: str | None = None
+
+def set_next_cursor(response: Response, next_cursor: int | None):
+    # Klient pobiera kolejną stronę, przekazując tę wartość jako ?cursor=
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+
 # CRUD dla Products
-@router.get("/products")
-async def get_products(db: Session = Depends(get_db)):
-    return db.query(Product).all()
-
-@router.get("/products/{product_id}")
-async def get_product(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+# Lista i pojedynczy produkt zwracają gotowe ciało z cache – response_model opisuje je w dokumentacji OpenAPI
+@router.get("/products", response_model=list[ProductOut])
+async def get_products(
+    request: Request,
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    name: str | None = None,
+    available: bool | None = None,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    filters = []
+    if name is not None:
+        filters.append(Product.name == name)
+    if available is not None:
+        filters.append(Product.available == available)
+    columns = parse_fields(Product, fields)
+
+    async def load_page():
+        items, next_cursor = await fetch_page(db, Product, filters, columns, cursor, limit)
+        headers = {NEXT_CURSOR_HEADER: str(next_cursor)} if next_cursor is not None else {}
+        return CacheEntry.from_content(items, headers)
+
+    params = {"cursor": cursor, "limit": limit, "name": name, "available": available, "fields": fields}
+    entry = await product_cache.get_product_list(params, load_page)
+    return cached_json_response(request, entry)
+
+def bulk_response(response: Response, mode: str, statuses: list[dict], success_status: int):
+    summary = bulk_summary(mode, statuses)
+    if not summary["failed"]:
+        response.status_code = success_status
+    elif mode == "atomic":
+        response.status_code = 409  # cała partia została wycofana
+    else:
+        response.status_code = 207  # część elementów zapisana, część odrzucona
+    return summary
+
+# Operacje masowe – zarejestrowane przed /products/{product_id}
+@router.post("/products/bulk", status_code=201)
+async def create_products_bulk(
+    response: Response,
+    products: list[ProductCreate],
+    mode: BulkMode = "atomic",
+    chunk_size: int = Query(DEFAULT_BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_CHUNK_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = [product.dict() for product in products]
+    # Logika partii jest synchroniczna – run_sync wykonuje ją na połączeniu asynchronicznym
+    statuses = await db.run_sync(bulk_insert, Product, rows, chunk_size, mode)
+    await product_cache.invalidate_products()
+    return bulk_response(response, mode, statuses, 201)
+
+@router.patch("/products/bulk")
+async def update_products_bulk(
+    response: Response,
+    products: list[ProductBulkUpdate],
+    mode: BulkMode = "atomic",
+    chunk_size: int = Query(DEFAULT_BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_CHUNK_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = [product.dict(exclude_unset=True) for product in products]
+    statuses = await db.run_sync(bulk_update, Product, rows, chunk_size, mode)
+    await product_cache.invalidate_products()
+    return bulk_response(response, mode, statuses, 200)
+
+@router.delete("/products/bulk")
+async def delete_products_bulk(
+    response: Response,
+    ids: list[int] = Body(...),
+    mode: BulkMode = "atomic",
+    chunk_size: int = Query(DEFAULT_BULK_CHUNK_SIZE, ge=1, le=MAX_BULK_CHUNK_SIZE),
+    db: AsyncSession = Depends(get_db),
+):
+    statuses = await db.run_sync(bulk_delete, Product, ids, chunk_size, mode)
+    await product_cache.invalidate_products()
+    return bulk_response(response, mode, statuses, 200)
+
+# Wyszukiwanie pełnotekstowe w nazwie i opisie – zarejestrowane przed /products/{product_id}
+@router.get("/products/search", response_model=list[ProductOut])
+async def search_products(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    async def load_results():
+        items, next_cursor = await search_page(db, Product, q, cursor, limit)
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor is not None else {}
+        return CacheEntry.from_content(items, headers)
+
+    params = {"search": q, "cursor": cursor, "limit": limit}
+    try:
+        entry = await product_cache.get_product_list(params, load_results)
+    except InvalidSearchCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cached_json_response(request, entry)
+
+# Eksport musi być zarejestrowany przed /products/{product_id}
+@router.get("/products/export")
+async def export_products(format: ExportFormat = "ndjson", session_factory=Depends(get_session_factory)):
+    return export_response(session_factory, Product, format)
+
+@router.get("/products/{product_id}", response_model=ProductOut)
+async def get_product(product_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def load_product():
+        result = await db.execute(select(*model_columns(Product)).where(Product.id == product_id))
+        product = result.mappings().first()
+        return CacheEntry.from_content(dict(product)) if product else None
+
+    entry = await product_cache.get_product(product_id, load_product)
+    if not entry:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return cached_json_response(request, entry)
 
-@router.post("/products", status_code=201)
-async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+@router.post("/products", status_code=201, response_model=ProductOut)
+async def create_product(product: ProductCreate, db: AsyncSession = Depends(get_db)):
     db_product = Product(**product.dict())
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await product_cache.invalidate_products()
     return db_product
 
-@router.put("/products/{product_id}")
-async def update_product(product_id: int, product: ProductUpdate, db: Session = Depends(get_db)):
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+@router.put("/products/{product_id}", response_model=ProductOut)
+async def update_product(product_id: int, product: ProductUpdate, db: AsyncSession = Depends(get_db)):
+    db_product = await db.get(Product, product_id)
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
     for key, value in product.dict(exclude_unset=True).items():
         setattr(db_product, key, value)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await product_cache.invalidate_products()
     return db_product
 
 @router.delete("/products/{product_id}", status_code=204)
-async def delete_product(product_id: int, db: Session = Depends(get_db)):
-    db_product = db.query(Product).filter(Product.id == product_id).first()
+async def delete_product(product_id: int, db: AsyncSession = Depends(get_db)):
+    db_product = await db.get(Product, product_id)
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
-    db.delete(db_product)
-    db.commit()
+    await db.delete(db_product)
+    await db.commit()
+    await product_cache.invalidate_products()
     return {"detail": "Product deleted"}
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return await product_cache.stats()
+
 # Pozostałe endpointy
-@router.get("/customers")
-async def get_customers(db: Session = Depends(get_db)):
-    return db.query(Customer).all()
+@router.get("/customers", response_model=list[CustomerOut], response_model_exclude_unset=True)
+async def get_customers(
+    response: Response,
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    items, next_cursor = await fetch_page(db, Customer, (), parse_fields(Customer, fields), cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return items
+
+async def fetch_orders(response: Response, db: AsyncSession, filters, fields, expand, cursor, limit):
+    expand_names = parse_expand(expand, ORDER_EXPANSIONS)
+    if expand_names and fields:
+        raise HTTPException(status_code=400, detail="fields cannot be combined with expand")
+    # Relacje wiele-do-jednego dociągamy JOIN-em w tym samym zapytaniu – bez zapytania na każdy wiersz (N+1)
+    options = [joinedload(getattr(Order, name)) for name in expand_names]
+    items, next_cursor = await fetch_page(db, Order, filters, parse_fields(Order, fields), cursor, limit, options)
+    set_next_cursor(response, next_cursor)
+    if expand_names:
+        return [entity_to_dict(order, expand_names) for order in items]
+    return items
+
+@router.get("/customers/{customer_id}/orders", response_model=list[OrderOut], response_model_exclude_unset=True)
+async def get_customer_orders(
+    customer_id: int,
+    response: Response,
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not await db.get(Customer, customer_id):
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return await fetch_orders(response, db, [Order.customer_id == customer_id], None, expand, cursor, limit)
+
+@router.get("/orders", response_model=list[OrderOut], response_model_exclude_unset=True)
+async def get_orders(
+    response: Response,
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    customer_id: int | None = None,
+    date_from: datetime.datetime | None = None,
+    date_to: datetime.datetime | None = None,
+    fields: str | None = None,
+    expand: str | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    filters = []
+    if customer_id is not None:
+        filters.append(Order.customer_id == customer_id)
+    if date_from is not None:
+        filters.append(Order.order_date >= date_from)
+    if date_to is not None:
+        filters.append(Order.order_date < date_to)
+    return await fetch_orders(response, db, filters, fields, expand, cursor, limit)
+
+@router.get("/orders/export")
+async def export_orders(format: ExportFormat = "ndjson", session_factory=Depends(get_session_factory)):
+    return export_response(session_factory, Order, format)
 
-@router.get("/orders")
-async def get_orders(db: Session = Depends(get_db)):
-    return db.query(Order).all()
+@router.get("/test-cases", response_model=list[TestCaseOut])
+async def get_test_cases(db: AsyncSession = Depends(get_read_db)):
+    return (await db.execute(select(*model_columns(TestCase)))).mappings().all()
 
-@router.get("/test-cases")
-async def get_test_cases(db: Session = Depends(get_db)):
-    return db.query(TestCase).all()
\ No newline at end of file
+@router.get("/test-cases/export")
+async def export_test_cases(format: ExportFormat = "ndjson", session_factory=Depends(get_session_factory)):
+    return export_response(session_factory, TestCase, format)
\ No newline at end of file
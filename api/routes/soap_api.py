@@ -0,0 +1,276 @@
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import islice
+from xml.sax.saxutils import escape
+import orjson
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from lxml import etree
+from pydantic import ValidationError
+from sqlalchemy import bindparam, delete, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.cache import product_cache
+from api.database.bulk import insert_returning_ids
+from api.models.product import Product
+from api.routes.rest_api import ProductCreate, get_db
+
+SOAP_ENV_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+SERVICE_NS = "http://example.com/soap"
+SOAP_CONTENT_TYPE = "text/xml; charset=utf-8"
+NAMESPACES = {"soap": SOAP_ENV_NS}
+
+# XPath kompilowane raz; pola operacji (<id>, <name>...) są elementami bez przestrzeni nazw
+OPERATION = etree.XPath("/soap:Envelope/soap:Body/*[1]", namespaces=NAMESPACES)
+PRODUCT_FIELDS = ("name", "description", "price", "available", "stock")
+FIELDS = {name: etree.XPath(f"{name}[1]") for name in ("id", *PRODUCT_FIELDS)}
+# Operacje zbiorcze: <GetProducts><id>1</id><id>2</id>...</GetProducts>, <CreateProducts><product>...</product>...</CreateProducts>
+ALL_IDS = etree.XPath("id")
+ALL_PRODUCTS = etree.XPath("product")
+MAX_BATCH_SIZE = 1000
+STREAM_CHUNK_ITEMS = 200  # elementów <result> na porcję bajtów odpowiedzi strumieniowej
+
+# Instrukcje Core na tabeli (bez konfiguracji mapperów przy imporcie) budowane raz i wykonywane na db.connection()
+products = Product.__table__
+SELECT_PRODUCT = select(products).where(products.c.id == bindparam("product_id"))
+INSERT_PRODUCT = insert(products).returning(products.c.id)
+DELETE_PRODUCT = delete(products).where(products.c.id == bindparam("product_id"))
+# Jedno zapytanie IN dla całej partii (expanding – lista id wstawiana przy wykonaniu, plan w cache SQLAlchemy)
+SELECT_PRODUCTS = select(products).where(products.c.id.in_(bindparam("product_ids", expanding=True)))
+
+router = APIRouter()
+_parsers = threading.local()
+
+
+def _parser() -> etree.XMLParser:
+    # Parser lxml nie jest bezpieczny wątkowo – jeden na wątek. Bez encji zewnętrznych i sieci (XXE).
+    parser = getattr(_parsers, "parser", None)
+    if parser is None:
+        parser = _parsers.parser = etree.XMLParser(resolve_entities=False, no_network=True, remove_blank_text=True)
+    return parser
+
+
+def _template(xml: str, placeholder: str) -> tuple[bytes, bytes]:
+    # Szablon odpowiedzi parsowany i serializowany raz; przy odpowiedzi sklejamy tylko bajty z treścią wyniku
+    serialized = etree.tostring(etree.fromstring(xml), xml_declaration=True, encoding="utf-8")
+    head, tail = serialized.split(placeholder.encode())
+    return head, tail
+
+
+def _response_template(operation: str) -> tuple[bytes, bytes]:
+    return _template(
+        f'<soap:Envelope xmlns:soap="{SOAP_ENV_NS}"><soap:Body>'
+        f'<{operation}Response xmlns="{SERVICE_NS}"><result>RESULT</result></{operation}Response>'
+        f"</soap:Body></soap:Envelope>",
+        "RESULT",
+    )
+
+
+def _batch_template(operation: str) -> tuple[bytes, bytes]:
+    # Odpowiedź zbiorcza: wiele elementów <result>/<notFound> wstawianych między head i tail
+    return _template(
+        f'<soap:Envelope xmlns:soap="{SOAP_ENV_NS}"><soap:Body>'
+        f'<{operation}Response xmlns="{SERVICE_NS}"><items/></{operation}Response>'
+        f"</soap:Body></soap:Envelope>",
+        "<items/>",
+    )
+
+
+FAULT_TEMPLATE = _template(
+    f'<soap:Envelope xmlns:soap="{SOAP_ENV_NS}"><soap:Body><soap:Fault>'
+    f"<faultcode>FAULT</faultcode><faultstring>FAULT</faultstring>"
+    f"</soap:Fault></soap:Body></soap:Envelope>",
+    "FAULT</faultcode><faultstring>FAULT",
+)
+
+
+@dataclass
+class SoapResponse:
+    status: int
+    content: bytes | Iterable[bytes]  # odpowiedzi zbiorcze jako generator porcji bajtów (strumień)
+    products_changed: bool = False  # zapis do products – wywołujący unieważnia cache produktów
+
+
+class SoapFault(Exception):
+    def __init__(self, status: int, message: str, code: str = "soap:Client"):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def fault_response(fault: SoapFault) -> SoapResponse:
+    head, tail = FAULT_TEMPLATE
+    content = head + escape(fault.code).encode() + b"</faultcode><faultstring>" + escape(fault.message).encode() + tail
+    return SoapResponse(fault.status, content)
+
+
+def result_response(operation: str, status: int, result, products_changed: bool = False) -> SoapResponse:
+    # Wynik jako JSON w elemencie <result>; escape zamienia &, < i > – treść z bazy nie psuje koperty
+    head, tail = RESPONSE_TEMPLATES[operation]
+    text = result if isinstance(result, str) else orjson.dumps(result).decode()
+    return SoapResponse(status, head + escape(text).encode() + tail, products_changed)
+
+
+def batch_response(operation: str, status: int, items: Iterable[bytes], products_changed: bool = False) -> SoapResponse:
+    # Jedna koperta wysyłana porcjami: wiersze są już pobrane z bazy (błędy SQL dają Fault przed nagłówkami),
+    # a items to generator – elementy <result> powstają w trakcie wysyłania, w pamięci jest jedna porcja bajtów
+    head, tail = BATCH_TEMPLATES[operation]
+
+    def stream():
+        yield head
+        remaining = iter(items)
+        while chunk := b"".join(islice(remaining, STREAM_CHUNK_ITEMS)):
+            yield chunk
+        yield tail
+
+    return SoapResponse(status, stream(), products_changed)
+
+
+def result_element(result) -> bytes:
+    text = result if isinstance(result, str) else orjson.dumps(result).decode()
+    return b"<result>" + escape(text).encode() + b"</result>"
+
+
+def parse_request(body: bytes):
+    # Parsowanie wprost z bajtów – kodowanie odczytuje lxml z deklaracji XML
+    try:
+        root = etree.fromstring(body, _parser())
+    except etree.XMLSyntaxError as e:
+        raise SoapFault(400, f"Malformed XML: {e}")
+    operation = OPERATION(root)
+    if not operation:
+        raise SoapFault(400, "Missing SOAP Body operation")
+    return etree.QName(operation[0]).localname, operation[0]
+
+
+def field_text(element, name: str, required: bool = True) -> str | None:
+    found = FIELDS[name](element)
+    if not found or found[0].text is None:
+        if required:
+            raise SoapFault(400, f"Missing field: {name}")
+        return None
+    return found[0].text.strip()
+
+
+def field_int(element, name: str) -> int:
+    try:
+        return int(field_text(element, name))
+    except ValueError:
+        raise SoapFault(400, f"Invalid integer in field: {name}")
+
+
+def batch_items(element, xpath, name: str) -> list:
+    found = xpath(element)
+    if not found:
+        raise SoapFault(400, f"Missing field: {name}")
+    if len(found) > MAX_BATCH_SIZE:
+        raise SoapFault(400, f"Too many items in batch: {len(found)} (max {MAX_BATCH_SIZE})")
+    return found
+
+
+def product_values(element, prefix: str = "") -> dict:
+    values = {name: field_text(element, name, required=False) for name in PRODUCT_FIELDS}
+    try:
+        product = ProductCreate(**{name: value for name, value in values.items() if value is not None})
+    except ValidationError as e:
+        raise SoapFault(400, "; ".join(f"{prefix}{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()))
+    return product.dict()
+
+
+def get_product(db, element) -> SoapResponse:
+    product_id = field_int(element, "id")
+    product = db.connection().execute(SELECT_PRODUCT, {"product_id": product_id}).mappings().first()
+    if product is None:
+        raise SoapFault(404, "Product not found")
+    return result_response("GetProduct", 200, dict(product))
+
+
+def get_products(db, element) -> SoapResponse:
+    # Jeden element na każde <id> z żądania, w tej samej kolejności; brakujące id jako <notFound>.
+    # Powtórzone id pobierane z bazy raz
+    product_ids = []
+    for found in batch_items(element, ALL_IDS, "id"):
+        try:
+            product_ids.append(int(found.text))
+        except (TypeError, ValueError):
+            raise SoapFault(400, "Invalid integer in field: id")
+    rows = db.connection().execute(SELECT_PRODUCTS, {"product_ids": list(dict.fromkeys(product_ids))}).mappings()
+    by_id = {row["id"]: dict(row) for row in rows}
+    items = (
+        result_element(by_id[product_id]) if product_id in by_id else b"<notFound>%d</notFound>" % product_id
+        for product_id in product_ids
+    )
+    return batch_response("GetProducts", 200, items)
+
+
+def create_product(db, element) -> SoapResponse:
+    product_id = db.connection().execute(INSERT_PRODUCT, product_values(element)).scalar_one()
+    db.commit()
+    return result_response("CreateProduct", 201, str(product_id), products_changed=True)
+
+
+def delete_product(db, element) -> SoapResponse:
+    product_id = field_int(element, "id")
+    deleted = db.connection().execute(DELETE_PRODUCT, {"product_id": product_id}).rowcount
+    if not deleted:
+        db.rollback()
+        raise SoapFault(404, "Product not found")
+    db.commit()
+    return result_response("DeleteProduct", 204, {"status": "Product deleted"}, products_changed=True)
+
+
+def create_products(db, element) -> SoapResponse:
+    # Cała partia walidowana przed zapisem – błąd w dowolnym produkcie odrzuca całe żądanie
+    rows = [product_values(product, prefix=f"product[{index}].")
+            for index, product in enumerate(batch_items(element, ALL_PRODUCTS, "product"))]
+    # Jeden INSERT wielu wierszy; id w kolejności produktów z żądania
+    product_ids = insert_returning_ids(db, Product, rows)
+    db.commit()
+    return batch_response("CreateProducts", 201, (b"<result>%d</result>" % product_id for product_id in product_ids),
+                          products_changed=True)
+
+
+OPERATIONS = {
+    "GetProduct": get_product,
+    "GetProducts": get_products,
+    "CreateProduct": create_product,
+    "CreateProducts": create_products,
+    "DeleteProduct": delete_product,
+}
+BATCH_OPERATIONS = ("GetProducts", "CreateProducts")
+RESPONSE_TEMPLATES = {operation: _response_template(operation) for operation in OPERATIONS if operation not in BATCH_OPERATIONS}
+BATCH_TEMPLATES = {operation: _batch_template(operation) for operation in BATCH_OPERATIONS}
+
+
+def handle_soap_request(db, body: bytes) -> SoapResponse:
+    # Obsługa jednej koperty SOAP na synchronicznej sesji SQLAlchemy (Session lub AsyncSession.run_sync)
+    try:
+        operation, element = parse_request(body)
+        handler = OPERATIONS.get(operation)
+        if handler is None:
+            raise SoapFault(400, "Invalid operation")
+        return handler(db, element)
+    except SoapFault as fault:
+        return fault_response(fault)
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"Błąd bazy danych w operacji SOAP: {e}")
+        return fault_response(SoapFault(500, "Database error", code="soap:Server"))
+
+
+# Endpoint SOAP w aplikacji FastAPI (api/main.py) – wspólna pętla zdarzeń, pula połączeń, middleware i workery uvicorn.
+# Ta sama ścieżka co w serwerze Flask (soap_server.py), więc klienci zmieniają tylko port.
+@router.post("/soap/")
+async def soap_service(request: Request, db: AsyncSession = Depends(get_db)):
+    soap_response = await db.run_sync(handle_soap_request, await request.body())
+    if soap_response.products_changed:
+        # Ten sam proces co REST API – unieważniamy cache produktów w pamięci i w Redis
+        await product_cache.invalidate_products()
+    if soap_response.status == 204:
+        # Jak serwer Flask (werkzeug): odpowiedź 204 bez treści
+        return Response(status_code=204, media_type=SOAP_CONTENT_TYPE)
+    if isinstance(soap_response.content, bytes):
+        return Response(soap_response.content, status_code=soap_response.status, media_type=SOAP_CONTENT_TYPE)
+    return StreamingResponse(soap_response.content, status_code=soap_response.status, media_type=SOAP_CONTENT_TYPE)
@@ -0,0 +1,90 @@
+import datetime
+from sqlalchemy import select
+from api.database.bulk import dialect_insert
+from api.database.db_config import engine
+from api.models.defect_key import DefectKey, JiraSyncState
+from runner.defects import DEFECT_SUMMARY, DEFECT_SUMMARY_PREFIX
+
+SYNC_NAME = "defects"
+# JQL porównuje updated z dokładnością do minuty – zapas czasu; ponowne wczytanie tych samych defektów niczego nie zmienia
+SYNC_OVERLAP = datetime.timedelta(minutes=5)
+
+
+def jira_datetime(value: str) -> datetime.datetime:
+    # "2025-03-01T10:15:30.000+0100" – czas w strefie użytkownika JIRA, tej samej, w której JQL porównuje updated;
+    # przesunięcie pomijamy, aby znacznik był porównywalny z JQL niezależnie od zegara i strefy runnera
+    return datetime.datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+
+
+def sync_jql(project_key: str, last_sync: datetime.datetime | None) -> str:
+    jql = f'project={project_key} AND issuetype=Bug AND summary ~ "{DEFECT_SUMMARY_PREFIX}"'
+    if last_sync is not None:
+        jql += f' AND updated >= "{(last_sync - SYNC_OVERLAP):%Y/%m/%d %H:%M}"'
+    return jql + " ORDER BY created ASC"
+
+
+class DefectIndex:
+    # Trwałe mapowanie test_id -> klucz defektu w store.db, wczytywane raz do słownika (wyszukiwanie O(1)).
+    # Uzupełniane kluczami utworzonymi przez DefectReporter i przyrostowo z JIRA przez sync().
+    # Po udanej synchronizacji brak test_id w indeksie oznacza, że test nie ma defektu – bez zapytania JQL.
+    def __init__(self, bind=None):
+        self.bind = bind if bind is not None else engine
+        self.synced = False
+        with self.bind.begin() as connection:
+            # Bazy sprzed wprowadzenia indeksu dostają tabele przy pierwszym uruchomieniu runnera
+            DefectKey.__table__.create(connection, checkfirst=True)
+            JiraSyncState.__table__.create(connection, checkfirst=True)
+            self.keys = dict(connection.execute(select(DefectKey.test_id, DefectKey.defect_key)).all())
+
+    def get(self, test_id: str) -> str | None:
+        return self.keys.get(test_id)
+
+    def save(self, keys: dict, replace: bool = True):
+        # replace=False – wpisy już obecne w indeksie zostają bez zmian (synchronizacja)
+        if not keys:
+            return
+        now = datetime.datetime.utcnow()
+        with self.bind.begin() as connection:
+            statement = dialect_insert(DefectKey, connection.dialect.name)
+            if replace:
+                statement = statement.on_conflict_do_update(
+                    index_elements=["test_id"],
+                    set_={"defect_key": statement.excluded.defect_key, "updated_at": statement.excluded.updated_at},
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=["test_id"])
+            connection.execute(statement, [
+                {"test_id": test_id, "defect_key": defect_key, "updated_at": now} for test_id, defect_key in keys.items()
+            ])
+        if replace:
+            self.keys.update(keys)
+        else:
+            for test_id, defect_key in keys.items():
+                self.keys.setdefault(test_id, defect_key)
+
+    def sync(self, jira, project_key: str) -> int:
+        # Tylko defekty zmienione od ostatniej synchronizacji; pierwsze uruchomienie wczytuje wszystkie.
+        # Znacznik to najpóźniejsze updated zwróconych defektów – czas po stronie JIRA, nie zegar runnera
+        with self.bind.connect() as connection:
+            last_sync = connection.scalar(select(JiraSyncState.last_sync).where(JiraSyncState.name == SYNC_NAME))
+        issues = jira.search_issues(sync_jql(project_key, last_sync), fields="summary,updated", maxResults=False)
+        found = {}
+        for issue in issues:
+            match = DEFECT_SUMMARY.match(issue.fields.summary or "")
+            if match:
+                found.setdefault(match["test_id"], issue.key)
+            if issue.fields.updated:
+                updated = jira_datetime(issue.fields.updated)
+                last_sync = updated if last_sync is None else max(last_sync, updated)
+        new_keys = {test_id: defect_key for test_id, defect_key in found.items() if test_id not in self.keys}
+        self.save(new_keys, replace=False)
+        if last_sync is not None:
+            with self.bind.begin() as connection:
+                statement = dialect_insert(JiraSyncState, connection.dialect.name)
+                connection.execute(
+                    statement.on_conflict_do_update(index_elements=["name"], set_={"last_sync": statement.excluded.last_sync}),
+                    {"name": SYNC_NAME, "last_sync": last_sync},
+                )
+        self.synced = True
+        print(f"Synchronizacja indeksu defektów: {len(issues)} defektów z JIRA, {len(new_keys)} nowych, w indeksie {len(self.keys)}")
+        return len(new_keys)
@@ -0,0 +1,223 @@
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+DEFECT_BATCH_SIZE = 50
+DEFECT_FLUSH_INTERVAL = 0.5  # sekundy oczekiwania na kolejne zgłoszenia do partii
+DEFECT_SUMMARY_PREFIX = "Defekt dla"
+DEFECT_SUMMARY = re.compile(rf"^{DEFECT_SUMMARY_PREFIX} (?P<test_id>[^:\s]+):")
+
+
+@dataclass
+class DefectReport:
+    test_id: str
+    description: str  # opis przypadku testowego – trafia do summary defektu
+    details: dict  # etykieta -> wartość, kolejne linie opisu defektu (endpoint, statusy, odpowiedzi)
+    actual_status: int
+    actual_response: str
+    issue_key: str  # zadanie JIRA przypadku testowego
+    link_issue: bool = True  # powiązanie defektu z zadaniem przypadku testowego (Relates)
+
+
+def rest_defect_report(test_case, issue_key: str, actual_status: int, actual_response: str) -> DefectReport:
+    return DefectReport(
+        test_id=test_case.test_id,
+        description=test_case.description,
+        details={
+            "Endpoint": test_case.endpoint,
+            "Method": test_case.method,
+            "Oczekiwany status": test_case.expected_status,
+            "Rzeczywisty status": actual_status,
+            "Oczekiwana odpowiedź": test_case.expected_response,
+            "Rzeczywista odpowiedź": actual_response,
+        },
+        actual_status=actual_status,
+        actual_response=actual_response,
+        issue_key=issue_key,
+    )
+
+
+def defect_fields(project_key: str, report: DefectReport) -> dict:
+    description = f"**Przypadek testowy**: {report.test_id}\n"
+    description += "".join(f"**{label}**: {value}\n" for label, value in report.details.items())
+    description += (
+        f"**Powiązany przypadek testowy**: {report.issue_key}\n"
+        f"**Test Result**: not passed\n"
+        f"**Defect created**: yes\n"
+    )
+    return {
+        "project": {"key": project_key},
+        "summary": f"{DEFECT_SUMMARY_PREFIX} {report.test_id}: {report.description}",
+        "description": description,
+        "issuetype": {"name": "Bug"},
+    }
+
+
+def retest_comment(defect_key: str, reports: list[DefectReport]) -> str:
+    # Wszystkie niepowodzenia testu z jednej partii trafiają do jednego komentarza
+    header = f"Retest dla przypadku testowego {reports[0].test_id}"
+    if len(reports) > 1:
+        header += f" ({len(reports)} niepowodzeń)"
+    lines = [header + ":"]
+    for report in reports:
+        lines.append(f"**Rzeczywisty status**: {report.actual_status}")
+        lines.append(f"**Rzeczywista odpowiedź**: {report.actual_response}")
+    lines += ["**Test Result**: not passed", "**Defect created**: yes", f"**Numer defektu**: {defect_key}"]
+    return "\n".join(lines)
+
+
+def defects_jql(project_key: str, test_ids: list[str]) -> str:
+    # Jedno zapytanie JQL dla całej partii zamiast search_issues na każde niepowodzenie
+    conditions = " OR ".join(f'summary ~ "{DEFECT_SUMMARY_PREFIX} {test_id}"' for test_id in test_ids)
+    return f"project={project_key} AND issuetype=Bug AND ({conditions})"
+
+
+class DefectReporter:
+    # Kolejka zgłoszeń defektów obsługiwana w tle: runner nie czeka na JIRA.
+    # Zgłoszenia są grupowane w partie i deduplikowane po test_id, znane klucze defektów zapamiętywane,
+    # a rozwiązany klucz przekazywany do on_resolved(test_id, defect_key) – np. ResultWriter.set_defect_key.
+    # Z indeksem (runner.defect_index.DefectIndex) klucze są zapisywane w store.db, a po synchronizacji
+    # indeksu z JIRA nieznany test_id oznacza nowy defekt – bez wyszukiwania JQL.
+    def __init__(self, jira, project_key: str, on_resolved=None, index=None, batch_size: int = DEFECT_BATCH_SIZE,
+                 flush_interval: float = DEFECT_FLUSH_INTERVAL):
+        self.jira = jira
+        self.project_key = project_key
+        self.on_resolved = on_resolved
+        self.index = index
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.known_keys = dict(index.keys) if index is not None else {}  # test_id -> klucz defektu w JIRA
+        self.resolved = {}  # test_id -> klucz defektu dla zgłoszeń z tego uruchomienia
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="defect-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, report: DefectReport):
+        self._queue.put(report)
+
+    def close(self):
+        # Czeka na obsłużenie wszystkich zgłoszeń z kolejki
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            closing = item is None
+            if batch:
+                self._process(batch)
+
+    def _process(self, batch: list[DefectReport]):
+        reports = OrderedDict()
+        for report in batch:
+            reports.setdefault(report.test_id, []).append(report)
+
+        unknown = [test_id for test_id in reports if test_id not in self.known_keys]
+        existing = set(reports) - set(unknown)
+        search_failed = False
+        if unknown and not (self.index is not None and self.index.synced):
+            try:
+                found = self._search(unknown)
+            except Exception as e:
+                print(f"Błąd podczas wyszukiwania defektów w JIRA: {e}")
+                found, search_failed = {}, True
+            self.known_keys.update(found)
+            existing.update(found)
+            self._save(found)
+
+        missing = [test_id for test_id in unknown if test_id not in self.known_keys]
+        if missing and search_failed:
+            # Nie wiadomo, czy defekty już istnieją – nie tworzymy duplikatów, wyniki zostają z kluczem PENDING
+            print(f"Pominięto zgłoszenie defektów dla {len(missing)} przypadków testowych: {', '.join(missing)}")
+        elif missing:
+            self._create(missing, reports)
+
+        for test_id in existing:
+            defect_key = self.known_keys[test_id]
+            try:
+                self.jira.add_comment(defect_key, retest_comment(defect_key, reports[test_id]))
+                print(f"Dodano komentarz do istniejącego defektu {defect_key} dla przypadku testowego {test_id}")
+            except Exception as e:
+                print(f"Błąd podczas dodawania komentarza do {defect_key}: {e}")
+            self._resolve(test_id, defect_key)
+
+    def _search(self, test_ids: list[str]) -> dict:
+        issues = self.jira.search_issues(defects_jql(self.project_key, test_ids), fields="summary", maxResults=False)
+        found = {}
+        for issue in issues:
+            # summary ~ jest wyszukiwaniem pełnotekstowym – dopasowanie test_id sprawdzamy dokładnie
+            match = DEFECT_SUMMARY.match(issue.fields.summary or "")
+            if match and match["test_id"] in test_ids:
+                found.setdefault(match["test_id"], issue.key)
+        print(f"Znaleziono {len(found)} istniejących defektów dla {len(test_ids)} przypadków testowych")
+        return found
+
+    def _create(self, test_ids: list[str], reports: OrderedDict):
+        # Jedno żądanie issue/bulk dla wszystkich nowych defektów; dodatkowe niepowodzenia z partii jako komentarz
+        try:
+            created = self.jira.create_issues([defect_fields(self.project_key, reports[test_id][0]) for test_id in test_ids], prefetch=False)
+        except Exception as e:
+            print(f"Błąd podczas tworzenia defektów w JIRA: {e}")
+            return
+        self._save({test_id: entry["issue"].key for test_id, entry in zip(test_ids, created) if entry["status"] == "Success"})
+        for test_id, entry in zip(test_ids, created):
+            if entry["status"] != "Success":
+                print(f"Nie utworzono defektu dla {test_id}: {entry['error']}")
+                continue
+            defect_key = entry["issue"].key
+            self.known_keys[test_id] = defect_key
+            print(f"Utworzono defekt w JIRA: {defect_key} dla przypadku testowego {test_id}")
+            first, *others = reports[test_id]
+            try:
+                # Numer defektu znany dopiero po utworzeniu – dopisywany do opisu
+                description = defect_fields(self.project_key, first)["description"] + f"**Numer defektu**: {defect_key}"
+                entry["issue"].update(fields={"description": description})
+                if first.link_issue:
+                    self.jira.create_issue_link(type="Relates", inwardIssue=defect_key, outwardIssue=first.issue_key)
+                if others:
+                    self.jira.add_comment(defect_key, retest_comment(defect_key, others))
+            except Exception as e:
+                print(f"Błąd podczas uzupełniania defektu {defect_key}: {e}")
+            self._resolve(test_id, defect_key)
+
+    def _save(self, keys: dict):
+        if self.index is None or not keys:
+            return
+        try:
+            self.index.save(keys)
+        except Exception as e:
+            print(f"Błąd podczas zapisu indeksu defektów: {e}")
+
+    def _resolve(self, test_id: str, defect_key: str):
+        self.resolved[test_id] = defect_key
+        if self.on_resolved:
+            try:
+                self.on_resolved(test_id, defect_key)
+            except Exception as e:
+                print(f"Błąd podczas zapisu klucza defektu {defect_key} dla {test_id}: {e}")
@@ -0,0 +1,87 @@
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+DEFAULT_WORKERS = 8
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+@dataclass
+class CaseOutcome:
+    case: object
+    result: str = "passed"  # "passed" lub "not passed"
+    actual_status: int = 0
+    actual_response: str = ""  # wartość zapisywana w test_results
+    response_text: str = ""  # surowa odpowiedź serwera
+    message: str | None = None  # treść niespełnionej asercji lub wyjątku
+    failure_message: str | None = None
+    error: bool = False  # True – wyjątek (np. błąd połączenia) zamiast niespełnionej asercji
+    duration_ms: int = 0  # czas samego żądania i walidacji, bez oczekiwania w kolejce
+
+
+def resource_key(endpoint: str) -> str:
+    # "/api/v1/products/1" -> "/api/v1/products": zasób, którego dotyczy przypadek (bez id i parametrów)
+    path = endpoint.split("?", 1)[0]
+    return "/" + "/".join(segment for segment in path.split("/") if segment and not segment.isdigit())
+
+
+def rest_access(case) -> tuple[str, bool]:
+    return resource_key(case.endpoint), case.method.upper() in WRITE_METHODS
+
+
+def plan_dependencies(cases, access=rest_access) -> list[set[int]]:
+    # Kolejność jak przy blokadzie czytelnicy-pisarze na zasobie: zapis czeka na wcześniejsze odczyty i zapisy,
+    # odczyt czeka tylko na wcześniejszy zapis. Odczyty tego samego zasobu i różne zasoby idą równolegle.
+    dependencies = []
+    last_write = {}
+    reads_since_write = defaultdict(list)
+    for index, case in enumerate(cases):
+        resource, write = access(case)
+        case_dependencies = set()
+        if resource in last_write:
+            case_dependencies.add(last_write[resource])
+        if write:
+            case_dependencies.update(reads_since_write.pop(resource, ()))
+            last_write[resource] = index
+        else:
+            reads_since_write[resource].append(index)
+        dependencies.append(case_dependencies)
+    return dependencies
+
+
+def _execute_safely(execute, case) -> CaseOutcome:
+    try:
+        return execute(case)
+    except Exception as e:
+        return CaseOutcome(case, result="not passed", message=str(e), failure_message=f"Error: {e}", error=True)
+
+
+def run_cases(cases, execute, workers: int = DEFAULT_WORKERS, access=rest_access, on_outcome=None) -> list[CaseOutcome]:
+    # execute(case) -> CaseOutcome wykonywane jest w puli wątków (maks. workers naraz).
+    # on_outcome(outcome) wywołujemy w wątku wywołującym, po kolei – zapis do bazy i JIRA nie muszą być wątkowo bezpieczne.
+    cases = list(cases)
+    dependencies = plan_dependencies(cases, access)
+    dependents = defaultdict(list)
+    for index, case_dependencies in enumerate(dependencies):
+        for dependency in case_dependencies:
+            dependents[dependency].append(index)
+    remaining = [len(case_dependencies) for case_dependencies in dependencies]
+    outcomes = [None] * len(cases)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {
+            pool.submit(_execute_safely, execute, case): index for index, case in enumerate(cases) if not remaining[index]
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.get):
+                index = running.pop(future)
+                outcomes[index] = future.result()
+                # Najpierw zwalniamy zależne przypadki, potem obsługujemy wynik – żądania nie czekają na zapis
+                for dependent in dependents[index]:
+                    remaining[dependent] -= 1
+                    if not remaining[dependent]:
+                        running[pool.submit(_execute_safely, execute, cases[dependent])] = dependent
+                if on_outcome:
+                    on_outcome(outcomes[index])
+    return outcomes
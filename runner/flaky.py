@@ -0,0 +1,169 @@
+import argparse
+import datetime
+from sqlalchemy import and_, case, extract, func, select
+from api.database.bulk import dialect_insert
+from api.database.db_config import engine
+from api.database.db_utils import init_db
+from api.models.flaky_test_stats import FlakyTestStats
+from api.models.test_result import TestResult
+
+# Wykrywanie niestabilnych testów na podstawie historii test_results. Test niestabilny często zmienia wynik
+# między kolejnymi uruchomieniami, a jego niepowodzenia są pojedyncze i rozproszone w czasie. Regresja daje jedną
+# zmianę i serię niepowodzeń, a awaria środowiska – niepowodzenia skupione w krótkim oknie czasu.
+FAILURE_CLUSTER_WINDOW = datetime.timedelta(hours=1)
+FLAKY_SCORE_THRESHOLD = 0.2
+FLAKY_MIN_RUNS = 5
+FLAKY_MIN_FAILURES = 2  # jedno niepowodzenie to za mało, by uznać test za niestabilny
+REGRESSION_STREAK = 3  # tyle ostatnich niepowodzeń z rzędu – traktujemy jak regresję, a nie niestabilność
+
+FAILED = case((TestResult.result == "passed", 0), else_=1)
+STATS_COLUMNS = ("runs", "failures", "flips", "clustered_failures", "last_failed", "last_streak", "last_result_id",
+                 "last_failure_at", "flaky_score")
+
+
+def _seconds_between(later, earlier, dialect_name: str):
+    if dialect_name == "sqlite":
+        return (func.julianday(later) - func.julianday(earlier)) * 86400
+    return extract("epoch", later - earlier)
+
+
+def scan_statement(after_id: int, dialect_name: str):
+    # Jedno przejście po nowych wynikach (id > after_id) z funkcjami okna zamiast zapytania na każdy test.
+    # Wszystkie okna mają ten sam podział i porządek (test_id, id), więc baza sortuje wyniki tylko raz:
+    # poprzedni wynik (LAG), czas poprzedniego niepowodzenia, ostatni wynik i pozycja od końca (końcowa seria)
+    # Nowe wiersze najpierw wybierane po kluczu głównym (CTE MATERIALIZED): bez tego SQLite woli przejść cały indeks
+    # ix_test_results_test_id, bo daje gotowy porządek okna, i skan przyrostowy kosztowałby tyle co pełny
+    new_results = (
+        select(TestResult.test_id, TestResult.id, TestResult.timestamp, FAILED.label("failed"))
+        .where(TestResult.id > after_id)
+        .cte("new_results")
+        .prefix_with("MATERIALIZED")
+    )
+    window = dict(partition_by=new_results.c.test_id, order_by=new_results.c.id)
+    failed = new_results.c.failed
+    ordered = select(
+        new_results.c.test_id,
+        new_results.c.id,
+        new_results.c.timestamp,
+        failed,
+        func.lag(failed).over(**window).label("previous_failed"),
+        func.max(case((failed == 1, new_results.c.timestamp))).over(**window, rows=(None, -1)).label("previous_failure_at"),
+        func.count().over(**window, rows=(0, None)).label("position"),  # 1 = najnowszy wynik testu
+        func.last_value(failed).over(**window, rows=(None, None)).label("last_failed"),
+    ).subquery()
+    failed = ordered.c.failed
+    gap = _seconds_between(ordered.c.timestamp, ordered.c.previous_failure_at, dialect_name)
+    return select(
+        ordered.c.test_id,
+        func.count().label("runs"),
+        func.sum(failed).label("failures"),
+        func.sum(case((ordered.c.previous_failed != failed, 1), else_=0)).label("flips"),
+        func.sum(case((and_(failed == 1, gap < FAILURE_CLUSTER_WINDOW.total_seconds()), 1), else_=0))
+        .label("clustered_failures"),
+        func.max(ordered.c.last_failed).label("last_failed"),
+        # Pozycja (od końca) najnowszego wyniku innego niż ostatni; NULL – wszystkie wyniki w porcji takie same
+        func.min(case((failed != ordered.c.last_failed, ordered.c.position))).label("last_change_position"),
+        func.max(case((ordered.c.previous_failed.is_(None), failed))).label("first_failed"),
+        func.min(case((failed == 1, ordered.c.timestamp))).label("first_failure_at"),
+        func.max(case((failed == 1, ordered.c.timestamp))).label("last_failure_at"),
+        func.max(ordered.c.id).label("last_result_id"),
+    ).group_by(ordered.c.test_id)
+
+
+def flaky_score(runs: int, failures: int, flips: int, clustered_failures: int) -> float:
+    # Odsetek zmian wyniku między kolejnymi uruchomieniami × odsetek niepowodzeń nieskupionych w czasie (0..1)
+    if runs < 2 or not failures:
+        return 0.0
+    return flips / (runs - 1) * (failures - clustered_failures) / failures
+
+
+def merge_stats(previous, scanned) -> dict:
+    # Liczniki z poprzednich skanów + nowa porcja; granica porcji (pierwszy nowy wynik vs ostatni zapisany) liczona tutaj
+    chunk_streak = scanned.runs if scanned.last_change_position is None else scanned.last_change_position - 1
+    stats = {
+        "test_id": scanned.test_id,
+        "runs": scanned.runs,
+        "failures": scanned.failures,
+        "flips": scanned.flips,
+        "clustered_failures": scanned.clustered_failures,
+        "last_failed": bool(scanned.last_failed),
+        "last_streak": chunk_streak,
+        "last_result_id": scanned.last_result_id,
+        "last_failure_at": scanned.last_failure_at,
+    }
+    if previous is not None:
+        stats["runs"] += previous.runs
+        stats["failures"] += previous.failures
+        stats["flips"] += previous.flips + (bool(scanned.first_failed) != previous.last_failed)
+        stats["clustered_failures"] += previous.clustered_failures
+        if (scanned.first_failure_at is not None and previous.last_failure_at is not None
+                and scanned.first_failure_at - previous.last_failure_at < FAILURE_CLUSTER_WINDOW):
+            stats["clustered_failures"] += 1
+        if chunk_streak == scanned.runs and previous.last_failed == stats["last_failed"]:
+            stats["last_streak"] += previous.last_streak
+        if stats["last_failure_at"] is None:
+            stats["last_failure_at"] = previous.last_failure_at
+    stats["flaky_score"] = flaky_score(stats["runs"], stats["failures"], stats["flips"], stats["clustered_failures"])
+    return stats
+
+
+def update_flaky_stats(connection) -> int:
+    # Skan przyrostowy: tylko wyniki o id większym niż ostatnio przetworzone. Zwraca liczbę przetworzonych wyników.
+    FlakyTestStats.__table__.create(connection, checkfirst=True)
+    stats = load_flaky_stats(connection)
+    after_id = max((row.last_result_id for row in stats.values()), default=0)
+    scanned = connection.execute(scan_statement(after_id, connection.dialect.name)).all()
+    if not scanned:
+        return 0
+    statement = dialect_insert(FlakyTestStats, connection.dialect.name)
+    statement = statement.on_conflict_do_update(
+        index_elements=["test_id"],
+        set_={name: statement.excluded[name] for name in STATS_COLUMNS},
+        # Równoległy skan, który zapisał już nowsze wyniki, nie jest nadpisywany starszym stanem
+        where=FlakyTestStats.last_result_id < statement.excluded.last_result_id,
+    )
+    connection.execute(statement, [merge_stats(stats.get(row.test_id), row) for row in scanned])
+    return sum(row.runs for row in scanned)
+
+
+def rebuild_flaky_stats(connection) -> int:
+    FlakyTestStats.__table__.create(connection, checkfirst=True)
+    connection.execute(FlakyTestStats.__table__.delete())
+    return update_flaky_stats(connection)
+
+
+def load_flaky_stats(connection) -> dict:
+    return {row.test_id: row for row in connection.execute(select(FlakyTestStats))}
+
+
+def is_flaky(row) -> bool:
+    if row.last_failed and row.last_streak >= REGRESSION_STREAK:
+        return False  # test konsekwentnie nie przechodzi – prawdziwa regresja, nie pomijamy jej
+    return (row.runs >= FLAKY_MIN_RUNS and FLAKY_MIN_FAILURES <= row.failures < row.runs
+            and row.flaky_score >= FLAKY_SCORE_THRESHOLD)
+
+
+def flaky_test_ids(stats: dict) -> list[str]:
+    return sorted(test_id for test_id, row in stats.items() if is_flaky(row))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ranking niestabilnych testów na podstawie historii test_results")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the scores from the whole history")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    init_db()
+    with engine.begin() as connection:
+        scanned = (rebuild_flaky_stats if args.rebuild else update_flaky_stats)(connection)
+        stats = load_flaky_stats(connection)
+    print(f"Przetworzono {scanned} nowych wyników, testów w statystykach: {len(stats)}")
+    print(f"{'test_id':<10} | {'wynik':>6} | {'uruch.':>6} | {'niepow.':>7} | {'zmiany':>6} | {'skupione':>8} | niestabilny")
+    ranking = sorted(stats.values(), key=lambda row: row.flaky_score, reverse=True)[:args.limit]
+    for row in ranking:
+        print(f"{row.test_id:<10} | {row.flaky_score:>6.2f} | {row.runs:>6} | {row.failures:>7} | {row.flips:>6} | "
+              f"{row.clustered_failures:>8} | {'tak' if is_flaky(row) else 'nie'}")
+
+
+if __name__ == "__main__":
+    main()
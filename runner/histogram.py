@@ -0,0 +1,76 @@
+import math
+from collections import Counter
+
+# Histogram opóźnień w stylu HdrHistogram: kubełki log-liniowe o stałej względnej dokładności.
+# Wartości (mikrosekundy) poniżej 2^SUB_BUCKET_BITS są dokładne, większe – z błędem najwyżej 1/2^(SUB_BUCKET_BITS-1)
+# (~0,1%, czyli 3 cyfry znaczące). Zapis to jedno przesunięcie bitowe i inkrementacja licznika, bez sortowania próbek.
+SUB_BUCKET_BITS = 11
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+PERCENTILES = {"p50": 50.0, "p90": 90.0, "p99": 99.0, "p999": 99.9}
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return shift * SUB_BUCKET_HALF + (value >> shift)
+
+
+def highest_equivalent_value(index: int) -> int:
+    # Największa wartość trafiająca do kubełka – percentyle nie są zaniżane (jak w HdrHistogram)
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    return ((index - shift * SUB_BUCKET_HALF + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    def __init__(self, counts: dict[int, int] | None = None):
+        self.counts = Counter(counts or {})
+        self.total = sum(self.counts.values())
+        self.max_us = max((highest_equivalent_value(index) for index in self.counts), default=0)
+        self.sum_us = sum(highest_equivalent_value(index) * count for index, count in self.counts.items())
+
+    def record(self, value_us: int, count: int = 1):
+        value_us = max(0, int(value_us))
+        self.counts[bucket_index(value_us)] += count
+        self.total += count
+        self.sum_us += value_us * count
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, percentile: float) -> int:
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(self.total * percentile / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(highest_equivalent_value(index), self.max_us)
+        return self.max_us
+
+    def summary(self) -> dict:
+        # Wartości w milisekundach – jak duration_ms w test_results
+        summary = {name: self.percentile(value) / 1000 for name, value in PERCENTILES.items()}
+        summary["max"] = self.max_us / 1000
+        summary["mean"] = self.sum_us / self.total / 1000 if self.total else 0.0
+        return summary
+
+    def to_dict(self) -> dict:
+        # Zapis w bazie (JSON): tylko niepuste kubełki; from_dict odtwarza histogram do łączenia wielu przebiegów
+        return {"sub_bucket_bits": SUB_BUCKET_BITS, "counts": {str(index): count for index, count in sorted(self.counts.items())}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        if data.get("sub_bucket_bits") != SUB_BUCKET_BITS:
+            raise ValueError("Histogram zapisany z inną dokładnością kubełków")
+        return cls({int(index): count for index, count in data["counts"].items()})
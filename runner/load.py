@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+import httpx
+from sqlalchemy import insert, select
+from api.database.db_config import SessionLocal, engine
+from api.database.db_utils import init_db
+from api.models.load_test_run import LoadTestRun
+from api.models.test_case import TestCase
+from runner.histogram import LatencyHistogram
+from runner.payloads import SOAP_HEADERS, build_payload, build_soap_envelope, is_soap_case
+from runner.rest import RestCase
+
+# Tryb obciążeniowy: przypadki z test_cases (domyślnie test_type = "performance") odtwarzane przez zadany czas
+# ze stałym tempem żądań (--rps) albo stałą liczbą klientów (--concurrency). Jeden AsyncClient z pulą połączeń keep-alive.
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+DEFAULT_DURATION = 10.0  # sekundy
+DEFAULT_CONCURRENCY = 16
+REQUEST_TIMEOUT = 30.0
+
+
+@dataclass(frozen=True)
+class LoadRequest:
+    # Żądanie budowane raz przed przebiegiem – w pętli obciążenia jest tylko wysyłka
+    test_id: str
+    method: str
+    path: str
+    expected_status: int
+    json: dict | None = None
+    content: bytes | None = None
+    headers: dict | None = None
+
+
+def load_request(test_case) -> LoadRequest:
+    # Przypadki REST i SOAP (endpoint /soap/) – ciała żądań jak w testach funkcjonalnych (runner/payloads.py)
+    common = dict(test_id=test_case.test_id, method=test_case.method.upper(), path=test_case.endpoint,
+                  expected_status=test_case.expected_status)
+    if is_soap_case(test_case):
+        return LoadRequest(**common, content=build_soap_envelope(test_case), headers=SOAP_HEADERS)
+    return LoadRequest(**common, json=build_payload(test_case))
+
+
+@dataclass
+class CaseLoad:
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    requests: int = 0
+    errors: Counter = field(default_factory=Counter)  # np. {"status 500": 3, "ConnectError": 1}
+
+    def summary(self, duration_s: float) -> dict:
+        errors = sum(self.errors.values())
+        return {
+            "requests": self.requests,
+            "errors": errors,
+            "error_rate": errors / self.requests if self.requests else 0.0,
+            "achieved_rps": self.requests / duration_s if duration_s else 0.0,
+            **self.histogram.summary(),
+        }
+
+
+@dataclass
+class LoadResult:
+    started_at: datetime.datetime
+    duration_s: float
+    mode: str  # "rps" lub "concurrency"
+    target_rps: float | None
+    concurrency: int
+    cases: dict[str, CaseLoad]
+
+    def histogram(self) -> LatencyHistogram:
+        merged = LatencyHistogram()
+        for case in self.cases.values():
+            merged.merge(case.histogram)
+        return merged
+
+    def summary(self) -> dict:
+        total = CaseLoad(self.histogram(), sum(case.requests for case in self.cases.values()),
+                         sum((case.errors for case in self.cases.values()), Counter()))
+        return total.summary(self.duration_s)
+
+
+async def run_load(requests: list[LoadRequest], base_url: str, duration: float = DEFAULT_DURATION,
+                   concurrency: int = DEFAULT_CONCURRENCY, rps: float | None = None, transport=None) -> LoadResult:
+    cases = {request.test_id: CaseLoad() for request in requests}
+    schedule = itertools.cycle(requests)  # przypadki na zmianę, każdy z tą samą wagą
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    started_at = datetime.datetime.utcnow()
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=REQUEST_TIMEOUT, transport=transport) as client:
+
+        async def send(request: LoadRequest, intended_start: float):
+            case = cases[request.test_id]
+            try:
+                response = await client.request(request.method, request.path, json=request.json,
+                                                content=request.content, headers=request.headers)
+                if response.status_code != request.expected_status:
+                    case.errors[f"status {response.status_code}"] += 1
+            except httpx.HTTPError as e:
+                case.errors[type(e).__name__] += 1
+            case.requests += 1
+            case.histogram.record((time.perf_counter() - intended_start) * 1_000_000)
+
+        started = time.perf_counter()
+        deadline = started + duration
+        if rps:
+            # Otwarta pętla: żądanie i startuje w chwili started + i/rps, niezależnie od czasu odpowiedzi poprzednich.
+            # Opóźnienie liczone od zaplanowanego startu – gdy serwer nie nadąża (albo wszystkie połączenia są zajęte),
+            # czas oczekiwania też trafia do histogramu, zamiast znikać z pomiaru (coordinated omission).
+            slots = asyncio.Semaphore(concurrency)
+            pending = set()
+            for index in itertools.count():
+                intended_start = started + index / rps
+                if intended_start >= deadline:
+                    break
+                delay = intended_start - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await slots.acquire()
+                task = asyncio.create_task(send(next(schedule), intended_start))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                task.add_done_callback(lambda _: slots.release())
+            await asyncio.gather(*pending)
+        else:
+            # Zamknięta pętla: concurrency klientów, każdy wysyła kolejne żądanie po otrzymaniu odpowiedzi
+            async def client_loop():
+                while (start := time.perf_counter()) < deadline:
+                    await send(next(schedule), start)
+
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        duration_s = time.perf_counter() - started
+
+    return LoadResult(started_at, duration_s, "rps" if rps else "concurrency", rps, concurrency, cases)
+
+
+def save_run(result: LoadResult, base_url: str, environment: str = "local", bind=None) -> int:
+    summary = result.summary()
+    cases = {
+        test_id: {**case.summary(result.duration_s), "error_kinds": dict(case.errors)}
+        for test_id, case in result.cases.items()
+    }
+    row = {
+        "started_at": result.started_at,
+        "base_url": base_url,
+        "test_ids": ",".join(result.cases),
+        "mode": result.mode,
+        "target_rps": result.target_rps,
+        "concurrency": result.concurrency,
+        "duration_s": result.duration_s,
+        "requests": summary["requests"],
+        "errors": summary["errors"],
+        "error_rate": summary["error_rate"],
+        "achieved_rps": summary["achieved_rps"],
+        "p50_ms": summary["p50"],
+        "p90_ms": summary["p90"],
+        "p99_ms": summary["p99"],
+        "p999_ms": summary["p999"],
+        "max_ms": summary["max"],
+        "mean_ms": summary["mean"],
+        "histogram": json.dumps(result.histogram().to_dict()),
+        "cases": json.dumps(cases, ensure_ascii=False),
+        "environment": environment,
+    }
+    with (bind if bind is not None else engine).begin() as connection:
+        return connection.execute(insert(LoadTestRun).returning(LoadTestRun.id), row).scalar_one()
+
+
+def select_cases(test_ids: list[str] | None, test_type: str | None) -> list[RestCase]:
+    query = select(TestCase).order_by(TestCase.test_id)
+    if test_ids:
+        query = query.where(TestCase.test_id.in_(test_ids))
+    elif test_type:
+        query = query.where(TestCase.test_type == test_type)
+    with SessionLocal() as db:
+        return [RestCase.from_model(test_case) for test_case in db.scalars(query)]
+
+
+def print_summary(result: LoadResult):
+    print(f"{'test_id':<10} | {'żądania':>8} | {'błędy':>7} | {'req/s':>8} | {'p50':>8} | {'p90':>8} | {'p99':>8} | {'p999':>8} | {'max':>8}")
+    rows = [(test_id, case.summary(result.duration_s)) for test_id, case in result.cases.items()]
+    for test_id, summary in rows + [("RAZEM", result.summary())]:
+        print(
+            f"{test_id:<10} | {summary['requests']:>8} | {summary['error_rate']:>6.1%} | {summary['achieved_rps']:>8.1f} | "
+            + " | ".join(f"{summary[name]:>5.1f} ms" for name in ("p50", "p90", "p99", "p999", "max"))
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test obciążeniowy na podstawie przypadków z tabeli test_cases (REST i SOAP)")
+    parser.add_argument("--test-ids", help="Comma-separated list of test IDs (default: all cases with --test-type)")
+    parser.add_argument("--test-type", default="performance")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="Czas przebiegu w sekundach")
+    parser.add_argument("--rps", type=float, help="Stałe tempo żądań; bez tej opcji – stała liczba klientów")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Liczba klientów (albo limit równoległych żądań przy --rps)")
+    parser.add_argument("--environment", default="local")
+    parser.add_argument("--no-save", action="store_true", help="Nie zapisuj podsumowania w load_test_runs")
+    args = parser.parse_args(argv)
+
+    init_db()
+    test_ids = [test_id.strip() for test_id in args.test_ids.split(",")] if args.test_ids else None
+    cases = select_cases(test_ids, args.test_type)
+    if not cases:
+        print("Brak przypadków testowych do uruchomienia")
+        sys.exit(1)
+    requests = [load_request(test_case) for test_case in cases]
+    mode = f"{args.rps:g} req/s" if args.rps else f"{args.concurrency} klientów"
+    print(f"Obciążenie {args.base_url}: {', '.join(case.test_id for case in cases)}, {mode}, {args.duration:g} s")
+
+    result = asyncio.run(run_load(requests, args.base_url, args.duration, args.concurrency, args.rps))
+    print_summary(result)
+    if not args.no_save:
+        run_id = save_run(result, args.base_url, args.environment)
+        print(f"Podsumowanie zapisane w load_test_runs (id={run_id})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Dane wysyłane w ciele żądań POST/PUT dla przypadków testowych REST
+TEST_PRODUCT = {
+    "name": "Test Product",
+    "description": "Test Description",
+    "price": 99.99,
+    "available": True,
+    "stock": 10
+}
+
+# Przypadki, które wysyłają pełny produkt (TC_015 i TC_017 – z ceną na granicy)
+PRODUCT_PAYLOAD_CASES = ["TC_007", "TC_009", "TC_015", "TC_017", "TC_020"]
+PRICE_OVERRIDES = {"TC_015": 0, "TC_017": 9999999.99}
+
+
+def build_payload(test_case) -> dict | None:
+    if test_case.method not in ["POST", "PUT"]:
+        return None
+    if test_case.test_id in PRODUCT_PAYLOAD_CASES:
+        data = dict(TEST_PRODUCT)
+        if test_case.test_id in PRICE_OVERRIDES:
+            data["price"] = PRICE_OVERRIDES[test_case.test_id]
+        return data
+    if test_case.test_id == "TC_008":
+        # Brak wymaganego pola name
+        return {
+            "description": "Test Description",
+            "price": 99.99
+        }
+    if test_case.test_id == "TC_016":
+        return {
+            "name": "Test Product",
+            "description": "Test Description",
+            "price": -10
+        }
+    if test_case.test_id == "TC_018":
+        return {
+            "name": "A" * 101,
+            "description": "Test Description",
+            "price": 99.99
+        }
+    return None
+
+
+# Przypadki SOAP (endpoint /soap/): operacja i pola elementu operacji; TC_021 czyta produkt 2 – żaden przypadek go nie usuwa
+SOAP_ENDPOINT_PREFIX = "/soap"
+SOAP_PAYLOADS = {
+    "TC_021": ("GetProduct", "<id>2</id>"),
+    "TC_022": ("GetProducts", "".join(f"<id>{product_id}</id>" for product_id in range(1, 21))),
+}
+SOAP_HEADERS = {"Content-Type": "text/xml; charset=utf-8"}
+
+
+def is_soap_case(test_case) -> bool:
+    return test_case.endpoint.startswith(SOAP_ENDPOINT_PREFIX)
+
+
+def build_soap_envelope(test_case) -> bytes:
+    if test_case.test_id not in SOAP_PAYLOADS:
+        raise ValueError(f"Brak koperty SOAP dla przypadku {test_case.test_id} (runner/payloads.py: SOAP_PAYLOADS)")
+    operation, fields = SOAP_PAYLOADS[test_case.test_id]
+    return (
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="http://example.com/soap">'
+        f"<soap:Body><ns:{operation}>{fields}</ns:{operation}></soap:Body></soap:Envelope>"
+    ).encode("utf-8")
@@ -0,0 +1,103 @@
+import json
+import time
+from dataclasses import dataclass
+import requests
+from requests.adapters import HTTPAdapter
+from runner.engine import DEFAULT_WORKERS, CaseOutcome
+from runner.payloads import SOAP_HEADERS, build_payload, build_soap_envelope, is_soap_case
+
+
+@dataclass(frozen=True)
+class RestCase:
+    # Niezmienna kopia TestCase – wątki robocze nie dotykają obiektów ORM ani sesji bazy
+    test_id: str
+    description: str
+    endpoint: str
+    method: str
+    expected_status: int
+    expected_response: str | None
+
+    @classmethod
+    def from_model(cls, test_case):
+        return cls(
+            test_id=test_case.test_id,
+            description=test_case.description,
+            endpoint=test_case.endpoint,
+            method=test_case.method,
+            expected_status=test_case.expected_status,
+            expected_response=test_case.expected_response,
+        )
+
+
+def create_http_session(workers: int = DEFAULT_WORKERS) -> requests.Session:
+    # Wspólna pula połączeń keep-alive dla wszystkich wątków roboczych
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def check_response(test_case, response) -> str:
+    # Zwraca odpowiedź do zapisania w test_results; niezgodność z oczekiwaniami zgłasza AssertionError
+    assert response.status_code == test_case.expected_status, (
+        f"Oczekiwano statusu {test_case.expected_status}, otrzymano {response.status_code}"
+    )
+    if not test_case.expected_response:
+        return response.text
+    try:
+        expected_response = json.loads(test_case.expected_response)
+        actual_response_json = response.json()
+        if isinstance(expected_response, dict):
+            for key, value in expected_response.items():
+                assert key in actual_response_json, f"Brak klucza {key} w odpowiedzi API"
+                assert actual_response_json[key] == value, (
+                    f"Oczekiwano {key}: {value}, otrzymano {key}: {actual_response_json[key]}"
+                )
+        else:
+            assert actual_response_json == expected_response, (
+                f"Oczekiwano odpowiedzi {expected_response}, otrzymano {actual_response_json}"
+            )
+        return json.dumps(actual_response_json, ensure_ascii=False)[:500]
+    except json.JSONDecodeError:
+        assert response.text == test_case.expected_response, (
+            f"Oczekiwano odpowiedzi {test_case.expected_response}, otrzymano {response.text}"
+        )
+        return response.text[:500]
+
+
+def execute_rest_case(session: requests.Session, base_url: str, test_case) -> CaseOutcome:
+    outcome = CaseOutcome(test_case)
+    method = test_case.method.lower()
+    if method not in ("get", "post", "put", "delete"):
+        outcome.result = "not passed"
+        outcome.message = f"Nieobsługiwana metoda HTTP: {method}"
+        outcome.failure_message = f"Expected: {test_case.expected_response}, Got: 0"
+        outcome.actual_response = outcome.failure_message[:500]
+        return outcome
+
+    start_time = time.perf_counter()
+    try:
+        if is_soap_case(test_case):
+            # Przypadki SOAP z test_cases: koperta XML zamiast JSON, ten sam serwer (endpoint /soap/ w aplikacji FastAPI)
+            response = session.request(method, base_url + test_case.endpoint, data=build_soap_envelope(test_case),
+                                       headers=SOAP_HEADERS)
+        else:
+            response = session.request(method, base_url + test_case.endpoint, json=build_payload(test_case))
+        outcome.actual_status = response.status_code
+        outcome.response_text = response.text
+        outcome.actual_response = check_response(test_case, response)
+    except AssertionError as e:
+        outcome.result = "not passed"
+        outcome.message = str(e)
+        outcome.failure_message = f"Expected: {test_case.expected_response}, Got: {outcome.actual_status}"
+        outcome.actual_response = outcome.failure_message[:500]
+    except Exception as e:
+        outcome.result = "not passed"
+        outcome.message = str(e)
+        outcome.failure_message = f"Error: {e}"
+        outcome.actual_response = outcome.failure_message[:500]
+        outcome.error = True
+    finally:
+        outcome.duration_ms = int((time.perf_counter() - start_time) * 1000)
+    return outcome
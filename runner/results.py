@@ -0,0 +1,136 @@
+import atexit
+import datetime
+import signal
+import threading
+from sqlalchemy import insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from api.database.db_config import engine
+from api.models.test_case_stats import TestCaseStats
+from api.models.test_result import TestResult
+from runner.stats import PENDING_DEFECT_KEY, update_test_stats
+
+RESULT_BATCH_SIZE = 500
+RESULT_FLUSH_INTERVAL = 2.0  # sekundy
+
+
+class ResultWriter:
+    # Buforuje wyniki testów i zapisuje je partiami: jeden INSERT (executemany) i jeden commit na partię.
+    # Zapis następuje po zebraniu batch_size wierszy, co flush_interval sekund oraz przy zamknięciu –
+    # także po wyjątku, Ctrl+C (KeyboardInterrupt), SIGTERM i przy wyjściu z interpretera (atexit).
+    def __init__(self, bind=None, batch_size: int = RESULT_BATCH_SIZE, flush_interval: float | None = RESULT_FLUSH_INTERVAL):
+        self.bind = bind if bind is not None else engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.started_at = datetime.datetime.utcnow()
+        self.written = 0
+        self.flushes = 0
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # partie trafiają do bazy po kolei
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous_sigterm = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def start(self):
+        atexit.register(self.close)
+        if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+            # Domyślnie SIGTERM kończy proces bez bloków finally – zamieniamy go na SystemExit
+            self._previous_sigterm = signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        if self.flush_interval:
+            self._thread = threading.Thread(target=self._flush_periodically, name="result-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def add(self, test_id: str, result: str, actual_status: int, actual_response: str, defect_key: str | None,
+            duration_ms: int, retry_count: int, environment: str = "local", tester: str = "automated"):
+        row = {
+            "test_id": test_id,
+            "result": result,
+            "actual_status": actual_status,
+            "actual_response": actual_response,
+            "defect_key": defect_key,
+            "timestamp": datetime.datetime.utcnow(),  # czas wykonania testu, a nie zapisu partii
+            "duration_ms": duration_ms,
+            "environment": environment,
+            "tester": tester,
+            "retry_count": retry_count,
+        }
+        with self._buffer_lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                with self.bind.begin() as connection:
+                    connection.execute(insert(TestResult), rows)
+                    # Statystyki per test_id w tej samej transakcji – zawsze zgodne z test_results
+                    update_test_stats(connection, rows)
+            except SQLAlchemyError:
+                # Wiersze wracają do bufora – kolejny flush spróbuje zapisać je ponownie
+                with self._buffer_lock:
+                    self._buffer[:0] = rows
+                raise
+            self.written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    def set_defect_key(self, test_id: str, defect_key: str):
+        # Klucz defektu rozwiązany w tle (DefectReporter) zastępuje PENDING w wynikach z tego uruchomienia –
+        # zarówno w buforze, jak i w wierszach już zapisanych
+        with self._flush_lock:
+            with self._buffer_lock:
+                for row in self._buffer:
+                    if row["test_id"] == test_id and row["defect_key"] == PENDING_DEFECT_KEY:
+                        row["defect_key"] = defect_key
+            with self.bind.begin() as connection:
+                connection.execute(
+                    update(TestResult)
+                    .where(
+                        TestResult.test_id == test_id,
+                        TestResult.defect_key == PENDING_DEFECT_KEY,
+                        TestResult.timestamp >= self.started_at,
+                    )
+                    .values(defect_key=defect_key)
+                )
+                connection.execute(update(TestCaseStats).where(TestCaseStats.test_id == test_id).values(last_defect_key=defect_key))
+
+    def pending(self) -> int:
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        try:
+            self.flush()
+        finally:
+            atexit.unregister(self.close)
+            if self._previous_sigterm is not None:
+                signal.signal(signal.SIGTERM, self._previous_sigterm)
+                self._previous_sigterm = None
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except SQLAlchemyError as e:
+                print(f"Błąd podczas zapisu partii wyników: {e}")
+
+
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(128 + signum)
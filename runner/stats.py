@@ -0,0 +1,107 @@
+from sqlalchemy import func, select
+from api.database.bulk import dialect_insert
+from api.models.test_case_stats import TestCaseStats
+from api.models.test_result import TestResult
+
+# Znacznik zapisywany, gdy zgłoszenie do JIRA się nie powiodło – to nie jest klucz defektu
+PENDING_DEFECT_KEY = "PENDING"
+
+
+def _defect_key(value: str | None) -> str | None:
+    return value if value and value != PENDING_DEFECT_KEY else None
+
+
+def aggregate_results(rows) -> list[dict]:
+    # Jedna pozycja na test_id z partii wyników: liczba wyników i wartości z ostatniego z nich
+    stats = {}
+    for row in rows:
+        previous = stats.get(row["test_id"])
+        stats[row["test_id"]] = {
+            "test_id": row["test_id"],
+            "run_count": previous["run_count"] + 1 if previous else 1,
+            "last_result": row["result"],
+            "last_status": row["actual_status"],
+            "last_duration_ms": row["duration_ms"],
+            "last_defect_key": _defect_key(row["defect_key"]) or (previous["last_defect_key"] if previous else None),
+            "last_run_at": row["timestamp"],
+        }
+    return list(stats.values())
+
+
+def update_test_stats(connection, rows):
+    # Wywoływane w tej samej transakcji co INSERT partii do test_results
+    if not rows:
+        return
+    statement = dialect_insert(TestCaseStats, connection.dialect.name)
+    statement = statement.on_conflict_do_update(
+        index_elements=["test_id"],
+        set_={
+            "run_count": TestCaseStats.run_count + statement.excluded.run_count,
+            "last_result": statement.excluded.last_result,
+            "last_status": statement.excluded.last_status,
+            "last_duration_ms": statement.excluded.last_duration_ms,
+            "last_defect_key": func.coalesce(statement.excluded.last_defect_key, TestCaseStats.last_defect_key),
+            "last_run_at": statement.excluded.last_run_at,
+        },
+    )
+    connection.execute(statement, aggregate_results(rows))
+
+
+def rebuild_test_stats(connection):
+    # Pełne przeliczenie z historii test_results: jedno zapytanie z funkcjami okna zamiast COUNT na każdy test
+    ranked = select(
+        TestResult.test_id,
+        TestResult.result,
+        TestResult.actual_status,
+        TestResult.duration_ms,
+        TestResult.timestamp,
+        func.count().over(partition_by=TestResult.test_id).label("run_count"),
+        func.row_number().over(partition_by=TestResult.test_id, order_by=TestResult.id.desc()).label("position"),
+    ).subquery()
+    defects = (
+        select(
+            TestResult.test_id,
+            TestResult.defect_key,
+            func.row_number().over(partition_by=TestResult.test_id, order_by=TestResult.id.desc()).label("position"),
+        )
+        .where(TestResult.defect_key.is_not(None), TestResult.defect_key != PENDING_DEFECT_KEY)
+        .subquery()
+    )
+    latest = (
+        select(
+            ranked.c.test_id,
+            ranked.c.run_count,
+            ranked.c.result,
+            ranked.c.actual_status,
+            ranked.c.duration_ms,
+            defects.c.defect_key,
+            ranked.c.timestamp,
+        )
+        .outerjoin(defects, (defects.c.test_id == ranked.c.test_id) & (defects.c.position == 1))
+        .where(ranked.c.position == 1)
+    )
+    connection.execute(TestCaseStats.__table__.delete())
+    connection.execute(
+        TestCaseStats.__table__.insert().from_select(
+            ["test_id", "run_count", "last_result", "last_status", "last_duration_ms", "last_defect_key", "last_run_at"],
+            latest,
+        )
+    )
+
+
+def ensure_test_stats(connection):
+    # Bazy z historią sprzed wprowadzenia tabeli statystyk wypełniamy jednorazowo z test_results
+    TestCaseStats.__table__.create(connection, checkfirst=True)
+    has_stats = connection.scalar(select(TestCaseStats.test_id).limit(1)) is not None
+    if not has_stats and connection.scalar(select(TestResult.id).limit(1)) is not None:
+        rebuild_test_stats(connection)
+
+
+def load_test_stats(connection) -> dict:
+    # test_id -> wiersz statystyk; jedno zapytanie na początku uruchomienia
+    return {row.test_id: row for row in connection.execute(select(TestCaseStats))}
+
+
+def failed_test_ids(stats: dict) -> list[str]:
+    # Tylko testy, których OSTATNI wynik to "not passed" – naprawione testy nie wracają do --run-failed
+    return sorted(test_id for test_id, row in stats.items() if row.last_result == "not passed")
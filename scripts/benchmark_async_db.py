@@ -0,0 +1,113 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from api.database.db_config import Base
+from api.models.product import Product
+from scripts.benchmark_pagination import seed_products
+
+# Porównanie: synchroniczna sesja w handlerze async (poprzedni układ) vs AsyncSession
+# Oba warianty działają jako osobne procesy uvicorn, a obciążenie generuje ten skrypt
+CONCURRENCY_LEVELS = [1, 16, 128]
+REQUESTS_PER_LEVEL = 2000
+TABLE_SIZE = 200_000
+PAGE_LIMIT = 100
+PORT = 8010
+
+
+def create_legacy_app() -> FastAPI:
+    # Odtworzenie poprzedniego handlera: zapytanie przez SessionLocal blokuje pętlę zdarzeń
+    from api.database.db_config import SessionLocal
+
+    legacy_app = FastAPI()
+
+    @legacy_app.get("/api/v1/products")
+    async def get_products(cursor: int = 0, limit: int = PAGE_LIMIT):
+        db = SessionLocal()
+        try:
+            return db.query(Product).filter(Product.id > cursor).order_by(Product.id).limit(limit).all()
+        finally:
+            db.close()
+
+    return legacy_app
+
+
+def start_server(target: list[str], database_url: str) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", *target, "--port", str(PORT), "--log-level", "warning", "--timeout-keep-alive", "60"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/api/v1/products", params={"limit": 1})
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Serwer uvicorn nie wystartował")
+
+
+async def run_level(concurrency: int, total: int, table_size: int) -> list[float]:
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        cursors = iter([(i * 97) % (table_size - PAGE_LIMIT) for i in range(total)])
+
+        async def worker():
+            for cursor in cursors:
+                start = time.perf_counter()
+                response = await client.get("/api/v1/products", params={"cursor": cursor, "limit": PAGE_LIMIT})
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run_benchmark(table_size: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        seed_products(engine, table_size)
+        engine.dispose()
+
+        variants = (
+            ("sync", ["--factory", "scripts.benchmark_async_db:create_legacy_app"]),
+            ("async", ["api.main:app"]),
+        )
+        results = {}
+        for label, target in variants:
+            server = start_server(target, database_url)
+            try:
+                for concurrency in CONCURRENCY_LEVELS:
+                    start = time.perf_counter()
+                    latencies = asyncio.run(run_level(concurrency, REQUESTS_PER_LEVEL, table_size))
+                    results[(concurrency, label)] = (latencies, time.perf_counter() - start)
+            finally:
+                server.terminate()
+                server.wait()
+
+        print(f"{'klienci':>8} | {'wariant':>8} | {'p50':>10} | {'p99':>10} | {'req/s':>8}")
+        for concurrency in CONCURRENCY_LEVELS:
+            for label, _ in variants:
+                latencies, elapsed = results[(concurrency, label)]
+                print(
+                    f"{concurrency:>8} | {label:>8} | {percentile(latencies, 0.5):>7.2f} ms | "
+                    f"{percentile(latencies, 0.99):>7.2f} ms | {len(latencies) / elapsed:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else TABLE_SIZE)
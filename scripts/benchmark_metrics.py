@@ -0,0 +1,108 @@
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from api.database.db_config import Base, create_db_engine, to_async_url
+from api.main import app
+from api.metrics import MetricsMiddleware, MetricsRegistry, install_engine_listeners, remove_engine_listeners
+from api.routes import rest_api
+from scripts.generate_data import generate
+
+# Narzut MetricsMiddleware: ten sam router FastAPI wywoływany bezpośrednio (ASGI, bez sieci i serwera)
+# z middleware i słuchaczami SQLAlchemy oraz bez nich. Rundy na przemian, wynik – mediana czasu na żądanie.
+REQUESTS_PER_ROUND = 2000
+ROUNDS = 10
+ENDPOINTS = {
+    "GET / (bez bazy)": ("/", b""),
+    "GET /customers (baza)": ("/api/v1/customers", b"limit=20"),
+}
+
+
+def http_scope(path: str, query: bytes) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query, "root_path": "",
+        "headers": [(b"host", b"benchmark")], "client": ("127.0.0.1", 50000), "server": ("benchmark", 80), "app": app,
+    }
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def call(asgi_app, path: str, query: bytes):
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await asgi_app(http_scope(path, query), receive, send)
+    assert status == 200, status
+
+
+async def microseconds_per_request(asgi_app, path: str, query: bytes, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await call(asgi_app, path, query)
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+async def measure(database_url: str, count: int) -> dict:
+    # Silnik aiosqlite tworzony i zamykany w tej samej pętli zdarzeń co żądania
+    async_engine = create_async_engine(to_async_url(database_url))
+    session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[rest_api.get_db] = override_get_db
+    app.dependency_overrides[rest_api.get_read_db] = override_get_db
+    try:
+        return await measure_endpoints(count)
+    finally:
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+
+
+async def measure_endpoints(count: int) -> dict:
+    instrumented = MetricsMiddleware(app.router, MetricsRegistry())
+    results = {}
+    for label, (path, query) in ENDPOINTS.items():
+        samples = {"bez metryk": [], "z metrykami": []}
+        await call(app.router, path, query)  # rozgrzanie: pula połączeń, cache planów SQLAlchemy
+        variants = [("bez metryk", app.router, remove_engine_listeners), ("z metrykami", instrumented, install_engine_listeners)]
+        for round_number in range(ROUNDS):
+            # Kolejność wariantów zmieniana co rundę – dryf czasu (cache, GC, częstotliwość CPU) nie faworyzuje żadnego
+            for variant, asgi_app, configure_listeners in variants[::-1] if round_number % 2 else variants:
+                configure_listeners()
+                samples[variant].append(await microseconds_per_request(asgi_app, path, query, count))
+        results[label] = {variant: statistics.median(values) for variant, values in samples.items()}
+    return results
+
+
+def run_benchmark(count: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        engine = create_db_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        generate(engine, products=1000, customers=1000, orders=0)
+        engine.dispose()
+        results = asyncio.run(measure(database_url, count))
+
+    print(f"{count} żądań na rundę, mediana z {ROUNDS} rund")
+    for label, variants in results.items():
+        overhead = variants["z metrykami"] - variants["bez metryk"]
+        print(
+            f"{label:<24} | bez metryk {variants['bez metryk']:>7.1f} µs | z metrykami {variants['z metrykami']:>7.1f} µs | "
+            f"narzut {overhead:>5.1f} µs ({overhead / variants['bez metryk']:>5.1%})"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS_PER_ROUND)
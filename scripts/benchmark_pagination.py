@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from api.database.db_config import Base
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.main import app
+from api.models.product import Product
+from api.routes.rest_api import get_read_db
+
+# Rozmiary tabeli products, dla których mierzymy czas pobrania jednej strony
+TABLE_SIZES = [10_000, 100_000, 1_000_000]
+PAGE_LIMIT = 100
+REPEATS = 50
+INSERT_CHUNK = 50_000
+
+
+def seed_products(engine, count: int):
+    with engine.begin() as conn:
+        for start in range(0, count, INSERT_CHUNK):
+            rows = [
+                {
+                    "name": f"Produkt {i}",
+                    "description": f"Opis produktu {i}",
+                    "price": float(i % 5000) + 0.99,
+                    "available": i % 3 != 0,
+                    "stock": i % 200,
+                }
+                for i in range(start, min(start + INSERT_CHUNK, count))
+            ]
+            conn.execute(insert(Product), rows)
+
+
+def measure(client: TestClient, params: dict) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        response = client.get("/api/v1/products", params=params)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def run_benchmark(sizes):
+    print(f"{'wiersze':>10} | {'pierwsza strona':>16} | {'środek tabeli':>14} | {'koniec tabeli':>14} | {'fields=id,name':>15}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "bench.db")
+            engine = create_engine(f"sqlite:///{db_path}")
+            Base.metadata.create_all(bind=engine)
+            seed_products(engine, size)
+            TestingSession = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool), expire_on_commit=False)
+
+            async def override_get_read_db():
+                async with TestingSession() as db:
+                    yield db
+
+            app.dependency_overrides[get_read_db] = override_get_read_db
+            try:
+                client = TestClient(app)
+                first = measure(client, {"limit": PAGE_LIMIT})
+                middle = measure(client, {"limit": PAGE_LIMIT, "cursor": size // 2})
+                last = measure(client, {"limit": PAGE_LIMIT, "cursor": size - PAGE_LIMIT - 1})
+                sparse = measure(client, {"limit": PAGE_LIMIT, "cursor": size // 2, "fields": "id,name"})
+            finally:
+                app.dependency_overrides.pop(get_read_db, None)
+                engine.dispose()
+        print(f"{size:>10} | {first:>13.2f} ms | {middle:>11.2f} ms | {last:>11.2f} ms | {sparse:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or TABLE_SIZES
+    run_benchmark(sizes)
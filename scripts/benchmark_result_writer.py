@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import time
+from sqlalchemy.orm import sessionmaker
+from api.database.db_config import Base, create_db_engine
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.models.test_result import TestResult
+from runner.results import ResultWriter
+
+# Przepustowość zapisu wyników testów: commit + odczyt kontrolny na wynik (poprzednio) vs zapis partiami
+RESULT_COUNT = 10_000
+BATCH_SIZES = [100, 500, 2000]
+
+
+def result_values(i: int) -> dict:
+    return {
+        "test_id": f"TC_{i % 500:03}",
+        "result": "passed" if i % 7 else "not passed",
+        "actual_status": 200,
+        "actual_response": '{"id": 1, "name": "Laptop"}',
+        "defect_key": None,
+        "duration_ms": i % 300,
+        "retry_count": i // 500,
+    }
+
+
+def write_per_row(engine, count: int, read_back: bool):
+    db_session = sessionmaker(bind=engine)()
+    try:
+        for i in range(count):
+            db_session.add(TestResult(**result_values(i), environment="local", tester="automated"))
+            db_session.commit()
+            if read_back:
+                values = result_values(i)
+                db_session.query(TestResult).filter(TestResult.test_id == values["test_id"]).order_by(TestResult.timestamp.desc()).first()
+    finally:
+        db_session.close()
+
+
+def write_batched(engine, count: int, batch_size: int):
+    with ResultWriter(engine, batch_size=batch_size) as writer:
+        for i in range(count):
+            writer.add(**result_values(i))
+
+
+def measure(write, count: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        start = time.perf_counter()
+        write(engine)
+        elapsed = time.perf_counter() - start
+        with engine.connect() as conn:
+            stored = conn.exec_driver_sql("SELECT count(*) FROM test_results").scalar()
+        engine.dispose()
+    assert stored == count, stored
+    return count / elapsed
+
+
+def run_benchmark(count: int):
+    print(f"{count} wyników, SQLite z ustawieniami silnika aplikacji (SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS)")
+    variants = [
+        ("commit + odczyt na wynik", lambda engine: write_per_row(engine, count, read_back=True)),
+        ("commit na wynik", lambda engine: write_per_row(engine, count, read_back=False)),
+    ] + [
+        (f"ResultWriter, partia {batch_size}", lambda engine, batch_size=batch_size: write_batched(engine, count, batch_size))
+        for batch_size in BATCH_SIZES
+    ]
+    baseline = None
+    for label, write in variants:
+        rate = measure(write, count)
+        baseline = baseline or rate
+        print(f"{label:<28} | {rate:>10.0f} wyników/s | {rate / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else RESULT_COUNT)
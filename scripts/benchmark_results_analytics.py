@@ -0,0 +1,88 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from api.database.db_config import Base, create_db_engine
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.database.results_analytics import ResultsAnalytics
+from api.models.test_result import TestResult
+
+# Statystyki test_results: pętla po obiektach ORM (grupowanie w słowniku, statistics.quantiles)
+# vs wersja kolumnowa z api/database/results_analytics.py – pełne wczytanie, dopisanie nowych wyników i wywołanie bez zmian
+RESULT_COUNT = 200_000
+NEW_RESULTS = 1000
+TEST_COUNT = 200
+ENVIRONMENTS = ("local", "staging", "ci")
+
+
+def result_rows(rng: random.Random, count: int) -> list[dict]:
+    return [
+        {
+            "test_id": f"TC_{rng.randrange(TEST_COUNT):03d}",
+            "environment": rng.choice(ENVIRONMENTS),
+            "result": "passed" if rng.random() < 0.9 else "not passed",
+            "duration_ms": int(rng.lognormvariate(4.5, 0.6)),
+        }
+        for _ in range(count)
+    ]
+
+
+def orm_stats(engine) -> dict:
+    # Dotychczasowe podejście: obiekty ORM i pętla w Pythonie
+    groups = {}
+    with Session(engine) as db:
+        for result in db.query(TestResult).order_by(TestResult.id):
+            groups.setdefault((result.test_id, result.environment), []).append(result)
+    stats = {}
+    for key, results in groups.items():
+        durations = [result.duration_ms for result in results if result.duration_ms is not None]
+        p50, p90, p99 = (statistics.quantiles(durations, n=100, method="inclusive")[i] for i in (49, 89, 98))
+        previous = results[-2] if len(results) > 1 else None
+        stats[key] = {
+            "runs": len(results),
+            "pass_rate": sum(result.result == "passed" for result in results) / len(results),
+            "p50_ms": p50, "p90_ms": p90, "p99_ms": p99,
+            "duration_delta_ms": results[-1].duration_ms - previous.duration_ms if previous else None,
+            "baseline_p50_ms": statistics.median(durations[:-1]) if len(durations) > 1 else None,
+        }
+    return stats
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmark(count: int):
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(TestResult), result_rows(rng, count))
+
+        analytics = ResultsAnalytics()
+        orm_ms = timed(orm_stats, engine)
+        with engine.connect() as conn:
+            full_ms = timed(analytics.report, conn)
+        with engine.begin() as conn:
+            conn.execute(insert(TestResult), result_rows(rng, NEW_RESULTS))
+        with engine.connect() as conn:
+            incremental_ms = timed(analytics.report, conn)
+            cached_ms = timed(analytics.report, conn)
+        engine.dispose()
+
+    print(f"{count} wyników, {TEST_COUNT} testów × {len(ENVIRONMENTS)} środowiska")
+    print(f"pętla po obiektach ORM            | {orm_ms:>8.1f} ms")
+    print(f"kolumnowo, pełne wczytanie        | {full_ms:>8.1f} ms ({orm_ms / full_ms:.1f}x szybciej)")
+    print(f"kolumnowo, +{NEW_RESULTS} nowych wyników   | {incremental_ms:>8.1f} ms")
+    print(f"kolumnowo, bez nowych wyników     | {cached_ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else RESULT_COUNT)
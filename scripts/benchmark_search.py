@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+from api.database.db_config import Base
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.database.search import fts_search_statement, like_search_statement, search_terms
+from api.models.product import Product
+
+# Porównanie wyszukiwania FTS5 (bm25) z pełnym skanem LIKE na tabeli products
+TABLE_SIZES = [100_000, 1_000_000]
+PAGE_LIMIT = 20
+REPEATS = 20
+INSERT_CHUNK = 50_000
+
+CATEGORIES = ["Laptop", "Słuchawki", "Głośniki", "Monitor", "Klawiatura", "Mysz", "Tablet", "Smartfon", "Drukarka", "Kamera"]
+FEATURES = ["gamingowy", "biurowy", "bezprzewodowy", "przenośny", "profesjonalny", "ergonomiczny", "wodoodporny", "cichy"]
+BRANDS = ["Acme", "Zenit", "Orion", "Polar", "Vega", "Nova", "Lumen", "Kappa"]
+
+QUERIES = {
+    "częste słowo": "laptop",
+    "dwa słowa": "laptop gamingowy",
+    "prefiks": "klaw",
+    "rzadki model": "orion 4242",
+}
+
+
+def seed_search_products(engine, count: int, seed: int = 42):
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(0, count, INSERT_CHUNK):
+            rows = []
+            for i in range(start, min(start + INSERT_CHUNK, count)):
+                category, feature, brand = rng.choice(CATEGORIES), rng.choice(FEATURES), rng.choice(BRANDS)
+                rows.append({
+                    "name": f"{category} {brand} {rng.randint(1000, 9999)}",
+                    "description": f"{category} {feature}, seria {brand}, gwarancja {rng.randint(1, 5)} lata",
+                    "price": float(i % 5000) + 0.99,
+                    "available": i % 3 != 0,
+                    "stock": i % 200,
+                })
+            conn.execute(insert(Product), rows)
+
+
+def measure(session: Session, statement) -> tuple[float, int]:
+    # Mediana czasu wykonania zapytania i liczba zwróconych wierszy
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        rows = session.execute(statement).all()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, len(rows)
+
+
+def run_benchmark(sizes):
+    # LIKE (strona) kończy skan po znalezieniu PAGE_LIMIT wierszy w kolejności id, bez rankingu;
+    # LIKE (wszystkie) to koszt znalezienia wszystkich trafień – minimum dla rankingu lub filtrowania po stronie klienta
+    print(f"{'wiersze':>10} | {'zapytanie':<16} | {'trafienia':>9} | {'FTS5 (bm25)':>12} | {'LIKE (strona)':>13} | {'LIKE (wszystkie)':>16}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+            Base.metadata.create_all(bind=engine)  # tworzy też products_fts i triggery
+            start = time.perf_counter()
+            seed_search_products(engine, size)
+            print(f"{size:>10} | zapis z aktualizacją indeksu FTS: {time.perf_counter() - start:.1f} s")
+            with Session(engine) as session:
+                for label, q in QUERIES.items():
+                    terms = search_terms(q)
+                    fts_ms, _ = measure(session, fts_search_statement(Product, terms, None, PAGE_LIMIT))
+                    like_ms, _ = measure(session, like_search_statement(Product, terms, None, PAGE_LIMIT))
+                    all_matches = like_search_statement(Product, terms, None, PAGE_LIMIT).limit(None).subquery()
+                    scan_ms, _ = measure(session, select(func.count()).select_from(all_matches))
+                    matches = session.scalar(select(func.count()).select_from(all_matches))
+                    print(
+                        f"{size:>10} | {label:<16} | {matches:>9} | {fts_ms:>9.2f} ms | {like_ms:>10.2f} ms | {scan_ms:>13.2f} ms"
+                    )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or TABLE_SIZES
+    run_benchmark(sizes)
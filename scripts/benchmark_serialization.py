@@ -0,0 +1,81 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from api.cache import NullBackend, product_cache
+from api.database.db_config import Base
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.main import app
+from api.models.product import Product
+from api.routes.rest_api import get_read_db
+from scripts.benchmark_pagination import seed_products
+
+# Żądania/s dla GET /api/v1/products: obiekty ORM + jsonable_encoder (poprzednio) vs krotki + orjson
+TABLE_SIZES = [1_000, 100_000]
+PAGE_LIMITS = [100, 1000]
+REQUESTS = 300
+
+
+def create_legacy_app() -> FastAPI:
+    # Poprzedni sposób serializacji: pełne obiekty ORM zwracane z handlera, domyślny JSONResponse
+    legacy_app = FastAPI()
+
+    @legacy_app.get("/api/v1/products")
+    async def get_products(cursor: int = 0, limit: int = 100, db: AsyncSession = Depends(get_read_db)):
+        return (await db.scalars(select(Product).where(Product.id > cursor).order_by(Product.id).limit(limit))).all()
+
+    return legacy_app
+
+
+async def requests_per_second(target: FastAPI, table_size: int, limit: int) -> float:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        start = time.perf_counter()
+        for i in range(REQUESTS):
+            cursor = (i * 97) % max(1, table_size - limit)
+            response = await client.get("/api/v1/products", params={"cursor": cursor, "limit": limit})
+            assert response.status_code == 200, response.text
+        return REQUESTS / (time.perf_counter() - start)
+
+
+def run_benchmark(sizes):
+    legacy_app = create_legacy_app()
+    # Cache wyłączony – mierzymy zapytanie i serializację, a nie trafienia w cache
+    product_cache.backend = NullBackend()
+    print(f"{'wiersze':>10} | {'limit':>5} | {'ORM + jsonable_encoder':>22} | {'krotki + orjson':>15} | {'zmiana':>7}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "bench.db")
+            engine = create_engine(f"sqlite:///{db_path}")
+            Base.metadata.create_all(bind=engine)
+            seed_products(engine, size)
+            engine.dispose()
+            async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+            TestingSession = async_sessionmaker(async_engine, expire_on_commit=False)
+
+            async def override_get_read_db():
+                async with TestingSession() as db:
+                    yield db
+
+            for target in (legacy_app, app):
+                target.dependency_overrides[get_read_db] = override_get_read_db
+            try:
+                for limit in PAGE_LIMITS:
+                    before = asyncio.run(requests_per_second(legacy_app, size, limit))
+                    after = asyncio.run(requests_per_second(app, size, limit))
+                    print(f"{size:>10} | {limit:>5} | {before:>16.1f} req/s | {after:>9.1f} req/s | {after / before:>6.2f}x")
+            finally:
+                for target in (legacy_app, app):
+                    target.dependency_overrides.pop(get_read_db, None)
+                async_engine.sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or TABLE_SIZES
+    run_benchmark(sizes)
@@ -0,0 +1,166 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from flask import Flask, Response, request
+from sqlalchemy.orm import sessionmaker
+from api.database.db_config import Base, create_db_engine
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.routes.soap_api import SERVICE_NS, SOAP_ENV_NS, field_int, parse_request, result_response
+from scripts.generate_data import generate
+from soap_server import create_app
+
+# Żądania/s serwera SOAP: poprzednia implementacja (ElementTree z tekstu, odpowiedzi z f-stringów, dane na sztywno)
+# vs lxml z bajtów, prekompilowane XPath i szablony odpowiedzi z danymi z tabeli products.
+# Oba warianty przez klienta testowego Flask – mierzymy obsługę żądania bez sieci.
+REQUEST_COUNT = 5000
+PRODUCT_COUNT = 10_000
+BATCH_SIZE = 500
+BATCH_REPEAT = 20
+
+
+def create_legacy_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.route("/soap/", methods=["POST"])
+    def soap_service():
+        root = ET.fromstring(request.data.decode("utf-8"))
+        body = root.find(f".//{{{SOAP_ENV_NS}}}Body")
+        operation = list(body)[0].tag.split("}")[-1]
+        if operation == "GetProduct":
+            product_id = body.find(".//id").text
+            response_data = f"{{'id': {product_id}, 'name': 'Laptop', 'description': 'Laptop gamingowy'}}"
+            soap_response = f"""
+            <soap:Envelope xmlns:soap="{SOAP_ENV_NS}">
+                <soap:Body>
+                    <GetProductResponse xmlns="{SERVICE_NS}">
+                        <result>{response_data}</result>
+                    </GetProductResponse>
+                </soap:Body>
+            </soap:Envelope>
+            """
+            return Response(soap_response, mimetype="text/xml", status=200)
+        soap_response = f"""
+        <soap:Envelope xmlns:soap="{SOAP_ENV_NS}">
+            <soap:Body>
+                <CreateProductResponse xmlns="{SERVICE_NS}">
+                    <result>21</result>
+                </CreateProductResponse>
+            </soap:Body>
+        </soap:Envelope>
+        """
+        return Response(soap_response, mimetype="text/xml", status=201)
+
+    return app
+
+
+def envelope(operation: str, fields: str) -> bytes:
+    return (
+        f'<soap:Envelope xmlns:soap="{SOAP_ENV_NS}" xmlns:ns="{SERVICE_NS}">'
+        f"<soap:Body><ns:{operation}>{fields}</ns:{operation}></soap:Body></soap:Envelope>"
+    ).encode()
+
+
+def legacy_xml_roundtrip(body: bytes) -> bytes:
+    root = ET.fromstring(body.decode("utf-8"))
+    product_id = root.find(f".//{{{SOAP_ENV_NS}}}Body").find(".//id").text
+    response_data = f"{{'id': {product_id}, 'name': 'Laptop', 'description': 'Laptop gamingowy'}}"
+    return f"""
+    <soap:Envelope xmlns:soap="{SOAP_ENV_NS}">
+        <soap:Body>
+            <GetProductResponse xmlns="{SERVICE_NS}">
+                <result>{response_data}</result>
+            </GetProductResponse>
+        </soap:Body>
+    </soap:Envelope>
+    """.encode("utf-8")
+
+
+def lxml_xml_roundtrip(body: bytes) -> bytes:
+    operation, element = parse_request(body)
+    product = {"id": field_int(element, "id"), "name": "Laptop", "description": "Laptop gamingowy"}
+    return result_response(operation, 200, product).content
+
+
+def xml_per_second(roundtrip, bodies) -> float:
+    # Samo parsowanie żądania i budowa odpowiedzi, bez Flask i bazy
+    start = time.perf_counter()
+    for body in bodies:
+        roundtrip(body)
+    return len(bodies) / (time.perf_counter() - start)
+
+
+def requests_per_second(client, bodies) -> float:
+    start = time.perf_counter()
+    for body in bodies:
+        response = client.post("/soap/", data=body, content_type="text/xml")
+        assert response.status_code in (200, 201), response.data
+    return len(bodies) / (time.perf_counter() - start)
+
+
+def batch_latency_ms(client, bodies) -> float:
+    # Mediana czasu pobrania/utworzenia BATCH_SIZE produktów: lista kopert wysyłana kolejno (jedna koperta = partia)
+    samples = []
+    for _ in range(BATCH_REPEAT):
+        start = time.perf_counter()
+        for body in bodies:
+            response = client.post("/soap/", data=body, content_type="text/xml")
+            assert response.status_code in (200, 201), response.data
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def product_fields(i: int) -> str:
+    return f"<name>Produkt {i}</name><description>Opis {i}</description><price>99.99</price>"
+
+
+def run_batch_benchmark(client):
+    ids = range(1, BATCH_SIZE + 1)
+    workloads = {
+        "GetProduct(s)": (
+            [envelope("GetProduct", f"<id>{i}</id>") for i in ids],
+            [envelope("GetProducts", "".join(f"<id>{i}</id>" for i in ids))],
+        ),
+        "CreateProduct(s)": (
+            [envelope("CreateProduct", product_fields(i)) for i in ids],
+            [envelope("CreateProducts", "".join(f"<product>{product_fields(i)}</product>" for i in ids))],
+        ),
+    }
+    print(f"{BATCH_SIZE} produktów: {BATCH_SIZE} kopert vs jedna koperta zbiorcza (mediana z {BATCH_REPEAT} powtórzeń)")
+    for operation, (per_item, batch) in workloads.items():
+        per_item_ms, batch_ms = batch_latency_ms(client, per_item), batch_latency_ms(client, batch)
+        print(f"{operation:<16} | po jednym {per_item_ms:>8.1f} ms | partia {batch_ms:>7.1f} ms | {per_item_ms / batch_ms:>5.1f}x")
+
+
+def run_benchmark(count: int):
+    workloads = {
+        "GetProduct": [envelope("GetProduct", f"<id>{i % PRODUCT_COUNT + 1}</id>") for i in range(count)],
+        "CreateProduct": [
+            envelope("CreateProduct", f"<name>Produkt {i}</name><description>Opis {i}</description><price>99.99</price>")
+            for i in range(count)
+        ],
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        generate(engine, products=PRODUCT_COUNT, customers=0, orders=0)
+        apps = {
+            "poprzednia (bez bazy)": create_legacy_app().test_client(),
+            "lxml + szablony + baza": create_app(sessionmaker(bind=engine)).test_client(),
+        }
+        print(f"{count} żądań na operację, {PRODUCT_COUNT} produktów w bazie")
+        for label, roundtrip in [("ElementTree + f-string", legacy_xml_roundtrip), ("lxml + szablon", lxml_xml_roundtrip)]:
+            rate = xml_per_second(roundtrip, workloads["GetProduct"])
+            print(f"{'XML GetProduct':<14} | {label:<24} | {rate:>8.0f} kopert/s")
+        for operation, bodies in workloads.items():
+            for label, client in apps.items():
+                rate = requests_per_second(client, bodies)
+                print(f"{operation:<14} | {label:<24} | {rate:>8.0f} żądań/s")
+        run_batch_benchmark(apps["lxml + szablony + baza"])
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else REQUEST_COUNT)
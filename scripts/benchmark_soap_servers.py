@@ -0,0 +1,106 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+from api.database.db_config import Base, create_db_engine
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from scripts.benchmark_async_db import percentile
+from scripts.benchmark_soap import envelope, product_fields
+from scripts.generate_data import generate
+
+# Test obciążeniowy SOAP: serwer deweloperski Flask (jak w soap_server.py) vs endpoint /soap/ w aplikacji FastAPI pod uvicorn.
+# Oba serwery jako osobne procesy na tej samej bazie; współbieżnych klientów generuje ten skrypt (httpx, keep-alive).
+CONCURRENCY_LEVELS = [1, 16, 64]
+REQUESTS_PER_LEVEL = 2000
+PRODUCT_COUNT = 10_000
+PORT = 8011
+
+# Jak "python soap_server.py" (debug, wątek na połączenie), ale bez reloadera – terminate() kończy cały serwer
+FLASK_SERVER = (
+    "from soap_server import app; "
+    f"app.run(host='127.0.0.1', port={PORT}, debug=True, use_reloader=False)"
+)
+
+
+def servers(workers: int) -> dict[str, list[str]]:
+    # Flask dev server nie ma workerów; uvicorn może mieć kilka procesów (na maszynie z kilkoma rdzeniami)
+    return {
+        "Flask dev": [sys.executable, "-c", FLASK_SERVER],
+        "uvicorn": [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(PORT), "--log-level", "warning",
+                    "--timeout-keep-alive", "60", "--workers", str(workers)],
+    }
+
+
+def start_server(command: list[str], database_url: str) -> subprocess.Popen:
+    server = subprocess.Popen(command, env={**os.environ, "DATABASE_URL": database_url},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            httpx.post(f"http://127.0.0.1:{PORT}/soap/", content=envelope("GetProduct", "<id>1</id>"))
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Serwer SOAP nie wystartował")
+
+
+async def run_level(concurrency: int, bodies: list[bytes]) -> list[float]:
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        pending = iter(bodies)
+
+        async def worker():
+            for body in pending:
+                start = time.perf_counter()
+                response = await client.post("/soap/", content=body, headers={"Content-Type": "text/xml"})
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert response.status_code in (200, 201), response.text
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def run_benchmark(total: int, workers: int = 1):
+    workloads = {
+        "GetProduct": [envelope("GetProduct", f"<id>{(i * 97) % PRODUCT_COUNT + 1}</id>") for i in range(total)],
+        "CreateProduct": [envelope("CreateProduct", product_fields(i)) for i in range(total)],
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        engine = create_db_engine(database_url)
+        Base.metadata.create_all(bind=engine)
+        generate(engine, products=PRODUCT_COUNT, customers=0, orders=0)
+        engine.dispose()
+
+        results = {}
+        commands = servers(workers)
+        for label, command in commands.items():
+            server = start_server(command, database_url)
+            try:
+                for operation, bodies in workloads.items():
+                    for concurrency in CONCURRENCY_LEVELS:
+                        start = time.perf_counter()
+                        latencies = asyncio.run(run_level(concurrency, bodies))
+                        results[(operation, concurrency, label)] = (latencies, time.perf_counter() - start)
+            finally:
+                server.terminate()
+                server.wait()
+
+        print(f"{total} żądań na poziom, {PRODUCT_COUNT} produktów w bazie, workery uvicorn: {workers}")
+        print(f"{'operacja':<14} | {'klienci':>7} | {'serwer':<10} | {'p50':>10} | {'p99':>10} | {'req/s':>8}")
+        for operation in workloads:
+            for concurrency in CONCURRENCY_LEVELS:
+                for label in commands:
+                    latencies, elapsed = results[(operation, concurrency, label)]
+                    print(
+                        f"{operation:<14} | {concurrency:>7} | {label:<10} | {percentile(latencies, 0.5):>7.2f} ms | "
+                        f"{percentile(latencies, 0.99):>7.2f} ms | {len(latencies) / elapsed:>8.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS_PER_LEVEL, int(sys.argv[2]) if len(sys.argv) > 2 else 1)
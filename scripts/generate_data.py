@@ -0,0 +1,185 @@
+import argparse
+import datetime
+import itertools
+import random
+import time
+from sqlalchemy import DateTime, func, insert, select
+from api.database.db_config import Base, create_db_engine, engine as default_engine
+from api.database.db_utils import init_db
+from api.database.search import drop_product_search_insert_trigger, index_products_from
+from api.models.customer import Customer
+from api.models.order import Order
+from api.models.product import Product
+
+# Deterministyczny generator danych testowych (produkty, klienci, zamówienia) do testów obciążeniowych.
+# Ten sam --seed daje te same dane; wiersze są dopisywane do istniejących tabel.
+INSERT_CHUNK = 50_000
+# Indeksy przebudowujemy tylko przy dużym ładowaniu względem istniejącej tabeli (np. pierwsze wypełnienie);
+# przy małym dopisaniu przebudowa całych indeksów kosztowałaby więcej niż wstawienia do B-drzewa
+INDEX_REBUILD_MIN_ROWS = 10_000
+INDEX_REBUILD_RATIO = 0.25
+DEFAULT_SEED = 42
+ZIPF_EXPONENT = 1.1  # popularność produktu ~ 1 / ranga^s
+ORDER_DAYS = 365
+QUANTITIES = [1, 2, 3, 4, 5, 10]
+QUANTITY_WEIGHTS = [70, 15, 7, 4, 3, 1]
+
+CATEGORIES = ["Laptop", "Słuchawki", "Głośniki", "Monitor", "Klawiatura", "Mysz", "Tablet", "Smartfon", "Drukarka", "Kamera"]
+FEATURES = ["gamingowy", "biurowy", "bezprzewodowy", "przenośny", "profesjonalny", "ergonomiczny", "wodoodporny", "cichy"]
+BRANDS = ["Acme", "Zenit", "Orion", "Polar", "Vega", "Nova", "Lumen", "Kappa"]
+FIRST_NAMES = ["Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Magdalena", "Paweł", "Agnieszka", "Michał", "Małgorzata"]
+LAST_NAMES = ["Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski", "Zieliński", "Szymański", "Dąbrowski"]
+CITIES = ["Warszawa", "Kraków", "Gdańsk", "Wrocław", "Poznań", "Łódź", "Lublin", "Gdynia"]
+STREETS = ["Kwiatowa", "Słoneczna", "Leśna", "Polna", "Morska", "Lipowa", "Ogrodowa", "Szkolna"]
+ASCII_LETTERS = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+
+def product_rows(rng: random.Random, first_id: int, count: int):
+    for product_id in range(first_id, first_id + count):
+        category, feature, brand = rng.choice(CATEGORIES), rng.choice(FEATURES), rng.choice(BRANDS)
+        # Ceny o rozkładzie log-normalnym: dużo tanich akcesoriów, mało drogich urządzeń
+        price = round(min(max(rng.lognormvariate(5.5, 1.1), 9.99), 20_000.0), 2)
+        stock = rng.randint(1, 500) if rng.random() < 0.9 else 0  # co dziesiąty produkt wyprzedany
+        yield (product_id, f"{category} {brand} {rng.randint(1000, 9999)}", f"{category} {feature}, seria {brand}",
+               price, stock > 0, stock)
+
+
+def customer_rows(rng: random.Random, first_id: int, count: int):
+    for customer_id in range(first_id, first_id + count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        # id w adresie e-mail zapewnia unikalność przy dowolnej liczbie klientów
+        email = f"{first_name}.{last_name}.{customer_id}@example.com".lower().translate(ASCII_LETTERS)
+        phone = f"{rng.randint(500_000_000, 899_999_999)}" if rng.random() < 0.8 else None
+        address = f"ul. {rng.choice(STREETS)} {rng.randint(1, 200)}, {rng.choice(CITIES)}"
+        yield (customer_id, first_name, last_name, email, phone, address)
+
+
+def zipf_cum_weights(count: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1.0 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def order_rows(rng: random.Random, first_id: int, count: int, products: list[tuple[int, float]], customer_ids: list[int],
+               start: datetime.datetime, days: int, exponent: float):
+    # Produkty losowane z rozkładu Zipfa po losowej permutacji (najpopularniejszy produkt nie musi mieć id 1).
+    # Daty rosną razem z id zamówienia – jak w bazie produkcyjnej – i są rozłożone równomiernie w [start, start + days).
+    ranked = products[:]
+    rng.shuffle(ranked)
+    product_weights = zipf_cum_weights(len(ranked), exponent)
+    quantity_weights = list(itertools.accumulate(QUANTITY_WEIGHTS))
+    span = days * 86_400
+    for chunk_start in range(0, count, INSERT_CHUNK):
+        # Każda porcja dostaje swój przedział czasu – sortowane są tylko daty z jednej porcji
+        size = min(INSERT_CHUNK, count - chunk_start)
+        window_start = span * chunk_start // count
+        window = max(span * (chunk_start + size) // count - window_start, 1)
+        offsets = sorted(window_start + int(rng.random() * window) for _ in range(size))
+        chosen = rng.choices(ranked, cum_weights=product_weights, k=size)
+        quantities = rng.choices(QUANTITIES, cum_weights=quantity_weights, k=size)
+        customers = rng.choices(customer_ids, k=size)
+        for order_id, offset, (product_id, price), quantity, customer_id in zip(
+            range(first_id + chunk_start, first_id + chunk_start + size), offsets, chosen, quantities, customers
+        ):
+            yield (order_id, customer_id, product_id, quantity, start + datetime.timedelta(seconds=offset),
+                   round(price * quantity, 2))
+
+
+def rebuild_indexes(expected_rows: int, existing_rows: int) -> bool:
+    return expected_rows >= INDEX_REBUILD_MIN_ROWS and expected_rows >= existing_rows * INDEX_REBUILD_RATIO
+
+
+def insert_rows(engine, model, rows, expected_rows: int, chunk_size: int = INSERT_CHUNK) -> int:
+    # SQLite: executemany na krotkach bez narzutu ORM/Core; inne bazy – INSERT Core z listą słowników.
+    # Przy dużym ładowaniu indeksy pomocnicze (i trigger FTS produktów) są usuwane na czas ładowania i tworzone
+    # od nowa na końcu – jedno sortowanie zamiast losowych wstawień do B-drzewa przy każdym wierszu.
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    count = 0
+    with engine.begin() as connection:
+        sqlite = connection.dialect.name == "sqlite"
+        first_id = connection.scalar(select(func.coalesce(func.max(table.c.id), 0))) + 1
+        # Liczba istniejących wierszy szacowana z max(id) – bez pełnego skanu COUNT(*)
+        rebuild = rebuild_indexes(expected_rows, first_id - 1)
+        if rebuild:
+            for index in table.indexes:
+                index.drop(connection)
+            if sqlite and model is Product:
+                drop_product_search_insert_trigger(connection)
+        sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        # sqlite3 przyjmuje liczby, tekst i bool bez konwersji; daty zapisujemy w formacie SQLAlchemy
+        # ("YYYY-MM-DD HH:MM:SS.ffffff") – isoformat w C zamiast bind_processor na każdą wartość
+        dates = [position for position, column in enumerate(table.columns) if isinstance(column.type, DateTime)]
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            if sqlite:
+                for position in dates:
+                    chunk = [row[:position] + (row[position].isoformat(" ", "microseconds"),) + row[position + 1:] for row in chunk]
+                connection.exec_driver_sql(sql, chunk)
+            else:
+                connection.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+            count += len(chunk)
+        if rebuild:
+            for index in table.indexes:
+                index.create(connection)
+            if sqlite and model is Product:
+                index_products_from(connection, first_id)
+    return count
+
+
+def next_id(engine, model) -> int:
+    with engine.connect() as connection:
+        return (connection.scalar(select(func.max(model.id))) or 0) + 1
+
+
+def generate(engine, products: int, customers: int, orders: int, seed: int = DEFAULT_SEED,
+             start: datetime.datetime = datetime.datetime(2025, 1, 1), days: int = ORDER_DAYS,
+             exponent: float = ZIPF_EXPONENT) -> dict:
+    # Osobny generator na tabelę – liczba produktów nie zmienia danych klientów i odwrotnie
+    timings = {}
+    for name, model, count, rows in [
+        ("products", Product, products, product_rows),
+        ("customers", Customer, customers, customer_rows),
+    ]:
+        if count:
+            started = time.perf_counter()
+            insert_rows(engine, model, rows(random.Random(f"{seed}-{name}"), next_id(engine, model), count), count)
+            timings[name] = (count, time.perf_counter() - started)
+    if orders:
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            product_prices = [tuple(row) for row in connection.execute(select(Product.id, Product.price).order_by(Product.id))]
+            customer_ids = list(connection.scalars(select(Customer.id).order_by(Customer.id)))
+        if not product_prices or not customer_ids:
+            raise ValueError("Zamówienia wymagają produktów i klientów w bazie")
+        rows = order_rows(random.Random(f"{seed}-orders"), next_id(engine, Order), orders, product_prices, customer_ids,
+                          start, days, exponent)
+        insert_rows(engine, Order, rows, orders)
+        timings["orders"] = (orders, time.perf_counter() - started)
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator danych testowych: produkty, klienci i zamówienia")
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--start-date", type=datetime.date.fromisoformat, default=datetime.date(2025, 1, 1),
+                        help="Data pierwszego zamówienia (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=ORDER_DAYS, help="Liczba dni, na które rozkładają się zamówienia")
+    parser.add_argument("--zipf", type=float, default=ZIPF_EXPONENT, help="Wykładnik rozkładu popularności produktów")
+    parser.add_argument("--database-url", help="Domyślnie DATABASE_URL aplikacji")
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_db_engine(args.database_url)
+        Base.metadata.create_all(bind=engine)
+    else:
+        engine = default_engine
+        init_db()
+    start = datetime.datetime.combine(args.start_date, datetime.time())
+    timings = generate(engine, args.products, args.customers, args.orders, args.seed, start, args.days, args.zipf)
+    for name, (count, seconds) in timings.items():
+        print(f"{name:<10} | {count:>10} wierszy | {seconds:>6.1f} s | {count / seconds:>10.0f} wierszy/s")
+
+
+if __name__ == "__main__":
+    main()
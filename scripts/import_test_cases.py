@@ -1,74 +1,84 @@
+import csv
 import os
-import pandas as pd
-from sqlalchemy.orm import Session
-from api.database.db_config import SessionLocal, DATABASE_URL
+import sys
+import time
+from itertools import islice
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from api.database.bulk import dialect_insert
+from api.database.db_config import engine, DATABASE_URL
 from api.database.db_utils import init_db
 from api.models.test_case import TestCase
 
 # Dynamiczne określenie ścieżki do pliku CSV
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CSV_FILE_PATH = os.path.join(BASE_DIR, "tests", "test_data", "test_cases.csv")
+IMPORT_CHUNK_SIZE = 5000
 
-def import_test_cases():
-    # Wyświetlamy ścieżkę do bazy danych
-    print(f"Ścieżka do bazy danych: {DATABASE_URL}")
-
-    # Inicjalizujemy bazę danych (tworzymy tabele, jeśli nie istnieją)
-    init_db()
-    print("Tabele w bazie danych zostały zainicjowane.")
-
-    # Otwieramy sesję bazy danych
-    db: Session = SessionLocal()
-    try:
-        # Wczytujemy plik CSV linia po linii, aby debugować
-        print(f"Próbuję wczytać plik CSV: {CSV_FILE_PATH}")
-        with open(CSV_FILE_PATH, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                print(f"Linia {i + 1}: {line.strip()}")
-                fields = line.strip().split(',')
-                print(f"Liczba pól w linii {i + 1}: {len(fields)}")
+CSV_COLUMNS = ["test_id", "description", "endpoint", "method", "test_type", "expected_status", "expected_response"]
+UPDATED_COLUMNS = CSV_COLUMNS[1:]
 
-        # Wczytujemy plik CSV za pomocą pandas
-        df = pd.read_csv(CSV_FILE_PATH)
-        print(f"Wczytano {len(df)} przypadków testowych z pliku CSV.")
-        print("Wczytane dane z CSV:")
-        print(df)
 
-        # Iterujemy po wierszach w pliku CSV
-        for index, row in df.iterrows():
-            print(f"Przetwarzam wiersz {index + 1}: {row.to_dict()}")
+def read_chunks(csv_path: str, chunk_size: int):
+    # Plik czytany strumieniowo – w pamięci jest najwyżej jedna porcja wierszy
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = set(CSV_COLUMNS) - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Brak kolumn w pliku CSV: {', '.join(sorted(missing))}")
+        while chunk := list(islice(reader, chunk_size)):
+            yield [
+                {
+                    **{column: row[column] for column in CSV_COLUMNS},
+                    "expected_status": int(row["expected_status"]) if row["expected_status"] else None,
+                }
+                for row in chunk
+            ]
 
-            existing_test = db.query(TestCase).filter(TestCase.test_id == row['test_id']).first()
-            if existing_test:
-                print(f"Przypadek testowy {row['test_id']} już istnieje, pomijam.")
-                continue
 
-            test_case = TestCase(
-                test_id=row['test_id'],
-                description=row['description'],
-                endpoint=row['endpoint'],
-                method=row['method'],
-                test_type=row['test_type'],
-                expected_status=row['expected_status'],
-                expected_response=row['expected_response']
-            )
-            db.add(test_case)
-            print(f"Dodano przypadek testowy: {row['test_id']}")
+def upsert_chunk(connection, rows: list[dict]) -> int:
+    # Ostatnie wystąpienie test_id w porcji wygrywa – ON CONFLICT nie może zmienić tego samego wiersza dwa razy
+    rows = list({row["test_id"]: row for row in rows}.values())
+    test_ids = [row["test_id"] for row in rows]
+    existing = len(connection.scalars(select(TestCase.test_id).where(TestCase.test_id.in_(test_ids))).all())
+    statement = dialect_insert(TestCase, connection.dialect.name)
+    statement = statement.on_conflict_do_update(
+        index_elements=["test_id"],
+        set_={column: statement.excluded[column] for column in UPDATED_COLUMNS},
+    )
+    connection.execute(statement, rows)
+    return existing
 
-        db.commit()
-        print("Import zakończony sukcesem!")
 
-        saved_cases = db.query(TestCase).all()
-        print(f"Liczba zapisanych przypadków testowych w bazie: {len(saved_cases)}")
-        for case in saved_cases:
-            print(f"Zapisany przypadek: {case.test_id}, {case.description}")
+def import_test_cases(csv_path: str = CSV_FILE_PATH, bind=None, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    # Nowe przypadki są dodawane, istniejące (po test_id) aktualizowane; jedna transakcja na porcję
+    bind = bind if bind is not None else engine
+    stats = {"rows": 0, "inserted": 0, "updated": 0}
+    start = time.perf_counter()
+    for rows in read_chunks(csv_path, chunk_size):
+        with bind.begin() as connection:
+            existing = upsert_chunk(connection, rows)
+        stats["rows"] += len(rows)
+        stats["updated"] += existing
+        stats["inserted"] += len({row["test_id"] for row in rows}) - existing
+        elapsed = time.perf_counter() - start
+        print(f"Zaimportowano {stats['rows']} wierszy ({stats['rows'] / elapsed:.0f} wierszy/s)")
+    stats["seconds"] = time.perf_counter() - start
+    return stats
 
-    except Exception as e:
-        print(f"Wystąpił błąd podczas importu: {e}")
-        db.rollback()
-    finally:
-        db.close()
 
 if __name__ == "__main__":
-    import_test_cases()
\ No newline at end of file
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else CSV_FILE_PATH
+    print(f"Ścieżka do bazy danych: {DATABASE_URL}")
+    init_db()
+    print(f"Import przypadków testowych z pliku: {csv_path}")
+    try:
+        result = import_test_cases(csv_path)
+    except (OSError, ValueError, SQLAlchemyError) as e:
+        print(f"Wystąpił błąd podczas importu: {e}")
+        sys.exit(1)
+    rate = result["rows"] / result["seconds"] if result["seconds"] else 0
+    print(
+        f"Import zakończony sukcesem! Wierszy: {result['rows']}, nowych: {result['inserted']}, "
+        f"zaktualizowanych: {result['updated']}, {rate:.0f} wierszy/s"
+    )
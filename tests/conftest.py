@@ -0,0 +1,141 @@
+import asyncio
+import os
+from contextlib import contextmanager
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from api.database.db_config import Base, engine
+from api.database.db_utils import init_db  # noqa: F401 – rejestruje wszystkie modele w Base.metadata
+from api.cache import product_cache
+from api.database.results_analytics import results_analytics
+from api.main import app
+from api.routes import rest_api
+from runner.engine import DEFAULT_WORKERS
+from runner.flaky import flaky_test_ids, load_flaky_stats, update_flaky_stats
+from runner.results import ResultWriter
+from runner.stats import ensure_test_stats, load_test_stats
+
+# Opcje wiersza poleceń dla testów uruchamianych na żywym API (muszą być w conftest.py, aby pytest je rozpoznał)
+def pytest_addoption(parser):
+    parser.addoption(
+        "--test-ids",
+        action="store",
+        default=None,
+        help="Comma-separated list of test IDs to run (e.g., TC_001,TC_002)"
+    )
+    parser.addoption(
+        "--run-failed",
+        action="store_true",
+        default=False,
+        help="Run only tests that failed in the last run"
+    )
+    parser.addoption(
+        "--workers",
+        action="store",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of test cases executed concurrently against the API"
+    )
+    parser.addoption(
+        "--skip-flaky",
+        action="store_true",
+        default=False,
+        help="Skip test cases detected as flaky in the test_results history"
+    )
+    parser.addoption(
+        "--quarantine",
+        action="store_true",
+        default=False,
+        help="Run flaky test cases, but do not report defects or fail the run when they fail"
+    )
+
+# Wyniki testów na żywym API zapisywane partiami; zamknięcie zapisuje resztę bufora także po błędzie
+@pytest.fixture
+def result_writer():
+    with ResultWriter() as writer:
+        yield writer
+    print(f"Zapisano {writer.written} wyników testów w {writer.flushes} partiach")
+
+# Statystyki per test_id (liczba uruchomień, ostatni wynik, ostatni defekt) – wczytywane raz na uruchomienie
+@pytest.fixture
+def test_stats():
+    with engine.begin() as connection:
+        ensure_test_stats(connection)
+        return load_test_stats(connection)
+
+# Niestabilne testy (runner/flaky.py) – skan przyrostowy historii tylko przy --skip-flaky albo --quarantine
+@pytest.fixture
+def flaky_tests(request) -> set[str]:
+    if not (request.config.getoption("--skip-flaky") or request.config.getoption("--quarantine")):
+        return set()
+    with engine.begin() as connection:
+        scanned = update_flaky_stats(connection)
+        flaky = set(flaky_test_ids(load_flaky_stats(connection)))
+    print(f"Przetworzono {scanned} nowych wyników, niestabilne testy: {sorted(flaky) or 'brak'}")
+    return flaky
+
+# Fixtures dla testów działających na tymczasowej bazie SQLite (bez uruchomionego serwera)
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return os.path.join(tmp_path, "test_store.db")
+
+@pytest.fixture
+def sqlite_engine(sqlite_path):
+    engine = create_engine(f"sqlite:///{sqlite_path}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=sqlite_engine)
+
+@pytest.fixture
+def async_engine(sqlite_engine, sqlite_path):
+    # Tabele tworzy sqlite_engine, a API korzysta z tej samej bazy przez aiosqlite
+    # NullPool – TestClient i asyncio.run używają różnych pętli zdarzeń, więc połączeń nie współdzielimy
+    engine = create_async_engine(f"sqlite+aiosqlite:///{sqlite_path}", poolclass=NullPool)
+    yield engine
+    engine.sync_engine.dispose()
+
+@pytest.fixture
+def async_session_factory(async_engine):
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture
+def count_queries(async_engine):
+    # Zbiera instrukcje SQL wysłane przez API w bloku with – do testów liczby zapytań (N+1)
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record_statement)
+
+    return counter
+
+@pytest.fixture
+def api_client(async_session_factory):
+    async def override_get_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[rest_api.get_db] = override_get_db
+    app.dependency_overrides[rest_api.get_read_db] = override_get_db
+    app.dependency_overrides[rest_api.get_session_factory] = lambda: async_session_factory
+    # Cache produktów i analityka test_results są globalne dla procesu – każdy test zaczyna z pustymi
+    asyncio.run(product_cache.clear())
+    results_analytics.clear()
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import insert, select, text
+from api.models.product import Product
+
+def product(name, price=10.0):
+    return {"name": name, "description": f"Opis {name}", "price": price}
+
+def stored(engine) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(select(Product.id, Product.name).order_by(Product.id)).all())
+
+@pytest.fixture
+def rejecting_trigger(sqlite_engine):
+    # Błąd bazy dla wybranych wierszy – walidacja Pydantic przepuszcza je do INSERT/UPDATE
+    with sqlite_engine.begin() as conn:
+        for operation in ("INSERT", "UPDATE"):
+            conn.execute(text(
+                f"CREATE TRIGGER reject_{operation.lower()} BEFORE {operation} ON products "
+                f"WHEN NEW.name = 'Odrzucony' BEGIN SELECT RAISE(ABORT, 'odrzucony produkt'); END"
+            ))
+
+def test_create_returns_ids_in_request_order(api_client, sqlite_engine, count_queries):
+    names = [f"Produkt {i}" for i in range(7)]
+    with count_queries() as statements:
+        response = api_client.post("/api/v1/products/bulk", params={"chunk_size": 3}, json=[product(name) for name in names])
+    assert response.status_code == 201
+    body = response.json()
+    assert (body["mode"], body["succeeded"], body["failed"]) == ("atomic", 7, 0)
+    assert [item["index"] for item in body["items"]] == list(range(7))
+    # Id z RETURNING odpowiadają kolejności elementów żądania
+    products = stored(sqlite_engine)
+    assert [products[item["id"]] for item in body["items"]] == names
+    # Porcje 3 + 3 + 1 – jeden INSERT na porcję, a nie na wiersz
+    assert len([statement for statement in statements if statement.startswith("INSERT")]) == 3
+
+def test_large_chunk_is_one_insert(api_client, sqlite_engine, count_queries):
+    names = [f"Produkt {i}" for i in range(100)]
+    with count_queries() as statements:
+        response = api_client.post("/api/v1/products/bulk", json=[product(name) for name in names])
+    assert response.status_code == 201
+    assert len([statement for statement in statements if statement.startswith("INSERT")]) == 1
+    products = stored(sqlite_engine)
+    assert [products[item["id"]] for item in response.json()["items"]] == names
+
+def test_atomic_create_rolls_back_whole_batch(api_client, sqlite_engine, rejecting_trigger):
+    # Porcje [A, B], [Odrzucony, C], [D] – błąd oznacza całą swoją porcję, kolejne są pomijane
+    names = ["A", "B", "Odrzucony", "C", "D"]
+    response = api_client.post("/api/v1/products/bulk", params={"chunk_size": 2}, json=[product(name) for name in names])
+    assert response.status_code == 409
+    body = response.json()
+    assert [item["status"] for item in body["items"]] == ["rolled_back", "rolled_back", "error", "error", "skipped"]
+    assert "odrzucony produkt" in body["items"][2]["detail"]
+    assert (body["succeeded"], body["failed"]) == (0, 2)
+    assert stored(sqlite_engine) == {}
+
+def test_best_effort_create_isolates_failed_rows(api_client, sqlite_engine, rejecting_trigger):
+    # Porcja z błędem powtarzana element po elemencie, pozostałe zatwierdzane w całości
+    names = ["A", "B", "Odrzucony", "C", "D"]
+    response = api_client.post(
+        "/api/v1/products/bulk", params={"mode": "best_effort", "chunk_size": 2}, json=[product(name) for name in names]
+    )
+    assert response.status_code == 207
+    body = response.json()
+    assert [item["status"] for item in body["items"]] == ["created", "created", "error", "created", "created"]
+    assert (body["succeeded"], body["failed"]) == (4, 1)
+    products = stored(sqlite_engine)
+    assert sorted(products.values()) == ["A", "B", "C", "D"]
+    assert {products[item["id"]] for item in body["items"] if "id" in item} == {"A", "B", "C", "D"}
+
+def test_update_reports_missing_ids(api_client, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [product("A"), product("B")])
+    changes = [{"id": 1, "price": 20.0}, {"id": 99, "price": 30.0}, {"id": 2, "name": "B2"}]
+
+    response = api_client.patch("/api/v1/products/bulk", json=changes)
+    assert response.status_code == 409
+    assert [(item["id"], item["status"]) for item in response.json()["items"]] == [
+        (1, "rolled_back"), (99, "not_found"), (2, "rolled_back"),
+    ]
+    assert stored(sqlite_engine) == {1: "A", 2: "B"}
+
+    response = api_client.patch("/api/v1/products/bulk", params={"mode": "best_effort", "chunk_size": 1}, json=changes)
+    assert response.status_code == 207
+    assert [item["status"] for item in response.json()["items"]] == ["updated", "not_found", "updated"]
+    assert stored(sqlite_engine) == {1: "A", 2: "B2"}
+
+def test_best_effort_update_isolates_failed_rows(api_client, sqlite_engine, rejecting_trigger):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [product("A"), product("B"), product("C")])
+    changes = [{"id": 1, "name": "A2"}, {"id": 2, "name": "Odrzucony"}, {"id": 3, "name": "C2"}]
+    response = api_client.patch("/api/v1/products/bulk", params={"mode": "best_effort"}, json=changes)
+    assert response.status_code == 207
+    assert [item["status"] for item in response.json()["items"]] == ["updated", "error", "updated"]
+    assert stored(sqlite_engine) == {1: "A2", 2: "B", 3: "C2"}
+
+def test_delete_reports_missing_ids(api_client, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [product("A"), product("B"), product("C")])
+
+    response = api_client.request("DELETE", "/api/v1/products/bulk", json=[3, 98, 1])
+    assert response.status_code == 409
+    assert [(item["index"], item["id"], item["status"]) for item in response.json()["items"]] == [
+        (0, 3, "rolled_back"), (1, 98, "not_found"), (2, 1, "rolled_back"),
+    ]
+    assert len(stored(sqlite_engine)) == 3
+
+    response = api_client.request("DELETE", "/api/v1/products/bulk", params={"mode": "best_effort", "chunk_size": 2},
+                                  json=[3, 98, 1])
+    assert response.status_code == 207
+    assert [item["status"] for item in response.json()["items"]] == ["deleted", "not_found", "deleted"]
+    assert stored(sqlite_engine) == {2: "B"}
+
+    response = api_client.request("DELETE", "/api/v1/products/bulk", json=[2])
+    assert (response.status_code, response.json()["succeeded"]) == (200, 1)
+
+@pytest.mark.parametrize("chunk_size", [0, 5001])
+def test_chunk_size_bounds(api_client, chunk_size):
+    response = api_client.post("/api/v1/products/bulk", params={"chunk_size": chunk_size}, json=[product("A")])
+    assert response.status_code == 422
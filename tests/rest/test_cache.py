@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from sqlalchemy import insert
+from api.cache import CacheEntry, ProductCache, RedisBackend
+from api.models.product import Product
+
+def seed(engine, count=3):
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"name": f"Produkt {i}", "description": "Opis", "price": 10.0 + i, "available": True, "stock": 5}
+            for i in range(count)
+        ])
+
+def cache_stats(client) -> dict:
+    return client.get("/api/v1/cache/stats").json()
+
+def test_etag_revalidation(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    response = api_client.get("/api/v1/products/1")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    for if_none_match in (etag, f"W/{etag}", f'"inny", {etag}', "*"):
+        response = api_client.get("/api/v1/products/1", headers={"If-None-Match": if_none_match})
+        assert (response.status_code, response.content) == (304, b"")
+        assert response.headers["ETag"] == etag
+    assert api_client.get("/api/v1/products/1", headers={"If-None-Match": '"inny"'}).status_code == 200
+    # Inna reprezentacja – inny ETag
+    assert api_client.get("/api/v1/products/2").headers["ETag"] != etag
+
+def test_if_modified_since_is_ignored(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    response = api_client.get("/api/v1/products", params={"limit": 2})
+    last_modified, etag = response.headers["Last-Modified"], response.headers["ETag"]
+
+    # Last-Modified ma rozdzielczość sekundy – rewalidacja tylko przez ETag
+    response = api_client.get("/api/v1/products", params={"limit": 2}, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()] == [1, 2]
+    response = api_client.get("/api/v1/products", params={"limit": 2},
+                              headers={"If-Modified-Since": last_modified, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["X-Next-Cursor"] == "2"
+
+# expected – liczba produktów po zapisie; product_status – rewalidacja produktu 1 poprzednim ETag
+@pytest.mark.parametrize("method, url, body, expected, product_status", [
+    ("POST", "/api/v1/products", {"name": "Nowy", "description": "Opis", "price": 5.0}, 4, 304),
+    ("PUT", "/api/v1/products/1", {"name": "Zmieniony"}, 3, 200),
+    ("DELETE", "/api/v1/products/1", None, 2, 404),
+    ("POST", "/api/v1/products/bulk", [{"name": "Nowy", "description": "Opis", "price": 5.0}], 4, 304),
+    ("PATCH", "/api/v1/products/bulk", [{"id": 1, "name": "Zmieniony"}], 3, 200),
+    ("DELETE", "/api/v1/products/bulk", [1], 2, 404),
+])
+def test_writes_invalidate_cached_products(api_client, sqlite_engine, method, url, body, expected, product_status):
+    seed(sqlite_engine)
+    product = api_client.get("/api/v1/products/1")
+    products = api_client.get("/api/v1/products")
+    assert api_client.get("/api/v1/products/1").status_code == 200
+    assert cache_stats(api_client)["hits"] == 1
+
+    assert api_client.request(method, url, json=body).status_code < 300
+    assert cache_stats(api_client)["invalidations"] == 1
+    after = api_client.get("/api/v1/products")
+    assert len(after.json()) == expected
+    assert after.headers["ETag"] != products.headers["ETag"]
+    # Produkt czytany z bazy na nowo: niezmieniony nadal pasuje do poprzedniego ETag, zmieniony już nie
+    misses = cache_stats(api_client)["misses"]
+    response = api_client.get("/api/v1/products/1", headers={"If-None-Match": product.headers["ETag"]})
+    assert response.status_code == product_status
+    assert cache_stats(api_client)["misses"] == misses + 1
+    if product_status == 200:
+        assert response.json()["name"] == "Zmieniony"
+
+def test_cache_stats(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    assert cache_stats(api_client) == {
+        "backend": "memory", "hits": 0, "misses": 0, "hit_ratio": 0.0, "invalidations": 0, "entries": 0,
+    }
+    for _ in range(3):
+        api_client.get("/api/v1/products/1")
+    api_client.get("/api/v1/products", params={"limit": 2})
+    stats = cache_stats(api_client)
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    assert stats["hit_ratio"] == 0.5
+
+def test_redis_entries_count_only_cache_keys():
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = RedisBackend()
+    backend.client = fakeredis.FakeAsyncRedis()
+    cache = ProductCache(backend)
+
+    async def scenario():
+        await backend.client.set("inna-aplikacja:klucz", "wartość")  # współdzielona baza Redis
+        await cache.get_product(1, lambda: asyncio.sleep(0, CacheEntry.from_content({"id": 1})))
+        await cache.invalidate_products()
+        await cache.get_product(1, lambda: asyncio.sleep(0, CacheEntry.from_content({"id": 1})))
+        stats = await cache.stats()
+        await cache.clear()
+        return stats, await backend.client.dbsize()
+
+    stats, remaining = asyncio.run(scenario())
+    # Wpis sprzed unieważnienia zostaje do wygaśnięcia TTL; licznik generacji i obce klucze nie są liczone
+    assert stats["entries"] == 2
+    assert remaining == 1
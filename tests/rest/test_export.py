@@ -0,0 +1,66 @@
+import asyncio
+import csv
+import io
+import json
+import tracemalloc
+from sqlalchemy import inspect, insert
+from api.database.streaming import encode_ndjson, stream_rows
+from api.models.order import Order
+from api.models.product import Product
+
+def seed_orders(engine, start: int, count: int):
+    rows = [
+        {"customer_id": i % 50 + 1, "product_id": i % 20 + 1, "quantity": i % 5 + 1, "total_price": 10.0 * (i % 5 + 1)}
+        for i in range(start, start + count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Order), rows)
+
+async def peak_export_memory(session_factory) -> tuple[int, int]:
+    columns = list(inspect(Order).columns)
+    names = [column.key for column in columns]
+    tracemalloc.start()
+    try:
+        exported = 0
+        async for chunk in encode_ndjson(names, stream_rows(session_factory, columns, chunk_size=500)):
+            exported += chunk.count(b"\n")
+        return tracemalloc.get_traced_memory()[1], exported
+    finally:
+        tracemalloc.stop()
+
+def test_export_peak_memory_is_flat(sqlite_engine, async_session_factory):
+    seed_orders(sqlite_engine, 0, 5_000)
+    small_peak, small_count = asyncio.run(peak_export_memory(async_session_factory))
+
+    seed_orders(sqlite_engine, 5_000, 45_000)
+    large_peak, large_count = asyncio.run(peak_export_memory(async_session_factory))
+
+    assert (small_count, large_count) == (5_000, 50_000)
+    # 10x więcej wierszy nie może oznaczać istotnie większego szczytowego zużycia pamięci
+    assert large_peak < small_peak * 1.5, f"Szczyt pamięci: {small_peak} B dla 5k, {large_peak} B dla 50k"
+
+def test_export_products_ndjson(api_client, session_factory):
+    db = session_factory()
+    db.add_all([Product(name="Słuchawki", description="Bezprzewodowe", price=299.99), Product(name="Myszka", description="Optyczna", price=129.99)])
+    db.commit()
+    db.close()
+
+    response = api_client.get("/api/v1/products/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Słuchawki", "Myszka"]
+
+def test_export_orders_csv(api_client, sqlite_engine):
+    seed_orders(sqlite_engine, 0, 3)
+
+    response = api_client.get("/api/v1/orders/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert set(rows[0]) == {"id", "customer_id", "product_id", "quantity", "order_date", "total_price"}
+
+def test_export_empty_test_cases_csv_has_header(api_client):
+    response = api_client.get("/api/v1/test-cases/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.text.strip().split(",")[0] == "id"
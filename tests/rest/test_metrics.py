@@ -0,0 +1,63 @@
+import re
+import pytest
+from sqlalchemy import insert
+from api.metrics import registry
+from api.models.product import Product
+
+@pytest.fixture
+def metrics_client(api_client, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"name": f"Produkt {i}", "description": "Opis", "price": 10.0, "available": True, "stock": 1} for i in range(3)
+        ])
+    registry.clear()  # rejestr jest globalny dla procesu
+    return api_client
+
+def scrape(client) -> dict[str, float]:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def labels(method, route, status):
+    return f'method="{method}",route="{route}",status="{status}"'
+
+def test_metrics_per_route_template(metrics_client):
+    listing = metrics_client.get("/api/v1/products")
+    metrics_client.get("/api/v1/products/2")
+    metrics_client.get("/api/v1/products/3")
+    created = metrics_client.post("/api/v1/products", json={"name": "Nowy", "description": "Opis", "price": 5.0})
+    metrics_client.get("/nie/ma/takiej/trasy")
+    samples = scrape(metrics_client)
+
+    products = labels("GET", "/api/v1/products", 200)
+    assert samples[f"http_request_duration_seconds_count{{{products}}}"] == 1
+    assert samples[f"http_request_db_rows_sum{{{products}}}"] == 3
+    assert samples[f"http_response_size_bytes_sum{{{products}}}"] == len(listing.content)
+    assert samples[f"http_request_db_queries_total{{{products}}}"] >= 1
+    assert samples[f"http_request_db_duration_seconds_sum{{{products}}}"] > 0
+    # Kubełki są skumulowane, a +Inf równa się liczbie żądań
+    assert samples[f'http_request_db_rows_bucket{{{products},le="1"}}'] == 0
+    assert samples[f'http_request_db_rows_bucket{{{products},le="5"}}'] == 1
+    assert samples[f'http_request_duration_seconds_bucket{{{products},le="+Inf"}}'] == 1
+
+    # Jedna seria dla szablonu ścieżki, nie dla każdego id
+    assert samples[f"http_request_duration_seconds_count{{{labels('GET', '/api/v1/products/{product_id}', 200)}}}"] == 2
+    created_labels = labels("POST", "/api/v1/products", 201)
+    assert samples[f"http_response_size_bytes_sum{{{created_labels}}}"] == len(created.content)
+    assert samples[f"http_request_db_rows_sum{{{created_labels}}}"] >= 1
+    assert samples[f"http_request_duration_seconds_count{{{labels('GET', 'unmatched', 404)}}}"] == 1
+    assert not any(re.search(r"nie/ma", name) for name in samples)
+
+def test_db_time_outside_requests_is_not_counted(metrics_client, sqlite_engine):
+    metrics_client.get("/api/v1/products")
+    queries = f"http_request_db_queries_total{{{labels('GET', '/api/v1/products', 200)}}}"
+    before = scrape(metrics_client)[queries]
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), {"name": "Skrypt", "description": "Opis", "price": 1.0})
+    assert scrape(metrics_client)[queries] == before
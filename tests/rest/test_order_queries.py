@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import insert
+from api.models.customer import Customer
+from api.models.order import Order
+from api.models.product import Product
+
+def seed(engine, customers: int, products: int, orders: int):
+    with engine.begin() as conn:
+        conn.execute(insert(Customer), [
+            {"first_name": f"Imię {i}", "last_name": f"Nazwisko {i}", "email": f"klient{i}@example.com", "address": "Warszawa"}
+            for i in range(customers)
+        ])
+        conn.execute(insert(Product), [
+            {"name": f"Produkt {i}", "description": "Opis", "price": 10.0 + i, "available": True, "stock": 5}
+            for i in range(products)
+        ])
+        conn.execute(insert(Order), [
+            {"customer_id": i % customers + 1, "product_id": i % products + 1, "quantity": 1, "total_price": 10.0}
+            for i in range(orders)
+        ])
+
+@pytest.mark.parametrize("orders", [5, 200])
+def test_expanded_orders_use_fixed_number_of_queries(api_client, sqlite_engine, count_queries, orders):
+    seed(sqlite_engine, customers=20, products=30, orders=orders)
+
+    with count_queries() as statements:
+        response = api_client.get("/api/v1/orders", params={"expand": "customer,product", "limit": 500})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == orders
+    assert body[0]["customer"]["email"] == "klient0@example.com"
+    assert body[0]["product"]["name"] == "Produkt 0"
+    # Jedno zapytanie z JOIN niezależnie od liczby zamówień
+    assert len(statements) == 1, statements
+
+@pytest.mark.parametrize("orders", [10, 400])
+def test_customer_orders_use_fixed_number_of_queries(api_client, sqlite_engine, count_queries, orders):
+    seed(sqlite_engine, customers=2, products=30, orders=orders)
+
+    with count_queries() as statements:
+        response = api_client.get("/api/v1/customers/1/orders", params={"expand": "product", "limit": 1000})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == orders // 2
+    assert all(order["customer_id"] == 1 and order["product"] for order in body)
+    # Sprawdzenie klienta + strona zamówień z produktami
+    assert len(statements) == 2, statements
+
+def test_customer_orders_unknown_customer(api_client):
+    response = api_client.get("/api/v1/customers/999/orders")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Customer not found"}
+
+def test_orders_reject_unknown_expand(api_client):
+    response = api_client.get("/api/v1/orders", params={"expand": "invoice"})
+    assert response.status_code == 400
+
+def test_orders_response_contains_only_requested_data(api_client, sqlite_engine):
+    seed(sqlite_engine, customers=1, products=1, orders=1)
+
+    plain = api_client.get("/api/v1/orders").json()[0]
+    assert set(plain) == {"id", "customer_id", "product_id", "quantity", "order_date", "total_price"}
+    sparse = api_client.get("/api/v1/orders", params={"fields": "total_price"}).json()
+    assert sparse == [{"id": 1, "total_price": 10.0}]
+    expanded = api_client.get("/api/v1/orders", params={"expand": "product"}).json()[0]
+    assert "customer" not in expanded and expanded["product"]["name"] == "Produkt 0"
@@ -0,0 +1,101 @@
+import datetime
+import pytest
+from sqlalchemy import delete, insert
+from api.models.customer import Customer
+from api.models.order import Order
+from api.models.product import Product
+
+START = datetime.datetime(2025, 3, 1)
+
+def seed(engine, products=25, customers=3, orders=12):
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"name": f"Produkt {i}", "description": "Opis", "price": 10.0 + i, "available": i % 2 == 0, "stock": i}
+            for i in range(products)
+        ])
+        conn.execute(insert(Customer), [
+            {"first_name": f"Imię {i}", "last_name": f"Nazwisko {i}", "email": f"klient{i}@example.com", "address": "Kraków"}
+            for i in range(customers)
+        ])
+        conn.execute(insert(Order), [
+            {"customer_id": i % customers + 1, "product_id": i + 1, "quantity": 1, "total_price": 10.0,
+             "order_date": START + datetime.timedelta(days=i)}
+            for i in range(orders)
+        ])
+
+def all_pages(client, url, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor is not None else {})})
+        assert response.status_code == 200, response.text
+        pages.append([item["id"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+def test_keyset_pages_follow_next_cursor(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    pages = all_pages(api_client, "/api/v1/products", limit=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sum(pages, []) == list(range(1, 26))
+
+    response = api_client.get("/api/v1/products", params={"limit": 10})
+    assert response.headers["X-Next-Cursor"] == "10"
+    # Ostatnia strona pełna, ale bez kolejnych wierszy – bez nagłówka
+    assert "X-Next-Cursor" not in api_client.get("/api/v1/products", params={"cursor": 15, "limit": 10}).headers
+    assert all_pages(api_client, "/api/v1/customers", limit=2) == [[1, 2], [3]]
+    assert all_pages(api_client, "/api/v1/orders", limit=5) == [[1, 2, 3, 4, 5], [6, 7, 8, 9, 10], [11, 12]]
+
+def test_cursor_is_stable_when_rows_change(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    first = api_client.get("/api/v1/orders", params={"limit": 5})
+    # Usunięcie wiersza z przeczytanej strony nie przesuwa kolejnej strony (w przeciwieństwie do OFFSET)
+    with sqlite_engine.begin() as conn:
+        conn.execute(delete(Order).where(Order.id == 2))
+    second = api_client.get("/api/v1/orders", params={"limit": 5, "cursor": first.headers["X-Next-Cursor"]})
+    assert [order["id"] for order in second.json()] == [6, 7, 8, 9, 10]
+
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 1001}, {"cursor": -1}, {"cursor": "abc"}])
+def test_page_parameter_bounds(api_client, params):
+    for url in ("/api/v1/products", "/api/v1/customers", "/api/v1/orders"):
+        assert api_client.get(url, params=params).status_code == 422
+
+def test_default_and_maximum_limit(api_client, sqlite_engine):
+    seed(sqlite_engine, products=1001, orders=0)
+    response = api_client.get("/api/v1/products")
+    assert len(response.json()) == 100 and response.headers["X-Next-Cursor"] == "100"
+    response = api_client.get("/api/v1/products", params={"limit": 1000})
+    assert len(response.json()) == 1000 and response.headers["X-Next-Cursor"] == "1000"
+
+def test_filters(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    assert [product["id"] for product in api_client.get("/api/v1/products", params={"name": "Produkt 3"}).json()] == [4]
+    available = api_client.get("/api/v1/products", params={"available": "true", "limit": 5})
+    assert [product["id"] for product in available.json()] == [1, 3, 5, 7, 9]
+    # Filtr i kursor razem – kursor to id ostatniego zwróconego wiersza, a nie pozycja w wynikach
+    assert available.headers["X-Next-Cursor"] == "9"
+    assert all_pages(api_client, "/api/v1/products", available="false", limit=6) == [[2, 4, 6, 8, 10, 12], [14, 16, 18, 20, 22, 24]]
+
+    orders = api_client.get("/api/v1/orders", params={"customer_id": 2}).json()
+    assert [order["id"] for order in orders] == [2, 5, 8, 11]
+    # date_from włącznie, date_to wyłącznie
+    params = {"date_from": "2025-03-03T00:00:00", "date_to": "2025-03-06T00:00:00"}
+    assert [order["id"] for order in api_client.get("/api/v1/orders", params=params).json()] == [3, 4, 5]
+    params["customer_id"] = 1
+    assert [order["id"] for order in api_client.get("/api/v1/orders", params=params).json()] == [4]
+
+def test_fields_projection(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    products = api_client.get("/api/v1/products", params={"fields": "name,price", "limit": 2}).json()
+    assert products == [{"id": 1, "name": "Produkt 0", "price": 10.0}, {"id": 2, "name": "Produkt 1", "price": 11.0}]
+    customers = api_client.get("/api/v1/customers", params={"fields": "email", "limit": 1}).json()
+    assert customers == [{"id": 1, "email": "klient0@example.com"}]
+    orders = api_client.get("/api/v1/orders", params={"fields": "id,customer_id", "limit": 1}).json()
+    assert orders == [{"id": 1, "customer_id": 1}]
+
+    response = api_client.get("/api/v1/products", params={"fields": "name,password"})
+    assert (response.status_code, response.json()["detail"]) == (400, "Unknown fields: password")
+    response = api_client.get("/api/v1/orders", params={"fields": "quantity", "expand": "customer"})
+    assert response.status_code == 400
+    response = api_client.get("/api/v1/orders", params={"expand": "invoice"})
+    assert (response.status_code, response.json()["detail"]) == (400, "Unknown expand: invoice")
@@ -0,0 +1,69 @@
+import logging
+import re
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from api import profiling
+from api.models.product import Product
+
+@pytest.fixture
+def profiled_client(api_client, sqlite_engine, monkeypatch):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"name": f"Produkt {i}", "description": "Opis", "price": 10.0, "available": True, "stock": 1} for i in range(3)
+        ])
+    # Domyślnie (SQL_PROFILE=off) aplikacja nie ma middleware – tu włączony tryb nagłówka;
+    # nadpisania zależności z api_client dotyczą tej samej aplikacji
+    monkeypatch.setattr(profiling, "SQL_PROFILE", "header")
+    return TestClient(profiling.SqlProfilingMiddleware(api_client.app))
+
+def test_server_timing_only_for_profiled_requests(profiled_client):
+    response = profiled_client.get("/api/v1/products", headers={"X-SQL-Profile": "1"})
+    assert response.status_code == 200
+    timing = re.fullmatch(r'db;dur=([\d.]+);desc="SQL \((\d+)\)", app;dur=([\d.]+), total;dur=([\d.]+)',
+                          response.headers["server-timing"])
+    assert timing, response.headers["server-timing"]
+    db_ms, queries, app_ms, total_ms = float(timing[1]), int(timing[2]), float(timing[3]), float(timing[4])
+    assert queries >= 1 and db_ms > 0
+    assert db_ms + app_ms == pytest.approx(total_ms, abs=0.02)
+    assert "server-timing" not in profiled_client.get("/api/v1/products").headers
+
+def test_slow_query_log_with_plan(profiled_client, monkeypatch, caplog):
+    monkeypatch.setattr(profiling, "SLOW_QUERY_MS", 0.0)  # każda instrukcja jest "wolna"
+    with caplog.at_level(logging.WARNING, logger="api.sql"):
+        response = profiled_client.get("/api/v1/products/2", headers={"X-SQL-Profile": "explain"})
+    assert response.status_code == 200
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Wolne zapytanie")]
+    assert slow
+    # Kształt parametrów bez wartości i plan zapytania SQLite (wyszukiwanie po kluczu głównym)
+    assert any("GET /api/v1/products/2, parametry (int" in message for message in slow)
+    assert any(re.search(r"plan: SEARCH products USING INTEGER PRIMARY KEY", message) for message in slow)
+
+def test_repeated_queries_are_reported(profiled_client, monkeypatch, caplog):
+    monkeypatch.setattr(profiling, "REPEATED_QUERY_THRESHOLD", 1)
+    with caplog.at_level(logging.WARNING, logger="api.sql"):
+        profiled_client.get("/api/v1/products", headers={"X-SQL-Profile": "1"})
+    assert any(record.getMessage().startswith("Zapytanie powtórzone 1 razy") for record in caplog.records)
+
+@pytest.mark.parametrize("mode, header, expected", [
+    ("off", b"1", None),  # bez zgody operatora nagłówek jest ignorowany
+    ("header", b"1", False),
+    ("header", b"explain", True),
+    ("header", b"0", None),
+    ("header", None, None),
+    ("on", None, False),
+])
+def test_explain_mode(monkeypatch, mode, header, expected):
+    monkeypatch.setattr(profiling, "SQL_PROFILE", mode)
+    scope = {"type": "http", "headers": [(b"x-sql-profile", header)] if header is not None else []}
+    assert profiling.explain_mode(scope) is expected
+
+@pytest.mark.parametrize("parameters, executemany, shape", [
+    ((1, "a", "b", 2.5), False, "(int, str × 2, float)"),
+    (tuple(range(20)), False, "(int × 20)"),
+    ({"id": 1, "name": None}, False, "{id: int, name: NoneType}"),
+    ([(1, "a"), (2, "b")], True, "2 × (int, str)"),
+    ((), False, "()"),
+])
+def test_parameters_shape(parameters, executemany, shape):
+    assert profiling.parameters_shape(parameters, executemany) == shape
@@ -0,0 +1,100 @@
+import datetime
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, delete, insert, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from api.database.reports import refresh_sales_summary
+from api.models.order import Order
+
+def order_rows(start: int, count: int):
+    return [
+        {
+            "customer_id": i % 3 + 1,
+            "product_id": i % 4 + 1,
+            "quantity": i % 5 + 1,
+            "total_price": 10.0 + i % 7,
+            "order_date": datetime.datetime(2025, 1, 1, 12) + datetime.timedelta(hours=7 * i),
+        }
+        for i in range(start, start + count)
+    ]
+
+@pytest.mark.parametrize("group_by", ["product", "customer", "day", "month"])
+def test_summary_matches_orders_after_incremental_refresh(api_client, sqlite_engine, group_by):
+    params = {"group_by": group_by, "date_from": "2025-01-05", "date_to": "2025-02-20"}
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Order), order_rows(0, 150))
+    assert api_client.post("/api/v1/reports/sales/refresh").json() == {"last_order_id": 150}
+
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Order), order_rows(150, 100))
+    # Drugie odświeżenie dolicza tylko nowe zamówienia
+    assert api_client.post("/api/v1/reports/sales/refresh").json() == {"last_order_id": 250}
+    assert api_client.post("/api/v1/reports/sales/refresh").json() == {"last_order_id": 250}
+
+    from_orders = api_client.get("/api/v1/reports/sales", params=params).json()
+    from_summary = api_client.get("/api/v1/reports/sales", params={**params, "source": "summary"}).json()
+    assert from_orders["rows"]
+    assert from_summary["rows"] == from_orders["rows"]
+    assert from_summary["last_order_id"] == 250
+
+def test_rebuild_reflects_changed_and_deleted_orders(api_client, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Order), order_rows(0, 30))
+    assert api_client.post("/api/v1/reports/sales/refresh").json() == {"last_order_id": 30}
+    with sqlite_engine.begin() as conn:
+        conn.execute(update(Order).where(Order.id == 1).values(quantity=100, customer_id=2))
+        conn.execute(delete(Order).where(Order.id == 2))
+
+    def reports(group_by):
+        from_orders = api_client.get("/api/v1/reports/sales", params={"group_by": group_by}).json()["rows"]
+        from_summary = api_client.get("/api/v1/reports/sales", params={"group_by": group_by, "source": "summary"}).json()["rows"]
+        return from_orders, from_summary
+
+    # Odświeżenie przyrostowe nie widzi zmian już policzonych zamówień
+    assert api_client.post("/api/v1/reports/sales/refresh").json() == {"last_order_id": 30}
+    from_orders, from_summary = reports("customer")
+    assert from_summary != from_orders
+    assert api_client.post("/api/v1/reports/sales/refresh", params={"rebuild": "true"}).json() == {"last_order_id": 30}
+    for group_by in ("product", "customer", "day"):
+        from_orders, from_summary = reports(group_by)
+        assert from_summary == from_orders
+
+def test_sales_report_totals(api_client, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Order), order_rows(0, 20))
+    rows = api_client.get("/api/v1/reports/sales", params={"group_by": "product"}).json()["rows"]
+    assert [row["key"] for row in rows] == [1, 2, 3, 4]
+    assert sum(row["order_count"] for row in rows) == 20
+    assert rows[0]["quantity_sum"] == sum(i % 5 + 1 for i in range(0, 20, 4))
+    assert rows[0]["total_price_avg"] == round(rows[0]["total_price_sum"] / rows[0]["order_count"], 2)
+
+def test_sales_report_rejects_unknown_grouping(api_client):
+    assert api_client.get("/api/v1/reports/sales", params={"group_by": "week"}).status_code == 422
+
+def test_refresh_skips_busy_database_and_raises_other_errors(sqlite_engine, sqlite_path):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Order), order_rows(0, 10))
+    engine = create_engine(f"sqlite:///{sqlite_path}", connect_args={"timeout": 0.1})
+    try:
+        with Session(engine) as db:
+            assert refresh_sales_summary(db) == 10
+        with sqlite_engine.begin() as conn:
+            conn.execute(insert(Order), order_rows(10, 5))
+
+        # Inny proces trzyma blokadę zapisu – odświeżenie pomija przebieg (SQLITE_BUSY) i niczego nie dolicza
+        writer = sqlite3.connect(sqlite_path, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            with Session(engine) as db:
+                assert refresh_sales_summary(db) == 10
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+        with sqlite_engine.begin() as conn:
+            conn.execute(text("DROP TABLE sales_daily_customer_summary"))
+        with Session(engine) as db, pytest.raises(OperationalError, match="no such table"):
+            refresh_sales_summary(db)
+    finally:
+        engine.dispose()
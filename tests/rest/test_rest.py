@@ -1,13 +1,15 @@
 import pytest
-import requests
-import json
-import time
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from jira import JIRA
 from api.database.db_config import SessionLocal
 from api.models.test_case import TestCase
-from api.models.test_result import TestResult
+from runner.engine import CaseOutcome, run_cases
+from runner.defect_index import DefectIndex
+from runner.defects import DefectReporter, rest_defect_report
+from runner.rest import RestCase, create_http_session, execute_rest_case
+from runner.results import ResultWriter
+from runner.stats import PENDING_DEFECT_KEY, failed_test_ids as failed_test_ids_from
 from config import JIRA_SERVER, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_PROJECT_KEY, ISSUE_KEY
 
 # Baza URL dla API
@@ -19,21 +21,6 @@ jira = JIRA(
     basic_auth=(JIRA_USERNAME, JIRA_API_TOKEN)
 )
 
-# Dodajemy opcje do pytest
-def pytest_addoption(parser):
-    parser.addoption(
-        "--test-ids",
-        action="store",
-        default=None,
-        help="Comma-separated list of test IDs to run (e.g., TC_001,TC_002)"
-    )
-    parser.addoption(
-        "--run-failed",
-        action="store_true",
-        default=False,
-        help="Run only tests that failed in the last run"
-    )
-
 # Fixtures
 @pytest.fixture
 def db_session():
@@ -49,15 +36,17 @@ def db_session():
         db.close()
 
 @pytest.fixture
-def test_cases(db_session: Session, request):
+def test_cases(db_session: Session, test_stats: dict, flaky_tests: set, request):
     # Bezpieczne pobieranie opcji z pytest
     test_ids = None
     run_failed = False
+    skip_flaky = False
     try:
         test_ids = request.config.getoption("--test-ids", default=None)
         run_failed = request.config.getoption("--run-failed", default=False)
+        skip_flaky = request.config.getoption("--skip-flaky", default=False)
     except ValueError:
-        print("Opcje --test-ids lub --run-failed nie zostały zdefiniowane, używam domyślnych wartości.")
+        print("Opcje --test-ids, --run-failed lub --skip-flaky nie zostały zdefiniowane, używam domyślnych wartości.")
 
     # Pobieramy wszystkie przypadki testowe
     query = db_session.query(TestCase)
@@ -70,265 +59,129 @@ def test_cases(db_session: Session, request):
 
     # Filtrujemy testy na podstawie --run-failed
     elif run_failed:
-        # Pobieramy test_id testów, które nie przeszły w ostatniej próbie
-        failed_tests = (
-            db_session.query(TestResult.test_id)
-            .filter(TestResult.result == "not passed")
-            .distinct()
-            .all()
-        )
-        failed_test_ids = [test_id for (test_id,) in failed_tests]
+        # Testy, których ostatni wynik to "not passed" (z tabeli test_case_stats, bez przeglądania historii)
+        failed_test_ids = failed_test_ids_from(test_stats)
         if not failed_test_ids:
             print("Brak testów, które nie przeszły w ostatniej próbie.")
             return []
         print(f"Filtruję testy dla test_ids, które nie przeszły: {failed_test_ids}")
         query = query.filter(TestCase.test_id.in_(failed_test_ids))
 
-    test_cases = query.all()
+    # Pomijamy testy niestabilne – razem z --run-failed powtarzane są tylko prawdziwe niepowodzenia
+    if skip_flaky and flaky_tests:
+        print(f"Pomijam niestabilne testy (--skip-flaky): {sorted(flaky_tests)}")
+        query = query.filter(TestCase.test_id.not_in(flaky_tests))
+
+    test_cases = query.order_by(TestCase.id).all()
     print(f"Wybrane testy do uruchomienia: {[tc.test_id for tc in test_cases]}")
     return test_cases
 
-# Funkcja do raportowania defektów w JIRA
-def report_defect_to_jira(test_case: TestCase, issue_key: str, actual_status: int, actual_response: str):
+# Defekty zgłaszane do JIRA w tle; klucz defektu trafia do test_results zamiast PENDING po rozwiązaniu.
+# Reporter zamykany przed result_writer, więc wszystkie klucze są zapisane przed ostatnim zapisem partii.
+@pytest.fixture
+def defect_reporter(result_writer: ResultWriter):
+    # Indeks test_id -> klucz defektu z store.db, uzupełniany defektami zmienionymi w JIRA od ostatniego uruchomienia
+    index = DefectIndex()
     try:
-        print(f"Szukam istniejących defektów w JIRA dla {test_case.test_id}...")
-        jql_query = f'project={JIRA_PROJECT_KEY} AND issuetype=Bug AND summary ~ "Defekt dla {test_case.test_id}"'
-        existing_defects = jira.search_issues(jql_query)
-        print(f"Znaleziono {len(existing_defects)} istniejących defektów")
-
-        if existing_defects:
-            defect = existing_defects[0]
-            defect_key = defect.key
-            comment = (
-                f"Retest dla przypadku testowego {test_case.test_id}:\n"
-                f"**Rzeczywisty status**: {actual_status}\n"
-                f"**Rzeczywista odpowiedź**: {actual_response}\n"
-                f"**Test Result**: not passed\n"
-                f"**Defect created**: yes\n"
-                f"**Numer defektu**: {defect_key}"
-            )
-            jira.add_comment(defect_key, comment)
-            print(f"Dodano komentarz do istniejącego defektu {defect_key} dla przypadku testowego {test_case.test_id}")
-            return defect_key
-
-        print(f"Tworzę nowy defekt w JIRA dla {test_case.test_id}...")
-        defect_dict = {
-            "project": {"key": JIRA_PROJECT_KEY},
-            "summary": f"Defekt dla {test_case.test_id}: {test_case.description}",
-            "description": (
-                f"**Przypadek testowy**: {test_case.test_id}\n"
-                f"**Endpoint**: {test_case.endpoint}\n"
-                f"**Method**: {test_case.method}\n"
-                f"**Oczekiwany status**: {test_case.expected_status}\n"
-                f"**Rzeczywisty status**: {actual_status}\n"
-                f"**Oczekiwana odpowiedź**: {test_case.expected_response}\n"
-                f"**Rzeczywista odpowiedź**: {actual_response}\n"
-                f"**Powiązany przypadek testowy**: {issue_key}\n"
-                f"**Test Result**: not passed\n"
-                f"**Defect created**: yes\n"
-            ),
-            "issuetype": {"name": "Bug"},
-        }
-        new_issue = jira.create_issue(fields=defect_dict)
-        defect_key = new_issue.key
-        print(f"Utworzono defekt w JIRA: {defect_key} dla przypadku testowego {test_case.test_id}")
-
-        updated_description = defect_dict["description"] + f"**Numer defektu**: {defect_key}"
-        jira.update_issue_field(defect_key, {"description": updated_description})
-
-        jira.create_issue_link(
-            type="Relates",
-            inwardIssue=new_issue.key,
-            outwardIssue=issue_key
-        )
-        print(f"Powiązano defekt {defect_key} z przypadkiem testowym {issue_key}")
-        return defect_key
+        index.sync(jira, JIRA_PROJECT_KEY)
     except Exception as e:
-        print(f"Błąd podczas raportowania defektu do JIRA: {e}")
-        return None
+        print(f"Błąd synchronizacji indeksu defektów z JIRA, nieznane defekty będą wyszukiwane przez JQL: {e}")
+    with DefectReporter(jira, JIRA_PROJECT_KEY, on_resolved=result_writer.set_defect_key, index=index) as reporter:
+        yield reporter
 
 # Testy automatyczne
-def test_rest_api(test_cases, db_session: Session):
+def test_rest_api(test_cases, test_stats: dict, flaky_tests: set, result_writer: ResultWriter, defect_reporter: DefectReporter, request):
     if not test_cases:
         print("Brak testów do uruchomienia.")
         return
 
     test_summary = []
     failures = []
-
-    for test_case in test_cases:
+    workers = request.config.getoption("--workers")
+    # --quarantine: niestabilne testy są uruchamiane i zapisywane, ale nie zgłaszają defektów i nie przerywają uruchomienia
+    quarantined = flaky_tests if request.config.getoption("--quarantine") else set()
+    # Kopie przypadków trafiają do wątków roboczych; kolejność zapisów na tym samym zasobie jest zachowana
+    cases = [RestCase.from_model(test_case) for test_case in test_cases]
+    print(f"Uruchamiam {len(cases)} testów, równolegle: {workers}")
+
+    def record_outcome(outcome: CaseOutcome):
+        test_case = outcome.case
         test_id_number = int(test_case.test_id.split("_")[1])
         issue_key = f"{ISSUE_KEY}-{test_id_number}"
-        print(f"Rozpoczynam test dla przypadku: {test_case.test_id} (Issue: {issue_key})")
+        print(f"Zakończono test dla przypadku: {test_case.test_id} (Issue: {issue_key}), status: {outcome.actual_status}, czas: {outcome.duration_ms} ms")
 
-        # Obliczamy retry_count – liczba poprzednich prób dla tego test_id
-        retry_count = db_session.query(TestResult).filter(TestResult.test_id == test_case.test_id).count()
+        # retry_count – liczba poprzednich prób dla tego test_id (statystyki wczytane na początku uruchomienia)
+        previous = test_stats.get(test_case.test_id)
+        retry_count = previous.run_count if previous else 0
         print(f"Retry count dla {test_case.test_id}: {retry_count}")
 
-        url = BASE_URL + test_case.endpoint
-        method = test_case.method.lower()
-        data = None
-        if test_case.method in ["POST", "PUT"]:
-            if test_case.test_id in ["TC_007", "TC_009", "TC_015", "TC_017", "TC_020"]:
-                data = {
-                    "name": "Test Product",
-                    "description": "Test Description",
-                    "price": 99.99,
-                    "available": True,
-                    "stock": 10
-                }
-                if test_case.test_id == "TC_015":
-                    data["price"] = 0
-                elif test_case.test_id == "TC_017":
-                    data["price"] = 9999999.99
-            elif test_case.test_id == "TC_008":
-                data = {
-                    "description": "Test Description",
-                    "price": 99.99
-                }
-            elif test_case.test_id == "TC_016":
-                data = {
-                    "name": "Test Product",
-                    "description": "Test Description",
-                    "price": -10
-                }
-            elif test_case.test_id == "TC_018":
-                data = {
-                    "name": "A" * 101,
-                    "description": "Test Description",
-                    "price": 99.99
-                }
-
-        response = None
-        result = "passed"
-        actual_status = 0
-        actual_response = ""
         defect_key = None
-        start_time = time.time()
-
-        try:
-            if method == "get":
-                print(f"Wysyłam żądanie GET na {url}")
-                response = requests.get(url)
-            elif method == "post":
-                print(f"Wysyłam żądanie POST na {url} z danymi: {data}")
-                response = requests.post(url, json=data)
-            elif method == "put":
-                print(f"Wysyłam żądanie PUT na {url} z danymi: {data}")
-                response = requests.put(url, json=data)
-            elif method == "delete":
-                print(f"Wysyłam żądanie DELETE na {url}")
-                response = requests.delete(url)
-            else:
-                raise AssertionError(f"Nieobsługiwana metoda HTTP: {method}")
-
-            actual_status = response.status_code
-            actual_response = response.text
-
-            print(f"Otrzymano status: {actual_status}, odpowiedź: {actual_response[:100]}...")
-            assert response.status_code == test_case.expected_status, (
-                f"Oczekiwano statusu {test_case.expected_status}, otrzymano {response.status_code}"
-            )
-
-            if test_case.expected_response:
-                try:
-                    expected_response = json.loads(test_case.expected_response)
-                    actual_response_json = response.json()
-                    if isinstance(expected_response, dict):
-                        for key, value in expected_response.items():
-                            assert key in actual_response_json, f"Brak klucza {key} w odpowiedzi API"
-                            assert actual_response_json[key] == value, (
-                                f"Oczekiwano {key}: {value}, otrzymano {key}: {actual_response_json[key]}"
-                            )
-                    else:
-                        assert actual_response_json == expected_response, (
-                            f"Oczekiwano odpowiedzi {expected_response}, otrzymano {actual_response_json}"
-                        )
-                    actual_response = json.dumps(actual_response_json, ensure_ascii=False)[:500]
-                except json.JSONDecodeError:
-                    assert response.text == test_case.expected_response, (
-                        f"Oczekiwano odpowiedzi {test_case.expected_response}, otrzymano {response.text}"
-                    )
-                    actual_response = response.text[:500]
-
+        if outcome.result == "passed":
             print(f"Test {test_case.test_id} przeszedł pomyślnie.")
             test_summary.append((test_case.test_id, "passed", None))
-
-        except AssertionError as e:
-            print(f"Test {test_case.test_id} nie przeszedł: {str(e)}")
-            result = "not passed"
-            failure_message = f"Expected: {test_case.expected_response}, Got: {actual_status}"
-            print(f"Raportuję defekt dla {test_case.test_id}...")
-            try:
-                defect_key = report_defect_to_jira(test_case, issue_key, actual_status, failure_message)
-                if defect_key is None:
-                    print(f"UWAGA: Defekt dla {test_case.test_id} nie został zgłoszony do JIRA!")
-                    defect_key = "PENDING"
-            except Exception as jira_error:
-                print(f"Błąd podczas raportowania defektu do JIRA: {jira_error}")
-                defect_key = "PENDING"
-            actual_response = failure_message[:500]
-            test_summary.append((test_case.test_id, "not passed", defect_key))
-            failures.append(f"Test {test_case.test_id} nie przeszedł: {str(e)}")
-        except Exception as e:
-            print(f"Test {test_case.test_id} nie przeszedł z powodu błędu: {str(e)}")
-            result = "not passed"
-            actual_status = getattr(response, 'status_code', 0)
-            failure_message = f"Error: {str(e)}"
-            print(f"Raportuję defekt dla {test_case.test_id}...")
-            try:
-                defect_key = report_defect_to_jira(test_case, issue_key, actual_status, actual_response)
-                if defect_key is None:
-                    print(f"UWAGA: Defekt dla {test_case.test_id} nie został zgłoszony do JIRA!")
-                    defect_key = "PENDING"
-            except Exception as jira_error:
-                print(f"Błąd podczas raportowania defektu do JIRA: {jira_error}")
-                defect_key = "PENDING"
-            actual_response = failure_message[:500]
+        elif test_case.test_id in quarantined:
+            print(f"Test {test_case.test_id} nie przeszedł, ale jest niestabilny (kwarantanna): {outcome.message}")
+            test_summary.append((test_case.test_id, "not passed", None))
+        else:
+            if outcome.error:
+                print(f"Test {test_case.test_id} nie przeszedł z powodu błędu: {outcome.message}")
+                failures.append(f"Test {test_case.test_id} nie przeszedł z powodu błędu: {outcome.message}")
+                reported_response = outcome.response_text
+            else:
+                print(f"Test {test_case.test_id} nie przeszedł: {outcome.message}")
+                failures.append(f"Test {test_case.test_id} nie przeszedł: {outcome.message}")
+                reported_response = outcome.failure_message
+            # Zgłoszenie trafia do kolejki DefectReporter – do czasu rozwiązania wynik ma defect_key=PENDING
+            defect_key = PENDING_DEFECT_KEY
             test_summary.append((test_case.test_id, "not passed", defect_key))
-            failures.append(f"Test {test_case.test_id} nie przeszedł z powodu błędu: {str(e)}")
-        finally:
-            # Obliczamy czas trwania testu
-            duration_ms = int((time.time() - start_time) * 1000)
 
-            # Debugowanie: Sprawdzamy, czy wynik testu zostanie zapisany
-            print(f"Zapisz wynik dla {test_case.test_id}: result={result}, actual_status={actual_status}, defect_key={defect_key}")
+        # Debugowanie: Sprawdzamy, czy wynik testu zostanie zapisany
+        print(f"Zapisz wynik dla {test_case.test_id}: result={outcome.result}, actual_status={outcome.actual_status}, defect_key={defect_key}")
 
-            # Zapis wyniku testu do tabeli test_results
-            try:
-                test_result = TestResult(
-                    test_id=test_case.test_id,
-                    result=result,
-                    actual_status=actual_status,
-                    actual_response=actual_response,
-                    defect_key=defect_key,
-                    duration_ms=duration_ms,
-                    environment="local",
-                    tester="automated",
-                    retry_count=retry_count
-                )
-                db_session.add(test_result)
-                db_session.commit()
-                print(f"Zapis wyniku dla {test_case.test_id} zakończony sukcesem.")
-            except SQLAlchemyError as e:
-                print(f"Błąd podczas zapisu wyniku dla {test_case.test_id}: {e}")
-                db_session.rollback()
-                raise
+        # Wynik trafia do bufora – zapis do test_results odbywa się partiami
+        try:
+            result_writer.add(
+                test_id=test_case.test_id,
+                result=outcome.result,
+                actual_status=outcome.actual_status,
+                actual_response=outcome.actual_response,
+                defect_key=defect_key,
+                duration_ms=outcome.duration_ms,
+                retry_count=retry_count
+            )
+        except SQLAlchemyError as e:
+            print(f"Błąd podczas zapisu wyników (partia z {test_case.test_id}): {e}")
+            raise
+        if defect_key == PENDING_DEFECT_KEY:
+            print(f"Raportuję defekt dla {test_case.test_id}...")
+            defect_reporter.submit(rest_defect_report(test_case, issue_key, outcome.actual_status, reported_response))
+
+    with create_http_session(workers) as http_session:
+        run_cases(
+            cases,
+            lambda test_case: execute_rest_case(http_session, BASE_URL, test_case),
+            workers=workers,
+            on_outcome=record_outcome,
+        )
 
-            # Debugowanie: Sprawdzamy, czy wynik został zapisany
-            saved_result = db_session.query(TestResult).filter(TestResult.test_id == test_case.test_id).order_by(TestResult.timestamp.desc()).first()
-            if saved_result:
-                print(f"Wynik zapisany: {saved_result.test_id}, result={saved_result.result}, timestamp={saved_result.timestamp}")
-            else:
-                print(f"UWAGA: Wynik dla {test_case.test_id} NIE został zapisany!")
+    # Czekamy na obsłużenie kolejki defektów, aby podsumowanie zawierało klucze z JIRA
+    defect_reporter.close()
 
     # Podsumowanie wyników testów
     print("\n=== Podsumowanie wyników testów ===")
     for test_id, result, defect_key in test_summary:
+        if defect_key == PENDING_DEFECT_KEY:
+            defect_key = defect_reporter.resolved.get(test_id, PENDING_DEFECT_KEY)
+            if defect_key == PENDING_DEFECT_KEY:
+                print(f"UWAGA: Defekt dla {test_id} nie został zgłoszony do JIRA!")
+        previous = test_stats.get(test_id)
+        history = f" (poprzednio: {previous.last_result}, uruchomień: {previous.run_count + 1})" if previous else " (pierwsze uruchomienie)"
         if result == "passed":
-            print(f"Test {test_id}: Passed")
+            print(f"Test {test_id}: Passed{history}")
+        elif test_id in quarantined:
+            print(f"Test {test_id}: Not Passed, kwarantanna (test niestabilny){history}")
         else:
-            print(f"Test {test_id}: Not Passed, Defect: {defect_key}")
+            print(f"Test {test_id}: Not Passed, Defect: {defect_key}{history}")
 
     # Zgłaszamy niepowodzenia na końcu
     if failures:
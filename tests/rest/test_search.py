@@ -0,0 +1,55 @@
+from sqlalchemy import insert
+from api.models.product import Product
+
+PRODUCTS = [
+    {"name": "Słuchawki gamingowe", "description": "Słuchawki z mikrofonem do gier", "price": 199.0},
+    {"name": "Głośniki", "description": "Głośniki Bluetooth", "price": 149.0},
+    {"name": "Laptop gaming", "description": "Laptop do gier", "price": 4999.0},
+    {"name": "Laptop biurowy", "description": "Lekki laptop do pracy", "price": 2999.0},
+    {"name": "Monitor", "description": "Monitor 27 cali, idealny do laptopa", "price": 999.0},
+]
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Product), PRODUCTS)
+
+def search(client, q, **params):
+    response = client.get("/api/v1/products/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return [product["name"] for product in response.json()], response.headers.get("X-Next-Cursor")
+
+def test_search_ignores_polish_diacritics(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    assert search(api_client, "sluchawki")[0] == ["Słuchawki gamingowe"]
+    assert search(api_client, "GLOSNIKI")[0] == ["Głośniki"]
+    assert search(api_client, "głośniki bluetooth")[0] == ["Głośniki"]
+
+def test_search_ranks_name_matches_first_and_paginates(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    names, _ = search(api_client, "laptop")
+    assert set(names[:2]) == {"Laptop gaming", "Laptop biurowy"}
+    assert names[2:] == ["Monitor"]  # prefiks: "laptopa" w opisie
+
+    pages, cursor = [], None
+    while True:
+        page, cursor = search(api_client, "laptop", limit=1, **({"cursor": cursor} if cursor else {}))
+        pages.extend(page)
+        if cursor is None:
+            break
+    assert pages == names
+
+def test_search_follows_product_writes(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    api_client.put("/api/v1/products/2", json={"name": "Kolumny"})
+    assert search(api_client, "kolumny")[0] == ["Kolumny"]
+    api_client.delete("/api/v1/products/3")
+    assert search(api_client, "laptop gaming")[0] == []
+    api_client.post("/api/v1/products", json={"name": "Laptop gaming 2", "description": "Nowy", "price": 5999.0})
+    assert search(api_client, "laptop gaming")[0] == ["Laptop gaming 2"]
+
+def test_search_treats_query_syntax_as_text(api_client, sqlite_engine):
+    seed(sqlite_engine)
+    assert search(api_client, '"laptop" OR NEAR(*')[0] == []
+    assert search(api_client, "!!!")[0] == []
+    response = api_client.get("/api/v1/products/search", params={"q": "laptop", "cursor": "abc"})
+    assert (response.status_code, response.json()["detail"]) == (400, "Invalid cursor")
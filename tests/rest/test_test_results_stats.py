@@ -0,0 +1,116 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import numpy as np
+import pytest
+from sqlalchemy import insert
+from api.database.results_analytics import ResultsAnalytics
+from api.models.test_result import TestResult
+
+def result_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        {
+            "test_id": f"TC_{rng.randint(1, 6):03d}",
+            "environment": rng.choice(["local", "staging"]),
+            "result": "passed" if rng.random() < 0.8 else "not passed",
+            "duration_ms": None if rng.random() < 0.05 else rng.randint(10, 500),
+        }
+        for _ in range(count)
+    ]
+
+def history(test_id, environment, results):
+    return [{"test_id": test_id, "environment": environment, "result": result, "duration_ms": duration}
+            for result, duration in results]
+
+def expected_stats(rows):
+    # Ta sama statystyka liczona pętlą po wierszach – punkt odniesienia dla wersji kolumnowej
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["test_id"], row["environment"]), []).append(row)
+    expected = {}
+    for key, group in groups.items():
+        durations = [row["duration_ms"] for row in group if row["duration_ms"] is not None]
+        expected[key] = {
+            "runs": len(group),
+            "pass_rate": round(sum(row["result"] == "passed" for row in group) / len(group), 4),
+            "p50_ms": round(float(np.quantile(durations, 0.5)), 4),
+            "p99_ms": round(float(np.quantile(durations, 0.99)), 4),
+            "last_passed": group[-1]["result"] == "passed",
+            "baseline_p50_ms": statistics.median(row["duration_ms"] for row in group[:-1] if row["duration_ms"] is not None),
+        }
+    return expected
+
+def test_incremental_stats_match_full_recompute(sqlite_engine):
+    rows = result_rows(700)
+    analytics = ResultsAnalytics(chunk_size=64)  # kilka porcji przy każdym wczytaniu
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(TestResult), rows[:400])
+    with sqlite_engine.connect() as conn:
+        assert analytics.refresh(conn) == 400
+        analytics.report(conn)
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(TestResult), rows[400:])
+    with sqlite_engine.connect() as conn:
+        report = analytics.report(conn)
+        # Drugie wywołanie wczytuje tylko 300 nowych wyników, trzecie – nic
+        assert analytics.refresh(conn) == 0
+    assert report["last_result_id"] == report["results"] == 700
+
+    expected = expected_stats(rows)
+    assert len(report["tests"]) == len(expected)
+    for test in report["tests"]:
+        reference = expected[(test["test_id"], test["environment"])]
+        assert {name: test[name] for name in reference} == pytest.approx(reference)
+    assert sum(environment["runs"] for environment in report["environments"]) == 700
+
+def test_concurrent_reports_merge_each_result_once(sqlite_engine):
+    rows = result_rows(500)
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(TestResult), rows)
+    analytics = ResultsAnalytics()
+    with sqlite_engine.connect() as conn:
+        fetched = [analytics.fetch(conn) for _ in range(4)]  # każde żądanie odczytało te same nowe wyniki
+    # Scalanie i obliczenia w wątkach puli, jak w endpoincie
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        reports = list(pool.map(lambda environment: analytics.fetched_report(fetched.pop(), environment),
+                                [None, "local", None, "staging"]))
+    assert len(analytics.results) == 500
+    assert reports[0] is reports[2]
+    assert sum(environment["runs"] for environment in reports[0]["environments"]) == 500
+
+def test_stats_endpoint_regressions(api_client, sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(TestResult), [
+            *history("TC_001", "local", [("passed", 100), ("passed", 110), ("passed", 105)]),
+            *history("TC_002", "local", [("passed", 100), ("passed", 120), ("passed", 100)]),
+            *history("TC_002", "staging", [("passed", 50)]),
+        ])
+    report = api_client.get("/api/v1/test-results/stats").json()
+    assert report["regressions"] == []
+    assert {(test["test_id"], test["environment"]) for test in report["tests"]} == {
+        ("TC_001", "local"), ("TC_002", "local"), ("TC_002", "staging"),
+    }
+
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(TestResult), [
+            *history("TC_001", "local", [("not passed", 100)]),
+            *history("TC_002", "local", [("passed", 400)]),
+        ])
+    report = api_client.get("/api/v1/test-results/stats", params={"environment": "local"}).json()
+    assert report["last_result_id"] == 9
+    assert [environment["environment"] for environment in report["environments"]] == ["local"]
+    regressions = {test["test_id"]: test for test in report["regressions"]}
+    assert regressions["TC_001"]["regression"] == "status"
+    assert regressions["TC_002"]["regression"] == "duration"
+    assert regressions["TC_002"]["baseline_p50_ms"] == 100
+    assert regressions["TC_002"]["duration_delta_ms"] == 300
+    assert regressions["TC_002"]["duration_delta_pct"] == 3.0
+
+    # Próg regresji czasu z parametru zapytania
+    lenient = api_client.get("/api/v1/test-results/stats", params={"regression_threshold": 5}).json()
+    assert [test["test_id"] for test in lenient["regressions"]] == ["TC_001"]
+
+def test_stats_endpoint_empty_history(api_client):
+    report = api_client.get("/api/v1/test-results/stats").json()
+    assert report["results"] == 0 and report["tests"] == [] and report["regressions"] == []
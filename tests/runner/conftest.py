@@ -0,0 +1,16 @@
+import pytest
+from jira import JIRA
+from tests.runner.fake_jira import FakeJira
+
+# Lokalny serwer JIRA dla testów zgłaszania defektów
+@pytest.fixture
+def fake_jira():
+    fake = FakeJira().start()
+    yield fake
+    fake.stop()
+
+@pytest.fixture
+def jira_client(fake_jira):
+    client = JIRA(server=fake_jira.url, basic_auth=("tester", "token"))
+    yield client
+    client.close()
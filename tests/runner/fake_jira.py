@@ -0,0 +1,190 @@
+import datetime
+import json
+import re
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Minimalny serwer JIRA (REST API v2) dla testów runnera – obsługuje tylko wywołania używane przez klienta jira:
+# serverInfo, field, search (summary ~ "...", updated >= "..."), issue/bulk, issue/{key} (GET, PUT), issue/{key}/comment,
+# issueLinkType i issueLink.
+# Liczy żądania per endpoint, aby testy mogły sprawdzić grupowanie i deduplikację.
+
+
+class FakeJira:
+    def __init__(self, project_key: str = "SCRUM"):
+        self.project_key = project_key
+        self.issues = []  # {"key", "summary", "description", "issuetype", "updated"}
+        self.comments = {}  # klucz -> lista treści komentarzy
+        self.links = []  # (typ, inward, outward)
+        self.requests = Counter()  # "METODA endpoint" -> liczba żądań
+        self.queries = []  # JQL z kolejnych wyszukiwań
+        self.utc_offset = "+0200"  # strefa użytkownika JIRA; "updated" zwracane w tej strefie, jak w JQL
+        self.search_error = None  # treść błędu zwracanego przez search (np. niepoprawny JQL) zamiast wyników
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_issue(self, summary: str, issuetype: str = "Bug", updated: datetime.datetime | None = None) -> str:
+        with self.lock:
+            key = f"{self.project_key}-{len(self.issues) + 1}"
+            self.issues.append({
+                "key": key, "summary": summary, "description": "", "issuetype": issuetype,
+                "updated": updated or datetime.datetime.now(),
+            })
+            return key
+
+    def issue(self, key: str) -> dict | None:
+        return next((issue for issue in self.issues if issue["key"] == key), None)
+
+    def search(self, jql: str) -> list[dict]:
+        # summary ~ w JIRA to wyszukiwanie pełnotekstowe – tu uproszczone do zawierania frazy
+        phrases = re.findall(r'summary ~ "([^"]*)"', jql)
+        issuetype = re.search(r"issuetype=(\w+)", jql)
+        updated = re.search(r'updated >= "([^"]+)"', jql)
+        since = datetime.datetime.strptime(updated.group(1), "%Y/%m/%d %H:%M") if updated else None
+        return [
+            issue for issue in self.issues
+            if (not phrases or any(phrase in issue["summary"] for phrase in phrases))
+            and (not issuetype or issue["issuetype"] == issuetype.group(1))
+            and (since is None or issue["updated"] >= since)
+        ]
+
+    def start(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+def _issue_json(fake: FakeJira, issue: dict) -> dict:
+    return {
+        "id": issue["key"].split("-")[1],
+        "key": issue["key"],
+        "self": f"{fake.url}/rest/api/2/issue/{issue['key']}",
+        "fields": {
+            "summary": issue["summary"], "description": issue["description"], "issuetype": {"name": issue["issuetype"]},
+            "updated": f"{issue['updated']:%Y-%m-%dT%H:%M:%S}.000{fake.utc_offset}",
+        },
+    }
+
+
+def _handler(fake: FakeJira):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def record(self, endpoint: str):
+            with fake.lock:
+                fake.requests[f"{self.command} {endpoint}"] += 1
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = url.path.removeprefix("/rest/api/2")
+            if path == "/serverInfo":
+                self.send_json(200, {"baseUrl": fake.url, "version": "9.12.0", "versionNumbers": [9, 12, 0], "deploymentType": "Server"})
+            elif path == "/field":
+                self.send_json(200, [])
+            elif path == "/issueLinkType":
+                self.send_json(200, {"issueLinkTypes": [{"id": "1", "name": "Relates", "inward": "relates to", "outward": "relates to"}]})
+            elif path == "/search":
+                self.record("search")
+                if fake.search_error:
+                    self.send_json(400, {"errorMessages": [fake.search_error]})
+                    return
+                params = parse_qs(url.query)
+                jql = params["jql"][0]
+                start_at = int(params.get("startAt", ["0"])[0])
+                max_results = int(params.get("maxResults", ["50"])[0])
+                with fake.lock:
+                    if start_at == 0:
+                        fake.queries.append(jql)
+                    found = fake.search(jql)
+                    page = [_issue_json(fake, issue) for issue in found[start_at:start_at + max_results]]
+                self.send_json(200, {"startAt": start_at, "maxResults": max_results, "total": len(found), "issues": page})
+            elif match := re.fullmatch(r"/issue/([\w-]+)", path):
+                self.record("issue")
+                with fake.lock:
+                    issue = fake.issue(match.group(1))
+                    body = _issue_json(fake, issue) if issue else None
+                if body:
+                    self.send_json(200, body)
+                else:
+                    self.send_json(404, {"errorMessages": ["Issue Does Not Exist"]})
+            else:
+                self.send_json(404, {"errorMessages": [f"Nieobsługiwany endpoint {path}"]})
+
+        def do_PUT(self):
+            path = urlparse(self.path).path.removeprefix("/rest/api/2")
+            body = self.read_json()
+            match = re.fullmatch(r"/issue/([\w-]+)", path)
+            if not match:
+                self.send_json(404, {"errorMessages": [f"Nieobsługiwany endpoint {path}"]})
+                return
+            self.record("issue")
+            with fake.lock:
+                issue = fake.issue(match.group(1))
+                if issue:
+                    issue.update({name: value for name, value in body.get("fields", {}).items() if name in issue})
+                    issue["updated"] = datetime.datetime.now()
+            if not issue:
+                self.send_json(404, {"errorMessages": ["Issue Does Not Exist"]})
+                return
+            self.send_response(204)
+            self.end_headers()
+
+        def do_POST(self):
+            path = urlparse(self.path).path.removeprefix("/rest/api/2")
+            body = self.read_json()
+            if path == "/issue/bulk":
+                self.record("issue/bulk")
+                created = [
+                    fake.add_issue(update["fields"]["summary"], update["fields"]["issuetype"]["name"])
+                    for update in body["issueUpdates"]
+                ]
+                with fake.lock:
+                    for key, update in zip(created, body["issueUpdates"]):
+                        fake.issues[int(key.split("-")[1]) - 1]["description"] = update["fields"].get("description", "")
+                    issues = [_issue_json(fake, fake.issues[int(key.split("-")[1]) - 1]) for key in created]
+                self.send_json(201, {"issues": issues, "errors": []})
+            elif match := re.fullmatch(r"/issue/([\w-]+)/comment", path):
+                self.record("comment")
+                with fake.lock:
+                    comments = fake.comments.setdefault(match.group(1), [])
+                    comments.append(body["body"])
+                    comment_id = len(comments)
+                self.send_json(201, {"id": str(comment_id), "body": body["body"]})
+            elif path == "/issueLink":
+                self.record("issueLink")
+                with fake.lock:
+                    fake.links.append((body["type"]["name"], body["inwardIssue"]["key"], body["outwardIssue"]["key"]))
+                self.send_response(201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            else:
+                self.send_json(404, {"errorMessages": [f"Nieobsługiwany endpoint {path}"]})
+
+    return Handler
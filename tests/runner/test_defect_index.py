@@ -0,0 +1,56 @@
+import datetime
+from sqlalchemy import select
+from api.models.defect_key import DefectKey, JiraSyncState
+from runner.defect_index import DefectIndex
+from runner.defects import DefectReport, DefectReporter
+
+def report(test_id):
+    return DefectReport(test_id=test_id, description=f"Opis {test_id}", details={}, actual_status=500,
+                        actual_response="błąd", issue_key="SCRUM-100", link_issue=False)
+
+def test_sync_is_incremental_and_persistent(fake_jira, jira_client, sqlite_engine):
+    old = fake_jira.add_issue("Defekt dla TC_001: stary defekt", updated=datetime.datetime(2024, 1, 1))
+    latest = fake_jira.add_issue("Defekt dla TC_003: ostatnio zmieniony", updated=datetime.datetime(2024, 3, 1))
+    fake_jira.add_issue("Zadanie bez defektu", issuetype="Task")
+    index = DefectIndex(sqlite_engine)
+    assert index.sync(jira_client, "SCRUM") == 2
+    assert 'updated >=' not in fake_jira.queries[-1]
+
+    new = fake_jira.add_issue("Defekt dla TC_002: nowy defekt")
+    index = DefectIndex(sqlite_engine)
+    assert index.get("TC_001") == old  # wczytany z store.db, bez JIRA
+    assert index.sync(jira_client, "SCRUM") == 1
+    # Drugie wyszukiwanie obejmuje tylko defekty zmienione od poprzedniej synchronizacji
+    assert 'updated >=' in fake_jira.queries[-1]
+    assert [issue["key"] for issue in fake_jira.search(fake_jira.queries[-1])] == [latest, new]
+    assert index.keys == {"TC_001": old, "TC_003": latest, "TC_002": new}
+
+def test_sync_watermark_comes_from_jira(fake_jira, jira_client, sqlite_engine):
+    # Czas JIRA (strefa użytkownika) trzy godziny za zegarem runnera
+    jira_now = datetime.datetime.now() - datetime.timedelta(hours=3)
+    fake_jira.add_issue("Defekt dla TC_001: pierwszy", updated=jira_now)
+    index = DefectIndex(sqlite_engine)
+    index.sync(jira_client, "SCRUM")
+    with sqlite_engine.connect() as conn:
+        assert conn.scalar(select(JiraSyncState.last_sync)) == jira_now.replace(microsecond=0)
+
+    created = fake_jira.add_issue("Defekt dla TC_002: utworzony po synchronizacji", updated=jira_now + datetime.timedelta(minutes=1))
+    assert index.sync(jira_client, "SCRUM") == 1
+    assert index.get("TC_002") == created
+
+def test_synced_index_replaces_jql_lookups(fake_jira, jira_client, sqlite_engine):
+    existing = fake_jira.add_issue("Defekt dla TC_001: znany defekt")
+    index = DefectIndex(sqlite_engine)
+    index.sync(jira_client, "SCRUM")
+    fake_jira.requests.clear()
+
+    with DefectReporter(jira_client, "SCRUM", index=index) as reporter:
+        reporter.submit(report("TC_001"))
+        reporter.submit(report("TC_002"))
+
+    # Znany defekt dostaje komentarz, nowy jest tworzony – bez wyszukiwania JQL
+    assert fake_jira.requests == {"POST comment": 1, "POST issue/bulk": 1, "PUT issue": 1, "GET issue": 1}
+    assert reporter.resolved["TC_001"] == existing
+    with sqlite_engine.connect() as conn:
+        stored = dict(conn.execute(select(DefectKey.test_id, DefectKey.defect_key)).all())
+    assert stored == reporter.resolved
@@ -0,0 +1,81 @@
+from sqlalchemy import select
+from api.models.test_result import TestResult
+from runner.defects import DefectReport, DefectReporter
+from runner.results import ResultWriter
+from runner.stats import PENDING_DEFECT_KEY, load_test_stats
+
+def report(test_id, actual_status=500, issue_key="SCRUM-100", link_issue=True):
+    return DefectReport(
+        test_id=test_id,
+        description=f"Opis {test_id}",
+        details={"Endpoint": "/api/v1/products/1", "Rzeczywisty status": actual_status},
+        actual_status=actual_status,
+        actual_response="błąd",
+        issue_key=issue_key,
+        link_issue=link_issue,
+    )
+
+def test_batch_is_searched_once_and_deduplicated(fake_jira, jira_client):
+    existing = fake_jira.add_issue("Defekt dla TC_002: Opis TC_002")
+    fake_jira.add_issue("Defekt dla TC_0020: inny test")  # summary ~ dopasuje też ten defekt
+    reporter = DefectReporter(jira_client, "SCRUM", flush_interval=1.0)
+    # Zgłoszenia w kolejce przed startem – trafiają do jednej partii
+    for test_id, status in [("TC_001", 500), ("TC_002", 500), ("TC_001", 404), ("TC_003", 500), ("TC_002", 404)]:
+        reporter.submit(report(test_id, status))
+    with reporter:
+        pass
+
+    assert fake_jira.requests == {"GET search": 1, "POST issue/bulk": 1, "PUT issue": 2, "GET issue": 2,
+                                  "POST issueLink": 2, "POST comment": 2}
+    assert len(fake_jira.queries) == 1
+    assert reporter.resolved["TC_002"] == existing
+    created = {reporter.resolved["TC_001"], reporter.resolved["TC_003"]}
+    assert {link[1] for link in fake_jira.links} == created
+    assert "(2 niepowodzeń)" in fake_jira.comments[existing][0]
+    # Drugie niepowodzenie TC_001 z partii trafia do komentarza nowego defektu
+    assert "**Rzeczywisty status**: 404" in fake_jira.comments[reporter.resolved["TC_001"]][0]
+    for key in created:
+        assert fake_jira.issue(key)["description"].endswith(f"**Numer defektu**: {key}")
+
+def test_known_defects_skip_search(fake_jira, jira_client):
+    with DefectReporter(jira_client, "SCRUM", flush_interval=0.05) as reporter:
+        reporter.submit(report("TC_001", link_issue=False))
+        reporter.close()
+        reporter.start()
+        reporter.submit(report("TC_001"))
+
+    assert fake_jira.requests == {"GET search": 1, "POST issue/bulk": 1, "PUT issue": 1, "GET issue": 1, "POST comment": 1}
+    assert len(fake_jira.issues) == 1
+
+def test_failed_search_still_comments_known_defects(fake_jira, jira_client):
+    existing = fake_jira.add_issue("Defekt dla TC_001: Opis TC_001")
+    resolved = []
+    with DefectReporter(jira_client, "SCRUM", on_resolved=lambda *args: resolved.append(args), flush_interval=0.05) as reporter:
+        reporter.submit(report("TC_001"))
+        reporter.close()
+        fake_jira.search_error = "Błąd w zapytaniu JQL"
+        reporter.start()
+        # TC_001 jest już znany, TC_002 wymaga wyszukiwania, które się nie powiedzie
+        reporter.submit(report("TC_001"))
+        reporter.submit(report("TC_002"))
+
+    assert fake_jira.requests == {"GET search": 2, "POST comment": 2}
+    assert len(fake_jira.comments[existing]) == 2
+    assert resolved == [("TC_001", existing), ("TC_001", existing)]
+    assert reporter.resolved == {"TC_001": existing}
+    assert len(fake_jira.issues) == 1
+
+def test_resolved_keys_replace_pending_results(fake_jira, jira_client, sqlite_engine):
+    with ResultWriter(sqlite_engine, batch_size=2, flush_interval=None) as writer:
+        with DefectReporter(jira_client, "SCRUM", on_resolved=writer.set_defect_key) as reporter:
+            for test_id in ["TC_001", "TC_002", "TC_003"]:
+                # TC_001 i TC_002 są już zapisane w bazie, TC_003 czeka w buforze
+                writer.add(test_id=test_id, result="not passed", actual_status=500, actual_response="",
+                           defect_key=PENDING_DEFECT_KEY, duration_ms=5, retry_count=0)
+                reporter.submit(report(test_id))
+
+    with sqlite_engine.connect() as conn:
+        keys = dict(conn.execute(select(TestResult.test_id, TestResult.defect_key)).all())
+        stats = load_test_stats(conn)
+    assert keys == reporter.resolved
+    assert {test_id: row.last_defect_key for test_id, row in stats.items()} == reporter.resolved
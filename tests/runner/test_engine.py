@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from runner.engine import CaseOutcome, plan_dependencies, resource_key, run_cases
+from runner.rest import RestCase, create_http_session, execute_rest_case
+
+def case(test_id, method, endpoint, expected_status=200, expected_response=None):
+    return RestCase(test_id, f"Opis {test_id}", endpoint, method, expected_status, expected_response)
+
+def test_resource_key_ignores_ids_and_query():
+    assert resource_key("/api/v1/products/1") == "/api/v1/products"
+    assert resource_key("/api/v1/products?limit=5") == "/api/v1/products"
+    assert resource_key("/health") == "/health"
+
+def test_writes_wait_for_earlier_cases_on_the_same_resource():
+    cases = [
+        case("TC_001", "GET", "/api/v1/products"),
+        case("TC_002", "GET", "/api/v1/products/1"),
+        case("TC_003", "POST", "/api/v1/products"),
+        case("TC_004", "GET", "/api/v1/products/1"),
+        case("TC_005", "DELETE", "/api/v1/products/1"),
+        case("TC_006", "GET", "/health"),
+    ]
+    assert plan_dependencies(cases) == [set(), set(), {0, 1}, {2}, {2, 3}, set()]
+
+def test_run_cases_is_concurrent_bounded_and_ordered():
+    cases = [case(f"TC_{i:03}", "GET", f"/api/v1/resource{i % 4}") for i in range(12)]
+    cases += [case("TC_100", "POST", "/api/v1/resource0"), case("TC_101", "DELETE", "/api/v1/resource0/1")]
+    lock = threading.Lock()
+    active, peak, finished = 0, 0, []
+
+    def execute(test_case):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+            finished.append(test_case.test_id)
+        return CaseOutcome(test_case)
+
+    recorded = []
+    outcomes = run_cases(cases, execute, workers=4, on_outcome=lambda outcome: recorded.append(outcome.case.test_id))
+
+    assert [outcome.case for outcome in outcomes] == cases
+    assert sorted(recorded) == sorted(case.test_id for case in cases)
+    assert 1 < peak <= 4
+    # Zapisy na resource0 startują dopiero po wcześniejszych odczytach tego zasobu, w kolejności przypadków
+    reads_of_resource0 = {f"TC_{i:03}" for i in range(0, 12, 4)}
+    assert reads_of_resource0 <= set(finished[:finished.index("TC_100")])
+    assert finished.index("TC_100") < finished.index("TC_101")
+
+def test_run_cases_turns_exceptions_into_failed_outcomes():
+    def execute(test_case):
+        raise ConnectionError("Connection refused")
+
+    [outcome] = run_cases([case("TC_001", "GET", "/health")], execute)
+    assert outcome.result == "not passed" and outcome.error
+    assert outcome.failure_message == "Error: Connection refused"
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.05)
+        body = json.dumps({"id": 1, "name": "Laptop"}).encode("utf-8")
+        self.send_response(200 if self.path != "/missing" else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def fake_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def test_execute_rest_case_checks_status_and_response(fake_api):
+    with create_http_session() as session:
+        passed = execute_rest_case(session, fake_api, case("TC_001", "GET", "/slow", 200, '{"id": 1}'))
+        wrong_body = execute_rest_case(session, fake_api, case("TC_002", "GET", "/products", 200, '{"id": 2}'))
+        wrong_status = execute_rest_case(session, fake_api, case("TC_003", "GET", "/missing", 200))
+
+    assert passed.result == "passed" and passed.actual_status == 200
+    assert passed.duration_ms >= 50
+    assert json.loads(passed.actual_response) == {"id": 1, "name": "Laptop"}
+    assert wrong_body.result == "not passed" and not wrong_body.error
+    assert wrong_body.message == "Oczekiwano id: 2, otrzymano id: 1"
+    assert wrong_status.actual_status == 404
+    assert wrong_status.failure_message == "Expected: None, Got: 404"
@@ -0,0 +1,85 @@
+import datetime
+import random
+from sqlalchemy import insert
+from api.models.test_result import TestResult
+from runner.flaky import flaky_test_ids, load_flaky_stats, rebuild_flaky_stats, update_flaky_stats
+
+START = datetime.datetime(2025, 3, 1)
+
+def results(test_id, outcomes, interval=datetime.timedelta(days=1), start=START):
+    # "P" – passed, "F" – not passed; kolejne uruchomienia co interval
+    return [
+        {"test_id": test_id, "result": "passed" if outcome == "P" else "not passed", "timestamp": start + i * interval}
+        for i, outcome in enumerate(outcomes)
+    ]
+
+def interleave(*histories):
+    # Wyniki różnych testów przeplatane jak w kolejnych uruchomieniach całego zestawu
+    rows = [row for history in histories for row in history]
+    return sorted(rows, key=lambda row: row["timestamp"])
+
+def insert_results(engine, rows):
+    with engine.begin() as conn:
+        conn.execute(insert(TestResult), rows)
+
+def snapshot(engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            test_id: (row.runs, row.failures, row.flips, row.clustered_failures, row.last_failed, row.last_streak,
+                      row.last_result_id, row.last_failure_at, round(row.flaky_score, 9))
+            for test_id, row in load_flaky_stats(conn).items()
+        }
+
+def test_flaky_tests_are_told_apart_from_regressions(sqlite_engine):
+    outage_start = START + datetime.timedelta(days=10)
+    insert_results(sqlite_engine, interleave(
+        results("TC_001", "PPFPPFPPPFPP"),  # pojedyncze niepowodzenia rozrzucone w czasie – niestabilny
+        results("TC_002", "PPPPPPPPPFFP"),  # jedna zmiana na serię niepowodzeń, potem naprawa
+        results("TC_003", "PPPPPP"),
+        results("TC_004", "PPPFPPPP"),  # jedno niepowodzenie – za mało
+        results("TC_005", "FF", interval=datetime.timedelta(minutes=5), start=outage_start),  # awaria środowiska
+        results("TC_005", "PPFPPFPP", start=outage_start + datetime.timedelta(hours=2)),
+    ))
+    with sqlite_engine.begin() as conn:
+        assert update_flaky_stats(conn) == 12 + 12 + 6 + 8 + 2 + 8
+        stats = load_flaky_stats(conn)
+    assert flaky_test_ids(stats) == ["TC_001", "TC_005"]
+    assert stats["TC_001"].flips == 6 and stats["TC_001"].clustered_failures == 0
+    assert stats["TC_002"].flips == 2
+    # Drugie niepowodzenie awarii TC_005 nastąpiło 5 minut po pierwszym
+    assert stats["TC_005"].clustered_failures == 1
+
+def test_consistent_failure_is_not_flaky(sqlite_engine):
+    insert_results(sqlite_engine, results("TC_001", "PFPFPFPF"))
+    with sqlite_engine.begin() as conn:
+        update_flaky_stats(conn)
+        assert flaky_test_ids(load_flaky_stats(conn)) == ["TC_001"]
+    # Od teraz test nie przechodzi ani razu – to regresja, której --skip-flaky nie może ukryć
+    insert_results(sqlite_engine, results("TC_001", "FF", start=START + datetime.timedelta(days=30)))
+    with sqlite_engine.begin() as conn:
+        update_flaky_stats(conn)
+        stats = load_flaky_stats(conn)
+    assert stats["TC_001"].last_streak == 3
+    assert flaky_test_ids(stats) == []
+
+def test_incremental_scan_matches_full_rebuild(sqlite_engine):
+    rng = random.Random(3)
+    histories = [
+        results(f"TC_{n:03d}", "".join(rng.choice("PPPF") for _ in range(40)),
+                interval=datetime.timedelta(minutes=rng.choice([10, 50, 90])))
+        for n in range(1, 8)
+    ]
+    rows = interleave(*histories)
+    # Skan po każdej partii wyników – granice porcji wypadają w różnych miejscach historii każdego testu
+    for start in range(0, len(rows), 37):
+        insert_results(sqlite_engine, rows[start:start + 37])
+        with sqlite_engine.begin() as conn:
+            assert update_flaky_stats(conn) == len(rows[start:start + 37])
+    with sqlite_engine.begin() as conn:
+        assert update_flaky_stats(conn) == 0
+    incremental = snapshot(sqlite_engine)
+
+    with sqlite_engine.begin() as conn:
+        assert rebuild_flaky_stats(conn) == len(rows)
+    assert snapshot(sqlite_engine) == incremental
+    assert sum(stats[0] for stats in incremental.values()) == len(rows)
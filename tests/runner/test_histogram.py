@@ -0,0 +1,32 @@
+import random
+import pytest
+from runner.histogram import LatencyHistogram, bucket_index, highest_equivalent_value
+
+def test_buckets_keep_three_significant_digits():
+    for value in [0, 1, 2047, 2048, 2049, 4095, 4096, 123_456, 10**9]:
+        index = bucket_index(value)
+        assert value <= highest_equivalent_value(index) <= value * 1.001 + 1
+        assert bucket_index(highest_equivalent_value(index)) == index
+
+def test_percentiles_match_exact_values():
+    rng = random.Random(7)
+    values = [int(rng.lognormvariate(8, 1.2)) for _ in range(50_000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    ordered = sorted(values)
+    for percentile in (50, 90, 99, 99.9):
+        exact = ordered[int(len(ordered) * percentile / 100) - 1]
+        assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.002, abs=1)
+    assert histogram.percentile(100) == max(values)
+    assert histogram.summary()["mean"] == pytest.approx(sum(values) / len(values) / 1000)
+
+def test_merge_and_serialization():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in range(1000):
+        (first if value % 2 else second).record(value * 100)
+    restored = LatencyHistogram.from_dict(first.to_dict()).merge(LatencyHistogram.from_dict(second.to_dict()))
+    assert restored.total == 1000
+    assert restored.percentile(50) == pytest.approx(49_900, rel=0.001)
+    with pytest.raises(ValueError):
+        LatencyHistogram.from_dict({"sub_bucket_bits": 7, "counts": {}})
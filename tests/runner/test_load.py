@@ -0,0 +1,64 @@
+import asyncio
+import json
+import httpx
+from sqlalchemy import insert, select
+from api.main import app
+from api.models.load_test_run import LoadTestRun
+from api.models.product import Product
+from runner.histogram import LatencyHistogram
+from runner.load import load_request, run_load, save_run
+from runner.rest import RestCase
+
+def case(test_id, method, endpoint, expected_status=200):
+    return RestCase(test_id, f"Opis {test_id}", endpoint, method, expected_status, None)
+
+def requests():
+    return [
+        load_request(case("TC_014", "GET", "/api/v1/products")),
+        load_request(case("TC_021", "POST", "/soap/")),  # koperta SOAP GetProduct z runner/payloads.py
+        load_request(case("TC_006", "GET", "/api/v1/products/999")),  # oczekiwany 200, serwer zwraca 404
+    ]
+
+def run(api_client, **options):
+    # Aplikacja FastAPI w procesie (ASGITransport) – z nadpisanymi zależnościami bazy z fixture api_client
+    return asyncio.run(run_load(requests(), "http://test", transport=httpx.ASGITransport(app=app), **options))
+
+def seed_products(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"name": f"Produkt {i}", "description": "Opis", "price": 10, "available": True, "stock": 1} for i in range(3)
+        ])
+
+def test_concurrency_mode_records_latency_and_errors_per_case(api_client, sqlite_engine):
+    seed_products(sqlite_engine)
+    result = run(api_client, duration=0.3, concurrency=4)
+
+    assert result.mode == "concurrency"
+    assert all(load.requests > 0 for load in result.cases.values())
+    assert all(load.histogram.total == load.requests for load in result.cases.values())
+    assert result.cases["TC_014"].errors == {} and result.cases["TC_021"].errors == {}
+    assert result.cases["TC_006"].errors == {"status 404": result.cases["TC_006"].requests}
+    summary = result.summary()
+    assert summary["requests"] == sum(load.requests for load in result.cases.values())
+    assert 0.3 < summary["error_rate"] < 0.4
+    assert 0 < summary["p50"] <= summary["p99"] <= summary["max"]
+
+def test_rps_mode_issues_scheduled_requests(api_client, sqlite_engine):
+    seed_products(sqlite_engine)
+    result = run(api_client, duration=0.25, rps=200, concurrency=8)
+    # Otwarta pętla: liczba żądań wynika z harmonogramu (0,25 s * 200 req/s), a nie z czasu odpowiedzi
+    assert result.mode == "rps" and result.summary()["requests"] == 50
+
+def test_save_run_stores_summary_next_to_results(api_client, sqlite_engine):
+    seed_products(sqlite_engine)
+    result = run(api_client, duration=0.2, concurrency=2)
+    run_id = save_run(result, "http://test", bind=sqlite_engine)
+
+    with sqlite_engine.connect() as conn:
+        stored = conn.execute(select(LoadTestRun).where(LoadTestRun.id == run_id)).one()
+    summary = result.summary()
+    assert (stored.requests, stored.errors, stored.mode) == (summary["requests"], summary["errors"], "concurrency")
+    assert stored.test_ids == "TC_014,TC_021,TC_006"
+    assert stored.p99_ms == summary["p99"]
+    assert LatencyHistogram.from_dict(json.loads(stored.histogram)).total == stored.requests
+    assert json.loads(stored.cases)["TC_006"]["error_kinds"] == {"status 404": result.cases["TC_006"].requests}
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from sqlalchemy import func, select
+from api.models.test_result import TestResult
+from runner.results import ResultWriter
+
+def add_results(writer: ResultWriter, count: int, start: int = 0):
+    for i in range(start, start + count):
+        writer.add(test_id=f"TC_{i:05}", result="passed", actual_status=200, actual_response="{}",
+                   defect_key=None, duration_ms=i, retry_count=0)
+
+def stored(engine) -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(TestResult))
+
+def test_flushes_full_batches_and_rest_on_close(sqlite_engine):
+    with ResultWriter(sqlite_engine, batch_size=100, flush_interval=None) as writer:
+        add_results(writer, 250)
+        assert stored(sqlite_engine) == 200
+        assert writer.pending() == 50
+    assert stored(sqlite_engine) == 250
+    assert writer.flushes == 3
+
+def test_flushes_after_interval(sqlite_engine):
+    with ResultWriter(sqlite_engine, batch_size=1000, flush_interval=0.05) as writer:
+        add_results(writer, 10)
+        deadline = time.monotonic() + 5
+        while stored(sqlite_engine) < 10 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert stored(sqlite_engine) == 10
+
+def test_flushes_buffer_when_run_is_interrupted(sqlite_engine):
+    with pytest.raises(KeyboardInterrupt):
+        with ResultWriter(sqlite_engine, batch_size=1000, flush_interval=None) as writer:
+            add_results(writer, 5)
+            raise KeyboardInterrupt
+    assert stored(sqlite_engine) == 5
+
+def test_flushes_buffer_on_sigterm(sqlite_engine, sqlite_path):
+    script = (
+        "import os, signal, sys\n"
+        "from sqlalchemy import create_engine\n"
+        "from runner.results import ResultWriter\n"
+        "from tests.runner.test_results import add_results\n"
+        "writer = ResultWriter(create_engine(sys.argv[1]), batch_size=1000, flush_interval=None).start()\n"
+        "add_results(writer, 7)\n"
+        "os.kill(os.getpid(), signal.SIGTERM)\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", script, f"sqlite:///{sqlite_path}"],
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        capture_output=True, text=True,
+    )
+    assert process.returncode == 143, process.stderr
+    assert stored(sqlite_engine) == 7
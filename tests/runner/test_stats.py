@@ -0,0 +1,61 @@
+import datetime
+from sqlalchemy import insert
+from api.models.test_case_stats import TestCaseStats
+from api.models.test_result import TestResult
+from runner.results import ResultWriter
+from runner.stats import ensure_test_stats, failed_test_ids, load_test_stats, rebuild_test_stats
+
+def add(writer, test_id, result, defect_key=None, duration_ms=10):
+    writer.add(test_id=test_id, result=result, actual_status=200 if result == "passed" else 500, actual_response="",
+               defect_key=defect_key, duration_ms=duration_ms, retry_count=0)
+
+def write_history(engine):
+    # Dwa uruchomienia; druga partia zawiera TC_001 dwa razy
+    with ResultWriter(engine, batch_size=1000, flush_interval=None) as writer:
+        add(writer, "TC_001", "not passed", "SCRUM-1")
+        add(writer, "TC_002", "not passed", "PENDING")
+        add(writer, "TC_003", "passed")
+    with ResultWriter(engine, batch_size=1000, flush_interval=None) as writer:
+        add(writer, "TC_001", "passed")
+        add(writer, "TC_001", "passed", duration_ms=42)
+        add(writer, "TC_003", "not passed", "SCRUM-3")
+
+def snapshot(engine) -> dict:
+    with engine.connect() as conn:
+        return {
+            test_id: (row.run_count, row.last_result, row.last_duration_ms, row.last_defect_key)
+            for test_id, row in load_test_stats(conn).items()
+        }
+
+def test_writer_keeps_stats_in_step_with_results(sqlite_engine):
+    write_history(sqlite_engine)
+
+    assert snapshot(sqlite_engine) == {
+        "TC_001": (3, "passed", 42, "SCRUM-1"),
+        "TC_002": (1, "not passed", 10, None),
+        "TC_003": (2, "not passed", 10, "SCRUM-3"),
+    }
+    with sqlite_engine.connect() as conn:
+        # TC_001 kiedyś nie przeszedł, ale ostatni wynik jest pozytywny
+        assert failed_test_ids(load_test_stats(conn)) == ["TC_002", "TC_003"]
+
+def test_rebuild_from_history_matches_incremental_stats(sqlite_engine):
+    write_history(sqlite_engine)
+    incremental = snapshot(sqlite_engine)
+
+    with sqlite_engine.begin() as conn:
+        rebuild_test_stats(conn)
+    assert snapshot(sqlite_engine) == incremental
+
+def test_ensure_fills_stats_for_existing_history(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(TestResult), [
+            {"test_id": "TC_001", "result": "not passed", "defect_key": "SCRUM-9", "timestamp": datetime.datetime(2024, 1, 1)},
+            {"test_id": "TC_001", "result": "passed", "defect_key": None, "timestamp": datetime.datetime(2024, 1, 2)},
+        ])
+        TestCaseStats.__table__.drop(conn)
+        ensure_test_stats(conn)
+        stats = load_test_stats(conn)
+    assert stats["TC_001"].run_count == 2
+    assert stats["TC_001"].last_result == "passed"
+    assert stats["TC_001"].last_defect_key == "SCRUM-9"
@@ -1,3 +1,4 @@
+import os
 import pytest
 import time
 import json
@@ -8,11 +9,14 @@ from jira import JIRA
 import xml.etree.ElementTree as ET
 from api.database.db_config import SessionLocal
 from api.models.test_case import TestCase
-from api.models.test_result import TestResult
+from runner.defect_index import DefectIndex
+from runner.defects import DefectReport, DefectReporter
+from runner.results import ResultWriter
+from runner.stats import PENDING_DEFECT_KEY
 from config import JIRA_SERVER, JIRA_USERNAME, JIRA_API_TOKEN, JIRA_PROJECT_KEY, ISSUE_KEY
 
-# Adres endpointu SOAP
-SOAP_ENDPOINT = "http://127.0.0.1:8002/soap/"
+# Adres endpointu SOAP: serwer Flask (soap_server.py) lub /soap/ w aplikacji FastAPI, np. http://127.0.0.1:8000/soap/
+SOAP_ENDPOINT = os.getenv("SOAP_ENDPOINT", "http://127.0.0.1:8002/soap/")
 
 # Połączenie z JIRA
 jira = JIRA(
@@ -34,96 +38,102 @@ def db_session():
         print("Zamykam sesję bazy danych")
         db.close()
 
-# Przykładowe przypadki testowe dla SOAP
+# Przykładowe przypadki testowe dla SOAP. Nie zależą od zawartości bazy: SOAP_TC_002 tworzy produkt,
+# a kolejne przypadki pobierają i usuwają właśnie ten produkt (CREATED_PRODUCT zamieniane na jego id)
+CREATED_PRODUCT = "<produkt z SOAP_TC_002>"
+
 SOAP_TEST_CASES = [
+    {
+        "test_id": "SOAP_TC_002",
+        "description": "Utworzenie nowego produktu przez SOAP",
+        "operation": "CreateProduct",
+        "input": {"name": "Test Product", "description": "Test Description", "price": 99.99},
+        "expected_status": 201,
+        "expected_response": {"result": int}
+    },
     {
         "test_id": "SOAP_TC_001",
         "description": "Pobranie istniejącego produktu przez SOAP",
         "operation": "GetProduct",
-        "input": {"id": 1},
+        "input": {"id": CREATED_PRODUCT},
         "expected_status": 200,
-        "expected_response": {"id": 1, "name": "Laptop", "description": "Laptop gamingowy"}
+        "expected_response": {"id": CREATED_PRODUCT, "name": "Test Product", "description": "Test Description"}
     },
     {
-        "test_id": "SOAP_TC_002",
-        "description": "Utworzenie nowego produktu przez SOAP",
-        "operation": "CreateProduct",
-        "input": {"name": "Test Product", "description": "Test Description", "price": 99.99},
+        "test_id": "SOAP_TC_004",
+        "description": "Pobranie wielu produktów jednym żądaniem SOAP (GetProducts)",
+        "operation": "GetProducts",
+        "input": {"ids": [CREATED_PRODUCT, 1000000000]},
+        "expected_status": 200,
+        "expected_response": {"ids": [CREATED_PRODUCT], "not_found": [1000000000]}
+    },
+    {
+        "test_id": "SOAP_TC_005",
+        "description": "Utworzenie wielu produktów jednym żądaniem SOAP (CreateProducts)",
+        "operation": "CreateProducts",
+        "input": {"products": [
+            {"name": "Batch Product 1", "description": "Batch Description 1", "price": 10.5},
+            {"name": "Batch Product 2", "description": "Batch Description 2", "price": 20.0}
+        ]},
         "expected_status": 201,
-        "expected_response": {"result": 21}
+        "expected_response": {"count": 2}
     },
     {
         "test_id": "SOAP_TC_003",
         "description": "Usunięcie produktu przez SOAP",
         "operation": "DeleteProduct",
-        "input": {"id": 1},
+        "input": {"id": CREATED_PRODUCT},
         "expected_status": 204,
         "expected_response": {"status": "Product deleted"}
     }
 ]
 
-# Funkcja do raportowania defektów w JIRA
-def report_defect_to_jira(test_case: dict, issue_key: str, actual_status: int, actual_response: str):
-    try:
-        print(f"Szukam istniejących defektów w JIRA dla {test_case['test_id']}...")
-        jql_query = f'project={JIRA_PROJECT_KEY} AND issuetype=Bug AND summary ~ "Defekt dla {test_case["test_id"]}"'
-        existing_defects = jira.search_issues(jql_query)
-        print(f"Znaleziono {len(existing_defects)} istniejących defektów dla zapytania: {jql_query}")
+def with_created_product(value, product_id):
+    if isinstance(value, dict):
+        return {key: with_created_product(item, product_id) for key, item in value.items()}
+    if isinstance(value, list):
+        return [with_created_product(item, product_id) for item in value]
+    return product_id if value == CREATED_PRODUCT else value
 
-        if existing_defects:
-            defect = existing_defects[0]
-            defect_key = defect.key
-            comment = (
-                f"Retest dla przypadku testowego {test_case['test_id']}:\n"
-                f"**Rzeczywisty status**: {actual_status}\n"
-                f"**Rzeczywista odpowiedź**: {actual_response}\n"
-                f"**Test Result**: not passed\n"
-                f"**Defect created**: yes\n"
-                f"**Numer defektu**: {defect_key}"
-            )
-            jira.add_comment(defect_key, comment)
-            print(f"Dodano komentarz do istniejącego defektu {defect_key} dla przypadku testowego {test_case['test_id']}")
-            return defect_key
+# Zgłoszenie defektu dla DefectReporter; defekty SOAP nie są powiązane z zadaniem przypadku testowego
+def soap_defect_report(test_case: dict, issue_key: str, actual_status: int, actual_response) -> DefectReport:
+    return DefectReport(
+        test_id=test_case["test_id"],
+        description=test_case["description"],
+        details={
+            "Operation": test_case["operation"],
+            "Input": test_case["input"],
+            "Oczekiwany status": test_case["expected_status"],
+            "Rzeczywisty status": actual_status,
+            "Oczekiwana odpowiedź": test_case["expected_response"],
+            "Rzeczywista odpowiedź": actual_response,
+        },
+        actual_status=actual_status,
+        actual_response=actual_response,
+        issue_key=issue_key,
+        link_issue=False,
+    )
 
-        print(f"Tworzę nowy defekt w JIRA dla {test_case['test_id']}...")
-        defect_dict = {
-            "project": {"key": JIRA_PROJECT_KEY},
-            "summary": f"Defekt dla {test_case['test_id']}: {test_case['description']}",
-            "description": (
-                f"**Przypadek testowy**: {test_case['test_id']}\n"
-                f"**Operation**: {test_case['operation']}\n"
-                f"**Input**: {test_case['input']}\n"
-                f"**Oczekiwany status**: {test_case['expected_status']}\n"
-                f"**Rzeczywisty status**: {actual_status}\n"
-                f"**Oczekiwana odpowiedź**: {test_case['expected_response']}\n"
-                f"**Rzeczywista odpowiedź**: {actual_response}\n"
-                f"**Powiązany przypadek testowy**: {issue_key}\n"
-                f"**Test Result**: not passed\n"
-                f"**Defect created**: yes\n"
-            ),
-            "issuetype": {"name": "Bug"},
-        }
-        new_issue = jira.create_issue(fields=defect_dict)
-        defect_key = new_issue.key
-        print(f"Utworzono defekt w JIRA: {defect_key} dla przypadku testowego {test_case['test_id']}")
-
-        # Aktualizacja opisu za pomocą update_issue
-        updated_description = defect_dict["description"] + f"**Numer defektu**: {defect_key}"
-        jira.update_issue(defect_key, fields={"description": updated_description})
-
-        print(f"Pominięto powiązanie z {issue_key} – defekt {defect_key} został utworzony.")
-        return defect_key
+# Defekty zgłaszane do JIRA w tle; reporter zamykany przed result_writer
+@pytest.fixture
+def defect_reporter(result_writer: ResultWriter):
+    # Indeks test_id -> klucz defektu z store.db, uzupełniany defektami zmienionymi w JIRA od ostatniego uruchomienia
+    index = DefectIndex()
+    try:
+        index.sync(jira, JIRA_PROJECT_KEY)
     except Exception as e:
-        print(f"Błąd podczas raportowania defektu do JIRA: {e}")
-        return None
+        print(f"Błąd synchronizacji indeksu defektów z JIRA, nieznane defekty będą wyszukiwane przez JQL: {e}")
+    with DefectReporter(jira, JIRA_PROJECT_KEY, on_resolved=result_writer.set_defect_key, index=index) as reporter:
+        yield reporter
 
 # Testy automatyczne dla SOAP
-def test_soap_api(db_session: Session):
+def test_soap_api(test_stats: dict, result_writer: ResultWriter, defect_reporter: DefectReporter):
     test_summary = []
     failures = []
 
     # Tworzenie sesji HTTP
     session = requests.Session()
+    created_product_id = None
 
     # Ręczne definiowanie operacji SOAP
     for test_case in SOAP_TEST_CASES:
@@ -131,25 +141,29 @@ def test_soap_api(db_session: Session):
         issue_key = f"{ISSUE_KEY}-{test_id_number + 20}"  # Dodajemy offset, aby uniknąć kolizji z REST
         print(f"Rozpoczynam test dla przypadku: {test_case['test_id']} (Issue: {issue_key})")
 
-        # Obliczamy retry_count
-        retry_count = db_session.query(TestResult).filter(TestResult.test_id == test_case["test_id"]).count()
+        # retry_count – liczba poprzednich prób (statystyki wczytane na początku uruchomienia)
+        previous = test_stats.get(test_case["test_id"])
+        retry_count = previous.run_count if previous else 0
         print(f"Retry count dla {test_case['test_id']}: {retry_count}")
 
         result = "passed"
         actual_status = 0
         actual_response = ""
         defect_key = None
+        defect_report = None
         start_time = time.time()
 
         try:
             operation = test_case["operation"]
+            test_input = with_created_product(test_case["input"], created_product_id)
+            expected_response = with_created_product(test_case["expected_response"], created_product_id)
             if operation == "GetProduct":
                 # Przygotuj żądanie SOAP
                 soap_request = f"""
                 <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="http://example.com/soap">
                     <soap:Body>
                         <ns:GetProduct>
-                            <id>{test_case['input']['id']}</id>
+                            <id>{test_input['id']}</id>
                         </ns:GetProduct>
                     </soap:Body>
                 </soap:Envelope>
@@ -162,16 +176,16 @@ def test_soap_api(db_session: Session):
                 result_xml = root.find('.//{http://example.com/soap}result')
                 if result_xml is None:
                     raise ValueError(f"Nie znaleziono elementu <result> w odpowiedzi XML dla {test_case['test_id']}")
-                actual_response = json.loads(result_xml.text.replace("'", "\""))
+                actual_response = json.loads(result_xml.text)
 
             elif operation == "CreateProduct":
                 soap_request = f"""
                 <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="http://example.com/soap">
                     <soap:Body>
                         <ns:CreateProduct>
-                            <name>{test_case['input']['name']}</name>
-                            <description>{test_case['input']['description']}</description>
-                            <price>{test_case['input']['price']}</price>
+                            <name>{test_input['name']}</name>
+                            <description>{test_input['description']}</description>
+                            <price>{test_input['price']}</price>
                         </ns:CreateProduct>
                     </soap:Body>
                 </soap:Envelope>
@@ -185,13 +199,14 @@ def test_soap_api(db_session: Session):
                 if result_xml is None:
                     raise ValueError(f"Nie znaleziono elementu <result> w odpowiedzi XML dla {test_case['test_id']}")
                 actual_response = {"result": int(result_xml.text)}
+                created_product_id = actual_response["result"]
 
             elif operation == "DeleteProduct":
                 soap_request = f"""
                 <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="http://example.com/soap">
                     <soap:Body>
                         <ns:DeleteProduct>
-                            <id>{test_case['input']['id']}</id>
+                            <id>{test_input['id']}</id>
                         </ns:DeleteProduct>
                     </soap:Body>
                 </soap:Envelope>
@@ -207,7 +222,48 @@ def test_soap_api(db_session: Session):
                     result_xml = root.find('.//{http://example.com/soap}result')
                     if result_xml is None:
                         raise ValueError(f"Nie znaleziono elementu <result> w odpowiedzi XML dla {test_case['test_id']}")
-                    actual_response = json.loads(result_xml.text.replace("'", "\""))
+                    actual_response = json.loads(result_xml.text)
+
+            elif operation == "GetProducts":
+                # Jedna koperta z wieloma <id>; odpowiedź: <result> dla znalezionych, <notFound> dla brakujących
+                ids = "".join(f"<id>{product_id}</id>" for product_id in test_input['ids'])
+                soap_request = f"""
+                <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="http://example.com/soap">
+                    <soap:Body>
+                        <ns:GetProducts>{ids}</ns:GetProducts>
+                    </soap:Body>
+                </soap:Envelope>
+                """
+                response = session.post(SOAP_ENDPOINT, data=soap_request, headers={'Content-Type': 'text/xml'})
+                response.raise_for_status()
+                actual_status = response.status_code
+                print(f"Surowa odpowiedź XML dla {test_case['test_id']}: {response.content.decode('utf-8')}")
+                root = ET.fromstring(response.content)
+                actual_response = {
+                    "ids": [json.loads(item.text)["id"] for item in root.iter('{http://example.com/soap}result')],
+                    "not_found": [int(item.text) for item in root.iter('{http://example.com/soap}notFound')],
+                }
+
+            elif operation == "CreateProducts":
+                products = "".join(
+                    f"<product><name>{product['name']}</name><description>{product['description']}</description>"
+                    f"<price>{product['price']}</price></product>"
+                    for product in test_input['products']
+                )
+                soap_request = f"""
+                <soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="http://example.com/soap">
+                    <soap:Body>
+                        <ns:CreateProducts>{products}</ns:CreateProducts>
+                    </soap:Body>
+                </soap:Envelope>
+                """
+                response = session.post(SOAP_ENDPOINT, data=soap_request, headers={'Content-Type': 'text/xml'})
+                response.raise_for_status()
+                actual_status = response.status_code
+                print(f"Surowa odpowiedź XML dla {test_case['test_id']}: {response.content.decode('utf-8')}")
+                root = ET.fromstring(response.content)
+                created_ids = [int(item.text) for item in root.iter('{http://example.com/soap}result')]
+                actual_response = {"count": len(created_ids), "ids": created_ids}
 
             else:
                 raise AssertionError(f"Nieobsługiwana operacja SOAP: {operation}")
@@ -220,12 +276,17 @@ def test_soap_api(db_session: Session):
             )
 
             # Weryfikacja odpowiedzi
-            expected_response = test_case["expected_response"]
             for key, value in expected_response.items():
                 assert key in actual_response, f"Brak klucza {key} w odpowiedzi SOAP"
-                assert actual_response[key] == value, (
-                    f"Oczekiwano {key}: {value}, otrzymano {key}: {actual_response[key]}"
-                )
+                if isinstance(value, type):
+                    # Sprawdzamy tylko typ – wartość (np. id nowego produktu) zależy od stanu bazy
+                    assert isinstance(actual_response[key], value), (
+                        f"Oczekiwano {key} typu {value.__name__}, otrzymano {key}: {actual_response[key]!r}"
+                    )
+                else:
+                    assert actual_response[key] == value, (
+                        f"Oczekiwano {key}: {value}, otrzymano {key}: {actual_response[key]}"
+                    )
 
             print(f"Test {test_case['test_id']} przeszedł pomyślnie.")
             test_summary.append((test_case["test_id"], "passed", None))
@@ -234,15 +295,8 @@ def test_soap_api(db_session: Session):
             print(f"Test {test_case['test_id']} nie przeszedł: {str(e)}")
             result = "not passed"
             failure_message = f"Expected: {test_case['expected_response']}, Got: {actual_status}"
-            print(f"Raportuję defekt dla {test_case['test_id']}...")
-            try:
-                defect_key = report_defect_to_jira(test_case, issue_key, actual_status, failure_message)
-                if defect_key is None:
-                    print(f"UWAGA: Defekt dla {test_case['test_id']} nie został zgłoszony do JIRA!")
-                    defect_key = "PENDING"
-            except Exception as jira_error:
-                print(f"Błąd podczas raportowania defektu do JIRA: {jira_error}")
-                defect_key = "PENDING"
+            defect_key = PENDING_DEFECT_KEY
+            defect_report = soap_defect_report(test_case, issue_key, actual_status, failure_message)
             actual_response = failure_message
             test_summary.append((test_case["test_id"], "not passed", defect_key))
             failures.append(f"Test {test_case['test_id']} nie przeszedł: {str(e)}")
@@ -251,15 +305,8 @@ def test_soap_api(db_session: Session):
             result = "not passed"
             actual_status = 0
             failure_message = f"Error: {str(e)}"
-            print(f"Raportuję defekt dla {test_case['test_id']}...")
-            try:
-                defect_key = report_defect_to_jira(test_case, issue_key, actual_status, actual_response)
-                if defect_key is None:
-                    print(f"UWAGA: Defekt dla {test_case['test_id']} nie został zgłoszony do JIRA!")
-                    defect_key = "PENDING"
-            except Exception as jira_error:
-                print(f"Błąd podczas raportowania defektu do JIRA: {jira_error}")
-                defect_key = "PENDING"
+            defect_key = PENDING_DEFECT_KEY
+            defect_report = soap_defect_report(test_case, issue_key, actual_status, actual_response)
             actual_response = failure_message
             test_summary.append((test_case["test_id"], "not passed", defect_key))
             failures.append(f"Test {test_case['test_id']} nie przeszedł z powodu błędu: {str(e)}")
@@ -270,37 +317,34 @@ def test_soap_api(db_session: Session):
             # Debugowanie: Sprawdzamy, czy wynik testu zostanie zapisany
             print(f"Zapisz wynik dla {test_case['test_id']}: result={result}, actual_status={actual_status}, defect_key={defect_key}")
 
-            # Zapis wyniku testu do tabeli test_results
+            # Wynik trafia do bufora – zapis do test_results odbywa się partiami
             try:
-                test_result = TestResult(
+                result_writer.add(
                     test_id=test_case["test_id"],
                     result=result,
                     actual_status=actual_status,
                     actual_response=str(actual_response)[:500],
                     defect_key=defect_key,
                     duration_ms=duration_ms,
-                    environment="local",
-                    tester="automated",
                     retry_count=retry_count
                 )
-                db_session.add(test_result)
-                db_session.commit()
-                print(f"Zapis wyniku dla {test_case['test_id']} zakończony sukcesem.")
             except SQLAlchemyError as e:
-                print(f"Błąd podczas zapisu wyniku dla {test_case['test_id']}: {e}")
-                db_session.rollback()
+                print(f"Błąd podczas zapisu wyników (partia z {test_case['test_id']}): {e}")
                 raise
+            if defect_report is not None:
+                print(f"Raportuję defekt dla {test_case['test_id']}...")
+                defect_reporter.submit(defect_report)
 
-            # Debugowanie: Sprawdzamy, czy wynik został zapisany
-            saved_result = db_session.query(TestResult).filter(TestResult.test_id == test_case["test_id"]).order_by(TestResult.timestamp.desc()).first()
-            if saved_result:
-                print(f"Wynik zapisany: {saved_result.test_id}, result={saved_result.result}, timestamp={saved_result.timestamp}")
-            else:
-                print(f"UWAGA: Wynik dla {test_case['test_id']} NIE został zapisany!")
+    # Czekamy na obsłużenie kolejki defektów, aby podsumowanie zawierało klucze z JIRA
+    defect_reporter.close()
 
     # Podsumowanie wyników testów
     print("\n=== Podsumowanie wyników testów ===")
     for test_id, result, defect_key in test_summary:
+        if defect_key == PENDING_DEFECT_KEY:
+            defect_key = defect_reporter.resolved.get(test_id, PENDING_DEFECT_KEY)
+            if defect_key == PENDING_DEFECT_KEY:
+                print(f"UWAGA: Defekt dla {test_id} nie został zgłoszony do JIRA!")
         if result == "passed":
             print(f"Test {test_id}: Passed")
         else:
@@ -0,0 +1,178 @@
+import json
+import pytest
+from lxml import etree
+from sqlalchemy import event, func, insert, select
+from api.models.product import Product
+from api.routes.soap_api import SERVICE_NS, SOAP_ENV_NS
+from soap_server import create_app
+
+def envelope(operation: str, fields: str) -> bytes:
+    return (
+        f'<?xml version="1.0" encoding="utf-8"?>'
+        f'<soap:Envelope xmlns:soap="{SOAP_ENV_NS}" xmlns:ns="{SERVICE_NS}">'
+        f"<soap:Body><ns:{operation}>{fields}</ns:{operation}></soap:Body></soap:Envelope>"
+    ).encode()
+
+def result_text(response) -> str:
+    return etree.fromstring(response.data).findtext(f".//{{{SERVICE_NS}}}result")
+
+def fault_text(response) -> str:
+    return etree.fromstring(response.data).findtext(".//faultstring")
+
+@pytest.fixture
+def soap_client(sqlite_engine, session_factory):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {"name": "Laptop", "description": "Laptop gamingowy", "price": 4500.99, "available": True, "stock": 10},
+            {"name": "Kabel <HDMI> & adapter", "description": "Opis z \"cudzysłowem\"", "price": 39.99, "available": True, "stock": 5},
+        ])
+    return create_app(session_factory).test_client()
+
+def test_get_product_reads_database_and_escapes_text(soap_client):
+    response = soap_client.post("/soap/", data=envelope("GetProduct", "<id>2</id>"))
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/xml")
+    product = json.loads(result_text(response))
+    assert product["name"] == "Kabel <HDMI> & adapter"
+    assert product["description"] == 'Opis z "cudzysłowem"'
+
+    response = soap_client.post("/soap/", data=envelope("GetProduct", "<id>99</id>"))
+    assert (response.status_code, fault_text(response)) == (404, "Product not found")
+
+def test_create_and_delete_product(soap_client, sqlite_engine):
+    fields = "<name>Tablet &amp; etui</name><description>Tablet 10 cali</description><price>1200.00</price>"
+    response = soap_client.post("/soap/", data=envelope("CreateProduct", fields))
+    assert response.status_code == 201
+    product_id = int(result_text(response))
+    with sqlite_engine.connect() as conn:
+        assert conn.scalar(select(Product.name).where(Product.id == product_id)) == "Tablet & etui"
+
+    assert soap_client.post("/soap/", data=envelope("DeleteProduct", f"<id>{product_id}</id>")).status_code == 204
+    assert soap_client.post("/soap/", data=envelope("DeleteProduct", f"<id>{product_id}</id>")).status_code == 404
+
+@pytest.mark.parametrize("body, status, message", [
+    (envelope("CreateProduct", "<name>Bez ceny</name><description>Opis</description>"), 400, "price: Field required"),
+    (envelope("GetProduct", "<id>abc</id>"), 400, "Invalid integer in field: id"),
+    (envelope("RenameProduct", "<id>1</id>"), 400, "Invalid operation"),
+    (b"<soap:Envelope", 400, None),
+])
+def test_invalid_requests_return_faults(soap_client, body, status, message):
+    response = soap_client.post("/soap/", data=body)
+    assert response.status_code == status
+    if message:
+        assert fault_text(response) == message
+
+def test_external_entities_are_not_resolved(soap_client, tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("tajne")
+    body = (
+        f'<?xml version="1.0"?><!DOCTYPE x [<!ENTITY xxe SYSTEM "file://{secret}">]>'
+        f'<soap:Envelope xmlns:soap="{SOAP_ENV_NS}" xmlns:ns="{SERVICE_NS}"><soap:Body>'
+        f"<ns:CreateProduct><name>&xxe;</name><description>Opis</description><price>1</price></ns:CreateProduct>"
+        f"</soap:Body></soap:Envelope>"
+    ).encode()
+    response = soap_client.post("/soap/", data=body)
+    assert b"tajne" not in response.data
+
+def test_get_products_uses_one_in_query(soap_client, sqlite_engine):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(sqlite_engine, "before_cursor_execute", listener)
+    try:
+        response = soap_client.post("/soap/", data=envelope("GetProducts", "<id>2</id><id>99</id><id>1</id><id>2</id>"))
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", listener)
+    assert response.status_code == 200
+    assert response.is_streamed
+    items = etree.fromstring(response.data).find(f".//{{{SERVICE_NS}}}GetProductsResponse")
+    # Element na każde <id> w kolejności z żądania (także powtórzone), brakujące jako <notFound>
+    returned = [json.loads(item.text)["id"] if etree.QName(item).localname == "result" else f"brak {item.text}" for item in items]
+    assert returned == [2, "brak 99", 1, 2]
+    assert len([statement for statement in statements if statement.lstrip().startswith("SELECT")]) == 1
+
+def test_create_products_inserts_batch_in_order(soap_client, sqlite_engine):
+    products = "".join(
+        f"<product><name>Produkt {i}</name><description>Opis {i}</description><price>{i + 1}.50</price></product>"
+        for i in range(50)
+    )
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(sqlite_engine, "before_cursor_execute", listener)
+    try:
+        response = soap_client.post("/soap/", data=envelope("CreateProducts", products))
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", listener)
+    assert response.status_code == 201
+    # Jeden INSERT dla całej partii, nie po jednym na <product>
+    assert len([statement for statement in statements if statement.lstrip().startswith("INSERT")]) == 1
+    product_ids = [int(item.text) for item in etree.fromstring(response.data).iter(f"{{{SERVICE_NS}}}result")]
+    with sqlite_engine.connect() as conn:
+        names = dict(conn.execute(select(Product.id, Product.name).where(Product.id.in_(product_ids))).all())
+    assert [names[product_id] for product_id in product_ids] == [f"Produkt {i}" for i in range(50)]
+
+@pytest.mark.parametrize("operation, fields, message", [
+    ("CreateProducts", "<product><name>A</name><description>B</description><price>1</price></product>"
+                       "<product><name>C</name><description>D</description></product>", "product[1].price: Field required"),
+    ("GetProducts", "", "Missing field: id"),
+    ("GetProducts", "<id>1</id>" * 1001, "Too many items in batch: 1001 (max 1000)"),
+])
+def test_invalid_batches_are_rejected(soap_client, sqlite_engine, operation, fields, message):
+    response = soap_client.post("/soap/", data=envelope(operation, fields))
+    assert (response.status_code, fault_text(response)) == (400, message)
+    with sqlite_engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Product)) == 2
+
+def test_asgi_endpoint_shares_database_and_product_cache(api_client):
+    # Ten sam endpoint w aplikacji FastAPI – sesja z get_db i cache produktów procesu API
+    response = api_client.post("/soap/", content=envelope("CreateProducts", "".join(
+        f"<product><name>Produkt {i}</name><description>Opis {i}</description><price>10</price></product>" for i in range(3)
+    )))
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "text/xml; charset=utf-8"
+    product_ids = [int(item.text) for item in etree.fromstring(response.content).iter(f"{{{SERVICE_NS}}}result")]
+
+    assert api_client.get(f"/api/v1/products/{product_ids[0]}").json()["name"] == "Produkt 0"
+    response = api_client.post("/soap/", content=envelope("DeleteProduct", f"<id>{product_ids[0]}</id>"))
+    assert (response.status_code, response.content) == (204, b"")
+    # Usunięcie przez SOAP unieważnia cache – REST nie zwraca już produktu z pamięci
+    assert api_client.get(f"/api/v1/products/{product_ids[0]}").status_code == 404
+
+    response = api_client.post("/soap/", content=envelope("GetProduct", f"<id>{product_ids[1]}</id>"))
+    assert json.loads(etree.fromstring(response.content).findtext(f".//{{{SERVICE_NS}}}result"))["name"] == "Produkt 1"
+    response = api_client.post("/soap/", content=envelope("GetProduct", f"<id>{product_ids[0]}</id>"))
+    assert response.status_code == 404
+
+def test_writes_invalidate_redis_cache(soap_client, monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import soap_server
+    from api.cache import ProductCache, RedisBackend
+    server = fakeredis.FakeServer()
+    backend = RedisBackend()
+    backend.client = fakeredis.FakeAsyncRedis(server=server)
+    backend.sync_client = fakeredis.FakeRedis(server=server)
+    monkeypatch.setattr(soap_server, "CACHE_BACKEND", "redis")
+    monkeypatch.setattr(soap_server, "product_cache", ProductCache(backend))
+
+    # Każdy kolejny zapis zwiększa generację w Redis – bez pętli zdarzeń i klienta redis.asyncio
+    fields = "<name>Tablet</name><description>Tablet 10 cali</description><price>1200.00</price>"
+    for _ in range(3):
+        assert soap_client.post("/soap/", data=envelope("CreateProduct", fields)).status_code == 201
+    assert soap_client.post("/soap/", data=envelope("GetProduct", "<id>1</id>")).status_code == 200
+    assert backend.sync_client.get("api-cache:gen:products") == b"3"
+
+def test_batch_response_is_serialized_in_chunks(monkeypatch):
+    from api.routes import soap_api
+    monkeypatch.setattr(soap_api, "STREAM_CHUNK_ITEMS", 2)
+    produced = []
+
+    def items():
+        for i in range(5):
+            produced.append(i)
+            yield b"<result>%d</result>" % i
+
+    stream = soap_api.batch_response("CreateProducts", 201, items()).content
+    head = next(stream)
+    assert produced == []  # nic nie jest serializowane przed wysłaniem nagłówka koperty
+    first = next(stream)
+    assert first == b"<result>0</result><result>1</result>" and produced == [0, 1]
+    assert b"".join([head, first, *stream]).count(b"<result>") == 5
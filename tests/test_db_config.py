@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from api.database.db_config import create_async_db_engine, create_db_engine, to_async_url, to_read_only_url
+from api.models.product import Product
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///store.db", "sqlite:///file:store.db?mode=ro&uri=true"),
+    ("sqlite:////tmp/store.db", "sqlite:///file:/tmp/store.db?mode=ro&uri=true"),
+    ("sqlite+aiosqlite:///store.db", "sqlite+aiosqlite:///file:store.db?mode=ro&uri=true"),
+    # Bez zmian: baza w pamięci, adres już w postaci URI, inne bazy
+    ("sqlite:///:memory:", "sqlite:///:memory:"),
+    ("sqlite://", "sqlite://"),
+    ("sqlite:///file:store.db?mode=ro&uri=true", "sqlite:///file:store.db?mode=ro&uri=true"),
+    ("postgresql://user@localhost/store", "postgresql://user@localhost/store"),
+])
+def test_read_only_url(url, expected):
+    assert to_read_only_url(url) == expected
+
+def test_sqlite_pragmas_are_applied(sqlite_path):
+    engine = create_db_engine(f"sqlite:///{sqlite_path}")
+    try:
+        with engine.connect() as conn:
+            pragmas = {name: conn.scalar(text(f"PRAGMA {name}"))
+                       for name in ("journal_mode", "synchronous", "cache_size", "busy_timeout", "query_only")}
+    finally:
+        engine.dispose()
+    assert pragmas == {"journal_mode": "wal", "synchronous": 1, "cache_size": -65536, "busy_timeout": 5000, "query_only": 0}
+
+def test_read_only_engine_rejects_writes(sqlite_engine, sqlite_path):
+    with sqlite_engine.begin() as conn:
+        conn.execute(insert(Product), {"name": "Laptop", "description": "Opis", "price": 10.0})
+
+    async def scenario():
+        engine = create_async_db_engine(to_async_url(to_read_only_url(f"sqlite:///{sqlite_path}")), read_only=True)
+        try:
+            async with engine.connect() as conn:
+                count = await conn.scalar(select(func.count()).select_from(Product))
+                query_only = await conn.scalar(text("PRAGMA query_only"))
+                with pytest.raises(OperationalError, match="readonly|read-only|query_only"):
+                    await conn.execute(insert(Product), {"name": "Tablet", "description": "Opis", "price": 5.0})
+            return count, query_only
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(scenario()) == (1, 1)
+    with sqlite_engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Product)) == 1
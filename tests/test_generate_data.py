@@ -0,0 +1,71 @@
+import datetime
+from collections import Counter
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+from api.database.db_config import Base
+from api.database.search import fts_search_statement, search_terms
+from api.models.order import Order
+from api.models.product import Product
+from scripts.generate_data import INDEX_REBUILD_MIN_ROWS, generate
+
+START = datetime.datetime(2025, 1, 1)
+
+def generated_rows(engine):
+    with engine.connect() as conn:
+        return (
+            conn.execute(select(Product.id, Product.name, Product.price).order_by(Product.id)).all(),
+            conn.execute(select(Order.id, Order.customer_id, Order.product_id, Order.quantity, Order.order_date, Order.total_price).order_by(Order.id)).all(),
+        )
+
+def test_same_seed_gives_same_data(sqlite_engine, tmp_path):
+    other = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    Base.metadata.create_all(bind=other)
+    for engine in (sqlite_engine, other):
+        generate(engine, products=200, customers=50, orders=2000, seed=7)
+    assert generated_rows(sqlite_engine) == generated_rows(other)
+    other.dispose()
+
+def test_orders_are_consistent_and_skewed(sqlite_engine):
+    generate(sqlite_engine, products=500, customers=100, orders=20_000, seed=1, start=START, days=30)
+    products, orders = generated_rows(sqlite_engine)
+    prices = {product_id: price for product_id, _, price in products}
+
+    assert all(order.total_price == round(prices[order.product_id] * order.quantity, 2) for order in orders)
+    dates = [order.order_date for order in orders]
+    assert dates == sorted(dates)
+    assert START <= dates[0] and dates[-1] < START + datetime.timedelta(days=30)
+    # Rozkład Zipfa: 10% najpopularniejszych produktów ma większość zamówień
+    counts = sorted(Counter(order.product_id for order in orders).values(), reverse=True)
+    assert sum(counts[:50]) > 0.5 * len(orders)
+
+def test_generated_products_are_searchable(sqlite_engine):
+    generate(sqlite_engine, products=300, customers=0, orders=0, seed=3)
+    generate(sqlite_engine, products=300, customers=0, orders=0, seed=4)
+    with Session(sqlite_engine) as session:
+        found = session.execute(fts_search_statement(Product, search_terms("laptop"), None, 1000)).all()
+        expected = session.scalars(select(Product.id).where(Product.name.like("Laptop%"))).all()
+    assert sorted(row.id for row in found) == sorted(expected)
+    assert max(expected) > 300  # także produkty z drugiego uruchomienia
+
+def test_indexes_are_rebuilt_only_for_large_loads(sqlite_engine):
+    statements = []
+
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(sqlite_engine, "before_cursor_execute", record_statement)
+    try:
+        generate(sqlite_engine, products=INDEX_REBUILD_MIN_ROWS, customers=0, orders=0, seed=5)
+        rebuilt = [statement.strip() for statement in statements if "INDEX" in statement]
+        statements.clear()
+        # Małe dopisanie do istniejącej tabeli – indeksy i trigger FTS zostają, wiersze indeksuje trigger
+        generate(sqlite_engine, products=100, customers=0, orders=0, seed=6)
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", record_statement)
+    assert [statement.split()[0] for statement in rebuilt] == ["DROP"] * 3 + ["CREATE"] * 3
+    assert not [statement for statement in statements if "INDEX" in statement or "TRIGGER" in statement]
+    with Session(sqlite_engine) as session:
+        found = session.execute(fts_search_statement(Product, search_terms("laptop"), None, 100_000)).all()
+        expected = session.scalars(select(Product.id).where(Product.name.like("Laptop%"))).all()
+    assert sorted(row.id for row in found) == sorted(expected)
+    assert max(expected) > INDEX_REBUILD_MIN_ROWS
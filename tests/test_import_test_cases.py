@@ -0,0 +1,41 @@
+import csv
+from sqlalchemy import func, select
+from api.models.test_case import TestCase
+from scripts.import_test_cases import CSV_COLUMNS, CSV_FILE_PATH, import_test_cases
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def case(i, description="Opis", status=200):
+    return {
+        "test_id": f"TC_{i:06}", "description": f"{description} {i}", "endpoint": f"/api/v1/products/{i}",
+        "method": "GET", "test_type": "functional", "expected_status": status, "expected_response": '{"id": 1}',
+    }
+
+def test_import_bundled_csv(sqlite_engine):
+    stats = import_test_cases(CSV_FILE_PATH, bind=sqlite_engine)
+    with sqlite_engine.connect() as conn:
+        tc = conn.execute(select(TestCase).where(TestCase.test_id == "TC_002")).one()
+    assert stats["inserted"] == stats["rows"] == 22
+    assert tc.expected_status == 404
+    assert tc.expected_response == '{"detail": "Not Found"}'
+
+def test_reimport_updates_existing_cases(sqlite_engine, tmp_path):
+    path = tmp_path / "cases.csv"
+    write_csv(path, [case(i) for i in range(250)])
+    import_test_cases(path, bind=sqlite_engine, chunk_size=100)
+
+    # Zmienione przypadki, nowe przypadki i duplikat test_id w jednej porcji
+    write_csv(path, [case(i, "Zmieniony", 201) for i in range(200, 300)] + [case(299, "Ostatni", 500)])
+    stats = import_test_cases(path, bind=sqlite_engine, chunk_size=200)
+
+    assert (stats["updated"], stats["inserted"]) == (50, 50)
+    with sqlite_engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(TestCase)) == 300
+        updated = {row.test_id: row for row in conn.execute(select(TestCase).where(TestCase.test_id.in_(["TC_000001", "TC_000210", "TC_000299"])))}
+    assert updated["TC_000001"].description == "Opis 1"
+    assert (updated["TC_000210"].description, updated["TC_000210"].expected_status) == ("Zmieniony 210", 201)
+    assert (updated["TC_000299"].description, updated["TC_000299"].expected_status) == ("Ostatni 299", 500)